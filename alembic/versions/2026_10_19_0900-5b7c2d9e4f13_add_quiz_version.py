@@ -0,0 +1,31 @@
+"""add quiz version
+
+Revision ID: 5b7c2d9e4f13
+Revises: 41e01bbab7ad
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7c2d9e4f13'
+down_revision: str | None = '41e01bbab7ad'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('quiz') as batch_op:
+        batch_op.add_column(
+            sa.Column('version', sa.Integer(), server_default='1',
+                      nullable=False)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('quiz') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,36 @@
+"""add result idempotency key
+
+Revision ID: 8d3f6a1c2b47
+Revises: 5b7c2d9e4f13
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6a1c2b47'
+down_revision: str | None = '5b7c2d9e4f13'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('quizresult') as batch_op:
+        batch_op.add_column(
+            sa.Column('idempotency_key', sa.String(length=64), nullable=True)
+        )
+        batch_op.create_index(
+            'ix_quizresult_user_id_idempotency_key',
+            ['user_id', 'idempotency_key'],
+            unique=True,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('quizresult') as batch_op:
+        batch_op.drop_index('ix_quizresult_user_id_idempotency_key')
+        batch_op.drop_column('idempotency_key')
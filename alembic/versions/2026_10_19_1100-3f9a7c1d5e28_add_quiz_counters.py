@@ -0,0 +1,56 @@
+"""add quiz counters
+
+Revision ID: 3f9a7c1d5e28
+Revises: 8d3f6a1c2b47
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a7c1d5e28'
+down_revision: str | None = '8d3f6a1c2b47'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COUNTERS = ('question_count', 'attempt_count', 'score_sum', 'max_score_sum')
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('quiz') as batch_op:
+        for name in COUNTERS:
+            batch_op.add_column(
+                sa.Column(
+                    name, sa.Integer(), nullable=False, server_default='0'
+                )
+            )
+    op.execute(
+        """
+        UPDATE quiz SET
+            question_count = (
+                SELECT count(*) FROM question WHERE question.quiz_id = quiz.id
+            ),
+            attempt_count = (
+                SELECT count(*) FROM quizresult
+                WHERE quizresult.quiz_id = quiz.id
+            ),
+            score_sum = (
+                SELECT coalesce(sum(score), 0) FROM quizresult
+                WHERE quizresult.quiz_id = quiz.id
+            ),
+            max_score_sum = (
+                SELECT coalesce(sum(max_score), 0) FROM quizresult
+                WHERE quizresult.quiz_id = quiz.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('quiz') as batch_op:
+        for name in reversed(COUNTERS):
+            batch_op.drop_column(name)
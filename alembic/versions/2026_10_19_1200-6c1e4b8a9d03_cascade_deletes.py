@@ -0,0 +1,48 @@
+"""cascade deletes
+
+Revision ID: 6c1e4b8a9d03
+Revises: 3f9a7c1d5e28
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1e4b8a9d03'
+down_revision: str | None = '3f9a7c1d5e28'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# SQLite foreign keys are unnamed, name them to recreate them in batch mode
+NAMING_CONVENTION = {
+    'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s',
+}
+
+FOREIGN_KEYS = (
+    ('quiz', 'author_id', 'user'),
+    ('question', 'quiz_id', 'quiz'),
+    ('quizresult', 'quiz_id', 'quiz'),
+    ('quizresult', 'user_id', 'user'),
+)
+
+
+def _recreate_foreign_keys(ondelete: str | None) -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        name = f'fk_{table}_{column}_{referred}'
+        with op.batch_alter_table(
+            table, naming_convention=NAMING_CONVENTION
+        ) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(
+                name, referred, [column], ['id'], ondelete=ondelete
+            )
+
+
+def upgrade() -> None:
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys(None)
@@ -0,0 +1,59 @@
+"""add packed answers
+
+Revision ID: 9e2b5d7a4c61
+Revises: 6c1e4b8a9d03
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2b5d7a4c61'
+down_revision: str | None = '6c1e4b8a9d03'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'quizanswerlayout',
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('questions', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'),
+                  nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'),
+                  nullable=False),
+        sa.ForeignKeyConstraint(
+            ['quiz_id'], ['quiz.id'],
+            name='fk_quizanswerlayout_quiz_id_quiz', ondelete='CASCADE',
+        ),
+        sa.PrimaryKeyConstraint('quiz_id', 'version')
+    )
+    # Results are packed by the pack_answers command, not here
+    with op.batch_alter_table('quizresult') as batch_op:
+        batch_op.alter_column(
+            'answers', existing_type=sa.JSON(), nullable=True
+        )
+        batch_op.add_column(
+            sa.Column('answers_packed', sa.LargeBinary(), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column('answers_version', sa.Integer(), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    # Packed answers have to be turned back into JSON before this, their
+    # layouts are dropped
+    with op.batch_alter_table('quizresult') as batch_op:
+        batch_op.drop_column('answers_version')
+        batch_op.drop_column('answers_packed')
+        batch_op.alter_column(
+            'answers', existing_type=sa.JSON(), nullable=False
+        )
+    op.drop_table('quizanswerlayout')
@@ -0,0 +1,49 @@
+"""add quizresult_answer
+
+Revision ID: 4a8c3e6f1b92
+Revises: 9e2b5d7a4c61
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8c3e6f1b92'
+down_revision: str | None = '9e2b5d7a4c61'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Rows of stored results are added by the fill_answer_rows command
+    op.create_table(
+        'quizresult_answer',
+        sa.Column('result_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('option_index', sa.SmallInteger(), nullable=True),
+        sa.Column('is_correct', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['result_id'], ['quizresult.id'],
+            name='fk_quizresult_answer_result_id_quizresult',
+            ondelete='CASCADE',
+        ),
+        sa.PrimaryKeyConstraint('result_id', 'question_id')
+    )
+    op.create_index(
+        'ix_quizresult_answer_question_id_is_correct',
+        'quizresult_answer',
+        ['question_id', 'is_correct', 'option_index'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_quizresult_answer_question_id_is_correct',
+        table_name='quizresult_answer',
+    )
+    op.drop_table('quizresult_answer')
@@ -0,0 +1,26 @@
+"""add quiz attempt_count index
+
+Revision ID: 7d2f9b4e6a18
+Revises: 4a8c3e6f1b92
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f9b4e6a18'
+down_revision: str | None = '4a8c3e6f1b92'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_quiz_attempt_count', 'quiz', ['attempt_count'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_attempt_count', table_name='quiz')
@@ -0,0 +1,26 @@
+"""add quizresult quiz_id index
+
+Revision ID: b5e8d1c3f720
+Revises: 7d2f9b4e6a18
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8d1c3f720'
+down_revision: str | None = '7d2f9b4e6a18'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_quizresult_quiz_id', 'quizresult', ['quiz_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quizresult_quiz_id', table_name='quizresult')
@@ -0,0 +1 @@
+"""Performance tooling: load tests and benchmarks."""
@@ -0,0 +1,386 @@
+"""Synthetic dataset generator for large, realistic SQLite databases.
+
+Creates the schema from ``src.models`` in a new SQLite file and fills it
+with users, quizzes, questions and quiz results. Quiz popularity and user
+activity follow Zipf distributions, so a few quizzes collect most attempts,
+and every result carries a plausible ``answers`` object for its quiz. The
+quiz counters are written once the results are in, and every answer gets
+its ``quizresult_answer`` row for the answer statistics.
+
+Rows are generated in chunks and written with a single positional
+``INSERT`` per table through ``executemany``, with journaling and fsync off
+for the duration of the load. Output is fully determined by the arguments
+and ``--seed``. Examples::
+
+    python -m benchmarks.datagen --output large.db --force
+    python -m benchmarks.datagen --output huge.db \\
+        --users 1000000 --quizzes 200000 --results 10000000
+
+All users share the password ``password123``.
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import random
+import sys
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Table, create_engine
+from sqlalchemy.engine import Dialect
+
+from src.models.base import Base
+from src.models.quiz import Question, Quiz, QuizResult, quiz_result_answer
+from src.models.user import User
+
+PASSWORD = "password123"  # noqa: S105
+# bcrypt hash of PASSWORD, shared by every user to keep generation fast
+PASSWORD_HASH = "$2b$12$4MxzHOZnWXu5NObuMRotZek0e4VszSZfOXTx8UiWkxKtsKXRHS4yy"  # noqa: S105
+
+WORDS = (
+    "atom", "river", "planet", "violin", "granite", "falcon", "glacier",
+    "comet", "harbor", "lantern", "meadow", "nebula", "orchid", "prism",
+    "quartz", "reef", "saturn", "tundra", "umbra", "volcano", "willow",
+    "zenith", "amber", "basalt", "cedar", "delta", "ember", "fjord",
+    "geyser", "helium", "iris", "jade", "kelp", "lunar", "magma", "nickel",
+    "oasis", "pollen", "quasar", "radon", "sierra", "topaz", "upland",
+    "vertex", "walnut", "xenon", "yarrow", "zephyr",
+)
+TOPICS = (
+    "History", "Geography", "Science", "Music", "Movies", "Sports",
+    "Literature", "Art", "Technology", "Nature", "Space", "Food",
+)
+
+LOAD_PRAGMAS = (
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA locking_mode=EXCLUSIVE",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+)
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 10_000
+    quizzes: int = 1_000
+    results: int = 100_000
+    min_questions: int = 5
+    max_questions: int = 25
+    zipf: float = 1.1
+    seed: int = 0
+    chunk_size: int = 50_000
+    start: datetime = datetime(2025, 1, 1)  # noqa: DTZ001
+    days: int = 365
+
+
+class ZipfSampler:
+    """Draw 1-based ids whose popularity follows a Zipf law.
+
+    Popularity ranks are shuffled over the ids, so the most popular quiz is
+    not simply the oldest one.
+    """
+
+    def __init__(self, n: int, s: float, rng: random.Random) -> None:
+        self.rng = rng
+        self.ids = list(range(1, n + 1))
+        rng.shuffle(self.ids)
+        self.cum_weights = list(
+            itertools.accumulate(1 / rank ** s for rank in range(1, n + 1))
+        )
+        self.total = self.cum_weights[-1]
+
+    def sample(self) -> int:
+        rank = bisect.bisect(self.cum_weights, self.rng.random() * self.total)
+        return self.ids[min(rank, len(self.ids) - 1)]
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def insert_sql(table: Table, columns: list[str], dialect: Dialect) -> str:
+    """Render a positional INSERT for ``columns`` of a Core table."""
+    preparer = dialect.identifier_preparer
+    names = ", ".join(preparer.quote(table.c[c].name) for c in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    return (
+        f"INSERT INTO {preparer.format_table(table)} ({names}) "
+        f"VALUES ({placeholders})"
+    )
+
+
+def bulk_insert(
+    cursor: Any, sql: str, rows: Iterable[tuple], chunk_size: int
+) -> int:
+    """Insert rows in chunks through DBAPI ``executemany``."""
+    count = 0
+    for chunk in _chunks(rows, chunk_size):
+        cursor.executemany(sql, chunk)
+        count += len(chunk)
+    return count
+
+
+class Generator:
+    """Produces the rows of every table from a single seeded RNG."""
+
+    def __init__(self, spec: DatasetSpec) -> None:
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        # Each question points into a shared pool of option tuples, so that
+        # the answer keys of millions of questions fit in a few arrays.
+        self.option_pool = [
+            tuple(self.rng.sample(WORDS, 4)) for _ in range(4096)
+        ]
+        self.quiz_first_question = array("I")
+        self.quiz_question_count = array("H")
+        self.question_options = array("H")
+        self.question_correct = array("B")
+        self.question_points = array("B")
+        # Counters of every quiz, accumulated while results are generated
+        self.quiz_attempts = array("I", [0]) * spec.quizzes
+        self.quiz_score_sum = array("Q", [0]) * spec.quizzes
+        self.quiz_max_score_sum = array("Q", [0]) * spec.quizzes
+
+    def _timestamp(self) -> str:
+        offset = self.rng.random() * self.spec.days * 86_400
+        return str(self.spec.start + timedelta(seconds=offset))
+
+    def users(self) -> Iterator[tuple]:
+        for n in range(1, self.spec.users + 1):
+            created = self._timestamp()
+            yield (
+                n, f"user{n}", f"user{n}@example.com", PASSWORD_HASH,
+                True, n == 1, created, created,
+            )
+
+    def quizzes(self) -> Iterator[tuple]:
+        authors = ZipfSampler(self.spec.users, self.spec.zipf, self.rng)
+        for n in range(1, self.spec.quizzes + 1):
+            topic = self.rng.choice(TOPICS)
+            created = self._timestamp()
+            yield (
+                n, f"{topic} quiz #{n}", f"A {topic.lower()} quiz",
+                authors.sample(), self.rng.random() < 0.9, created, created,
+            )
+
+    def questions(self) -> Iterator[tuple]:
+        question_id = 1
+        for quiz_id in range(1, self.spec.quizzes + 1):
+            count = self.rng.randint(
+                self.spec.min_questions, self.spec.max_questions
+            )
+            self.quiz_first_question.append(question_id)
+            self.quiz_question_count.append(count)
+            created = self._timestamp()
+            for position in range(count):
+                pool_index = self.rng.randrange(len(self.option_pool))
+                options = self.option_pool[pool_index]
+                correct = self.rng.randrange(4)
+                points = self.rng.choice((1, 1, 1, 2, 3))
+                self.question_options.append(pool_index)
+                self.question_correct.append(correct)
+                self.question_points.append(points)
+                yield (
+                    question_id, quiz_id,
+                    f"Question {position + 1} of quiz {quiz_id}: "
+                    f"which one is {options[correct]}?",
+                    json.dumps(options), options[correct], points,
+                    created, created,
+                )
+                question_id += 1
+
+    def results(self) -> Iterator[tuple]:
+        quizzes = ZipfSampler(self.spec.quizzes, self.spec.zipf, self.rng)
+        users = ZipfSampler(self.spec.users, self.spec.zipf * 0.8, self.rng)
+        dumps = json.dumps
+        rng = self.rng
+        for n in range(1, self.spec.results + 1):
+            quiz_id = quizzes.sample()
+            first = self.quiz_first_question[quiz_id - 1]
+            count = self.quiz_question_count[quiz_id - 1]
+            skill = rng.random()
+            answers = {}
+            score = max_score = correct_answers = 0
+            for question_id in range(first, first + count):
+                index = question_id - 1
+                options = self.option_pool[self.question_options[index]]
+                points = self.question_points[index]
+                max_score += points
+                if rng.random() < 0.05:
+                    continue  # skipped question
+                correct = self.question_correct[index]
+                if rng.random() < 0.25 + 0.7 * skill:
+                    choice = correct
+                    score += points
+                    correct_answers += 1
+                else:
+                    choice = (correct + rng.randrange(1, 4)) % 4
+                answers[str(question_id)] = options[choice]
+            self.quiz_attempts[quiz_id - 1] += 1
+            self.quiz_score_sum[quiz_id - 1] += score
+            self.quiz_max_score_sum[quiz_id - 1] += max_score
+            completed = self._timestamp()
+            yield (
+                n, quiz_id, users.sample(), score, max_score,
+                correct_answers, dumps(answers), completed, completed,
+                completed,
+            )
+
+    def counters(self) -> Iterator[tuple]:
+        """Counter values of every quiz, after ``questions`` and ``results``."""
+        for index in range(self.spec.quizzes):
+            yield (
+                self.quiz_question_count[index], self.quiz_attempts[index],
+                self.quiz_score_sum[index], self.quiz_max_score_sum[index],
+                index + 1,
+            )
+
+
+USER_COLUMNS = [
+    "id", "username", "email", "hashed_password", "is_active",
+    "is_superuser", "created_at", "updated_at",
+]
+QUIZ_COLUMNS = [
+    "id", "title", "description", "author_id", "is_public",
+    "created_at", "updated_at",
+]
+QUESTION_COLUMNS = [
+    "id", "quiz_id", "text", "options", "correct_answer", "points",
+    "created_at", "updated_at",
+]
+RESULT_COLUMNS = [
+    "id", "quiz_id", "user_id", "score", "max_score", "correct_answers",
+    "answers", "completed_at", "created_at", "updated_at",
+]
+UPDATE_COUNTERS = (
+    "UPDATE quiz SET question_count = ?, attempt_count = ?, score_sum = ?, "
+    "max_score_sum = ? WHERE id = ?"
+)
+# Answer rows as src.crud.quiz.fill_answer_rows stores them, in one pass
+# over the results
+INSERT_ANSWER_ROWS = """
+INSERT INTO quizresult_answer (result_id, question_id, option_index,
+                               is_correct)
+SELECT result.id,
+       question.id,
+       (SELECT CAST(option.key AS INTEGER)
+        FROM json_each(question.options) AS option
+        WHERE option.value = answer.value),
+       answer.value = question.correct_answer
+FROM quizresult AS result, json_each(result.answers) AS answer
+JOIN question ON question.id = CAST(answer.key AS INTEGER)
+"""
+
+
+def _log_load(log: Any, table: str, count: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    log(
+        f"{table:<18}{count:>12,} rows{elapsed:>9.1f}s"
+        f"{count / max(elapsed, 1e-9):>12,.0f} rows/s\n"
+    )
+
+
+def generate(
+    path: Path, spec: DatasetSpec, log: Any = None
+) -> dict[str, int]:
+    """Create ``path`` and fill it; returns the row count per table."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    generator = Generator(spec)
+    plan = [
+        (User.__table__, USER_COLUMNS, generator.users),
+        (Quiz.__table__, QUIZ_COLUMNS, generator.quizzes),
+        (Question.__table__, QUESTION_COLUMNS, generator.questions),
+        (QuizResult.__table__, RESULT_COLUMNS, generator.results),
+    ]
+    counts = {}
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for pragma in LOAD_PRAGMAS:
+            cursor.execute(pragma)
+        for table, columns, rows in plan:
+            started = time.perf_counter()
+            sql = insert_sql(table, columns, engine.dialect)
+            counts[table.name] = bulk_insert(
+                cursor, sql, rows(), spec.chunk_size
+            )
+            connection.commit()
+            if log:
+                _log_load(log, table.name, counts[table.name], started)
+        cursor.executemany(UPDATE_COUNTERS, generator.counters())
+        started = time.perf_counter()
+        cursor.execute(INSERT_ANSWER_ROWS)
+        counts[quiz_result_answer.name] = cursor.rowcount
+        connection.commit()
+        if log:
+            _log_load(
+                log, quiz_result_answer.name,
+                counts[quiz_result_answer.name], started,
+            )
+        cursor.execute("ANALYZE")
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+    engine.dispose()
+    return counts
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", type=Path, default=Path("synthetic.db"))
+    parser.add_argument("--force", action="store_true",
+                        help="Overwrite the output file if it exists")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--quizzes", type=int, default=defaults.quizzes)
+    parser.add_argument("--results", type=int, default=defaults.results)
+    parser.add_argument("--min-questions", type=int,
+                        default=defaults.min_questions)
+    parser.add_argument("--max-questions", type=int,
+                        default=defaults.max_questions)
+    parser.add_argument("--zipf", type=float, default=defaults.zipf,
+                        help="Zipf exponent of quiz popularity")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.output.exists():
+        if not args.force:
+            sys.stderr.write(f"{args.output} exists, use --force\n")
+            return 1
+        args.output.unlink()
+    spec = DatasetSpec(
+        users=args.users,
+        quizzes=args.quizzes,
+        results=args.results,
+        min_questions=args.min_questions,
+        max_questions=args.max_questions,
+        zipf=args.zipf,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+    )
+    started = time.perf_counter()
+    generate(args.output, spec, log=sys.stdout.write)
+    sys.stdout.write(
+        f"Wrote {args.output} in {time.perf_counter() - started:.1f}s\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
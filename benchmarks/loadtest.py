@@ -0,0 +1,369 @@
+"""Load test harness driving the API with weighted user scenarios.
+
+By default the application runs in-process on a scratch SQLite database, so
+results do not depend on the network. Pass ``--base-url`` to load a running
+server instead. Examples::
+
+    python -m benchmarks.loadtest --users 20 --duration 30
+    python -m benchmarks.loadtest --base-url http://localhost:8000
+    python -m benchmarks.loadtest --scenario login=0 --scenario submit_quiz=10
+    python -m benchmarks.loadtest --record benchmarks/baselines/loadtest.json
+    python -m benchmarks.loadtest --compare benchmarks/baselines/loadtest.json
+
+``--compare`` exits with status 1 when throughput drops or p95 latency grows
+by more than ``--tolerance`` against the baseline, or errors appear.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Generator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.scenarios import (API, DEFAULT_SCENARIOS, Scenario,
+                                  VirtualUser, login, with_weights)
+
+PASSWORD = "loadtest-password"  # noqa: S105
+
+
+@dataclass
+class LoadTestConfig:
+    """Parameters of one load test run."""
+
+    users: int = 10
+    duration: float = 10.0
+    warmup: float = 2.0
+    quizzes: int = 5
+    questions: int = 10
+    seed: int = 0
+    base_url: str | None = None
+    scenarios: tuple[Scenario, ...] = DEFAULT_SCENARIOS
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "mode": "http" if self.base_url else "in-process",
+            "users": self.users,
+            "duration": self.duration,
+            "quizzes": self.quizzes,
+            "questions": self.questions,
+            "seed": self.seed,
+            "weights": {s.name: s.weight for s in self.scenarios},
+        }
+
+
+@dataclass
+class Recorder:
+    """Latencies and errors per scenario, recorded after warm-up only."""
+
+    measure_from: float
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def add(self, name: str, started: float, elapsed: float, ok: bool) -> None:
+        if started < self.measure_from:
+            return
+        self.latencies.setdefault(name, []).append(elapsed)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Throughput and latency percentiles (in milliseconds) of a sample."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 2) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p90_ms": round(percentile(ordered, 90) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if count else 0.0,
+    }
+
+
+def compare(
+    report: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Return a description of every regression against the baseline."""
+    regressions = []
+    expected = {"total": baseline["total"], **baseline["scenarios"]}
+    actual = {"total": report["total"], **report["scenarios"]}
+    for name, base in expected.items():
+        current = actual.get(name)
+        if current is None:
+            regressions.append(f"{name}: no requests recorded")
+            continue
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput']}/s "
+                f"< baseline {base['throughput']}/s"
+            )
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']} ms "
+                f"> baseline {base['p95_ms']} ms"
+            )
+        if current["errors"] > base["errors"]:
+            regressions.append(
+                f"{name}: {current['errors']} errors "
+                f"> baseline {base['errors']}"
+            )
+    return regressions
+
+
+def _quiz_payload(index: int, questions: int) -> dict[str, Any]:
+    return {
+        "title": f"Load test quiz {index}",
+        "description": "Generated by benchmarks.loadtest",
+        "is_public": True,
+        "questions": [
+            {
+                "text": f"Question {n} of quiz {index}?",
+                "options": ["A", "B", "C", "D"],
+                "correct_answer": "ABCD"[n % 4],
+                "points": 1 + n % 3,
+            }
+            for n in range(questions)
+        ],
+    }
+
+
+async def setup(
+    client: httpx.AsyncClient, config: LoadTestConfig
+) -> list[VirtualUser]:
+    """Register and log in users, then create the quizzes they will take."""
+    users = []
+    for index in range(config.users):
+        user = VirtualUser(
+            username=f"loadtest{config.seed}u{index}",
+            password=PASSWORD,
+            rng=random.Random(config.seed * 1000 + index),
+        )
+        await client.post(
+            f"{API}/auth/register",
+            json={
+                "username": user.username,
+                "email": f"{user.username}@example.com",
+                "password": user.password,
+            },
+        )
+        response = await login(client, user)
+        response.raise_for_status()
+        users.append(user)
+
+    author = users[0]
+    quiz_ids = []
+    for index in range(config.quizzes):
+        response = await client.post(
+            f"{API}/quizzes/",
+            headers=author.headers,
+            json=_quiz_payload(index, config.questions),
+        )
+        response.raise_for_status()
+        quiz_ids.append(response.json()["id"])
+
+    for user in users:
+        for quiz_id in quiz_ids:
+            response = await client.get(
+                f"{API}/quizzes/{quiz_id}", headers=user.headers
+            )
+            response.raise_for_status()
+            user.quizzes[quiz_id] = response.json()["questions"]
+    return users
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    user: VirtualUser,
+    scenarios: tuple[Scenario, ...],
+    deadline: float,
+    recorder: Recorder,
+) -> None:
+    weights = [s.weight for s in scenarios]
+    while time.perf_counter() < deadline:
+        scenario = user.rng.choices(scenarios, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await scenario.run(client, user)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        recorder.add(scenario.name, started, time.perf_counter() - started, ok)
+
+
+@asynccontextmanager
+async def in_process_client(db_path: Path) -> AsyncIterator[httpx.AsyncClient]:
+    """Serve a fresh application on a scratch SQLite database."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session, sessionmaker
+
+    import src.models.quiz  # noqa: F401  register models
+    import src.models.user  # noqa: F401
+    from src.main import create_app
+    from src.models.base import Base
+    from src.utils.dependencies import get_db
+
+    engine = create_engine(
+        f"sqlite:///{db_path}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(
+        bind=engine, autoflush=False, expire_on_commit=False
+    )
+
+    def get_loadtest_db() -> Generator[Session, None, None]:
+        with session_factory() as session:
+            yield session
+
+    app = create_app()
+    app.dependency_overrides[get_db] = get_loadtest_db
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest"
+        ) as client:
+            yield client
+    finally:
+        engine.dispose()
+
+
+@asynccontextmanager
+async def open_client(config: LoadTestConfig) -> AsyncIterator[httpx.AsyncClient]:
+    if config.base_url:
+        async with httpx.AsyncClient(
+            base_url=config.base_url, timeout=30.0
+        ) as client:
+            yield client
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        async with in_process_client(Path(tmp) / "loadtest.db") as client:
+            yield client
+
+
+async def run_async(config: LoadTestConfig) -> dict[str, Any]:
+    """Run the load test and return the report."""
+    async with open_client(config) as client:
+        users = await setup(client, config)
+        start = time.perf_counter()
+        recorder = Recorder(measure_from=start + config.warmup)
+        deadline = start + config.warmup + config.duration
+        await asyncio.gather(*(
+            _virtual_user(client, user, config.scenarios, deadline, recorder)
+            for user in users
+        ))
+        elapsed = time.perf_counter() - recorder.measure_from
+
+    scenarios = {
+        name: summarize(latencies, recorder.errors.get(name, 0), elapsed)
+        for name, latencies in sorted(recorder.latencies.items())
+    }
+    all_latencies = [t for ts in recorder.latencies.values() for t in ts]
+    return {
+        "config": config.describe(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "total": summarize(
+            all_latencies, sum(recorder.errors.values()), elapsed
+        ),
+        "scenarios": scenarios,
+    }
+
+
+def run(config: LoadTestConfig) -> dict[str, Any]:
+    return asyncio.run(run_async(config))
+
+
+def format_report(report: dict[str, Any]) -> str:
+    columns = ("requests", "errors", "throughput", "p50_ms", "p95_ms", "p99_ms")
+    lines = [f"{'scenario':<18}" + "".join(f"{c:>12}" for c in columns)]
+    rows = {**report["scenarios"], "total": report["total"]}
+    for name, stats in rows.items():
+        lines.append(
+            f"{name:<18}" + "".join(f"{stats[c]:>12}" for c in columns)
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _parse_weight(value: str) -> tuple[str, float]:
+    name, _, weight = value.partition("=")
+    try:
+        return name, float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected name=weight, got {value!r}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", help="Load a running server over HTTP")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--quizzes", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scenario", type=_parse_weight, action="append", default=[],
+        metavar="NAME=WEIGHT", help="Override a scenario weight (0 disables)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the report here")
+    parser.add_argument("--record", type=Path, help="Save as a new baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    config = LoadTestConfig(
+        users=args.users,
+        duration=args.duration,
+        warmup=args.warmup,
+        quizzes=args.quizzes,
+        questions=args.questions,
+        seed=args.seed,
+        base_url=args.base_url,
+        scenarios=with_weights(dict(args.scenario)),
+    )
+    report = run(config)
+    sys.stdout.write(format_report(report))
+
+    for path in (args.output, args.record):
+        if path:
+            path.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline["config"] != report["config"]:
+            sys.stdout.write("warning: baseline was recorded with another config\n")
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            sys.stdout.write(f"REGRESSION {regression}\n")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+"""Microbenchmarks for the hot paths in crud, auth and schemas.
+
+Every benchmark runs against a freshly seeded SQLite database whose size is
+set on the command line. Timings are collected over several rounds with the
+garbage collector disabled, and reported per call. Examples::
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro -k leaderboard --results 100000
+    python -m benchmarks.micro --json bench.json
+
+The JSON output carries the commit and database size next to the timings so
+runs can be collected and compared across commits.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.base import Base
+from src.models.quiz import Question, Quiz, QuizResult
+from src.models.user import User
+
+BENCHMARKS: dict[str, Callable[["Context"], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """Register a benchmark.
+
+    The decorated function receives the seeded context, does any setup and
+    returns the zero-argument callable that is actually timed.
+    """
+    def decorator(fn: Callable) -> Callable:
+        BENCHMARKS[name] = fn
+        return fn
+    return decorator
+
+
+@dataclass
+class DatasetSize:
+    users: int = 100
+    quizzes: int = 200
+    questions: int = 20
+    results: int = 10_000
+    large_quiz_questions: int = 500
+
+
+@dataclass
+class Context:
+    """Seeded database shared by the benchmarks of one run."""
+
+    session: Session
+    size: DatasetSize
+    quiz_id: int
+    large_quiz_id: int
+    user_id: int
+
+
+def seed(session: Session, size: DatasetSize, seed: int = 0) -> Context:
+    """Fill an empty database with users, quizzes, questions and results."""
+    rng = random.Random(seed)
+    session.execute(insert(User), [
+        {
+            "username": f"user{n}",
+            "email": f"user{n}@example.com",
+            "hashed_password": "x",
+        }
+        for n in range(size.users)
+    ])
+    session.execute(insert(Quiz), [
+        {"title": f"Quiz {n}", "author_id": 1 + n % size.users}
+        for n in range(size.quizzes + 1)
+    ])
+    options = ["A", "B", "C", "D"]
+    questions = [
+        {
+            "quiz_id": quiz_id,
+            "text": f"Question {n}?",
+            "options": options,
+            "correct_answer": rng.choice(options),
+            "points": 1,
+        }
+        for quiz_id in range(1, size.quizzes + 1)
+        for n in range(size.questions)
+    ]
+    large_quiz_id = size.quizzes + 1
+    questions += [
+        {
+            "quiz_id": large_quiz_id,
+            "text": f"Large quiz question {n}?",
+            "options": options,
+            "correct_answer": rng.choice(options),
+            "points": 1,
+        }
+        for n in range(size.large_quiz_questions)
+    ]
+    session.execute(insert(Question), questions)
+
+    # Results are concentrated on the first quiz, the one benchmarked
+    session.execute(insert(QuizResult), [
+        {
+            "quiz_id": 1 if n % 2 else 1 + n % size.quizzes,
+            "user_id": 1 + n % size.users,
+            "score": rng.randint(0, size.questions),
+            "max_score": size.questions,
+            "correct_answers": 0,
+            "answers": {},
+        }
+        for n in range(size.results)
+    ])
+    session.commit()
+    return Context(
+        session=session,
+        size=size,
+        quiz_id=1,
+        large_quiz_id=large_quiz_id,
+        user_id=1,
+    )
+
+
+@benchmark("crud.create_quiz_result")
+def bench_create_quiz_result(ctx: Context) -> Callable[[], Any]:
+    from src.crud.quiz import create_quiz_result
+    from src.schemas.quiz import QuizResultCreate
+
+    questions = ctx.session.execute(
+        select(Question).filter(Question.quiz_id == ctx.quiz_id)
+    ).scalars().all()
+    submission = QuizResultCreate(answers=[
+        {"question_id": q.id, "answer": q.options[0]} for q in questions
+    ])
+    return lambda: create_quiz_result(
+        ctx.session, submission, ctx.quiz_id, ctx.user_id
+    )
+
+
+@benchmark("crud.get_quiz_leaderboard")
+def bench_leaderboard(ctx: Context) -> Callable[[], Any]:
+    from src.crud.quiz import get_quiz_leaderboard
+
+    return lambda: get_quiz_leaderboard(ctx.session, ctx.quiz_id)
+
+
+@benchmark("crud.get_quizzes")
+def bench_get_quizzes(ctx: Context) -> Callable[[], Any]:
+    from src.crud.quiz import get_quizzes
+
+    def run() -> Any:
+        quizzes = get_quizzes(ctx.session, limit=100)
+        ctx.session.expunge_all()  # measure loading, not the identity map
+        return quizzes
+    return run
+
+
+@benchmark("schemas.QuizResponse.serialize_large_quiz")
+def bench_serialize_quiz(ctx: Context) -> Callable[[], Any]:
+    from src.crud.quiz import get_quiz
+    from src.schemas.quiz import QuizResponse
+
+    quiz = get_quiz(ctx.session, ctx.large_quiz_id)
+    return lambda: QuizResponse.model_validate(quiz).model_dump_json()
+
+
+@benchmark("auth.create_access_token")
+def bench_create_token(_: Context) -> Callable[[], Any]:
+    from src.auth.utils import create_access_token
+
+    return lambda: create_access_token(
+        {"sub": "user1", "scopes": ["user"]}, timedelta(minutes=5)
+    )
+
+
+@benchmark("auth.jwt_decode")
+def bench_decode_token(_: Context) -> Callable[[], Any]:
+    from jose import jwt
+
+    from src.auth.utils import ALGORITHM, SECRET_KEY, create_access_token
+
+    token = create_access_token({"sub": "user1", "scopes": ["user"]})
+    return lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+@benchmark("schemas.QuestionBase.validate_correct_answer")
+def bench_validate_question(_: Context) -> Callable[[], Any]:
+    from src.schemas.quiz import QuestionCreate
+
+    options = [f"Option {n}" for n in range(50)]
+    payload = {
+        "text": "Which option?",
+        "options": options,
+        "correct_answer": options[-1],
+    }
+    return lambda: QuestionCreate.model_validate(payload)
+
+
+@benchmark("import.jsonl_1000_questions")
+def bench_import_questions(ctx: Context) -> Callable[[], Any]:
+    import io
+
+    from src.utils.quiz_import import import_quizzes, parse_jsonl
+
+    content = b"".join(
+        json.dumps({
+            "quiz": f"import{n // 20}",
+            "text": f"Question {n}?",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": "B",
+        }).encode() + b"\n"
+        for n in range(1000)
+    )
+    return lambda: import_quizzes(
+        ctx.session, parse_jsonl(io.BytesIO(content)), ctx.user_id
+    )
+
+
+def _quiz_list(ctx: Context) -> list[Quiz]:
+    from src.crud.quiz import get_quizzes
+
+    return get_quizzes(ctx.session, limit=100)
+
+
+def _fastapi_response(type_: Any, render: Callable[[Any], bytes]) -> Callable:
+    """Mimic FastAPI's response_model path: validate, dump, then render."""
+    from fastapi.utils import create_model_field
+
+    field = create_model_field("response", type_, mode="serialization")
+
+    def respond(value: Any) -> bytes:
+        validated, _ = field.validate(value, {}, loc=("response",))
+        return render(field.serialize(validated, mode="json"))
+    return respond
+
+
+def _render_stdlib(content: Any) -> bytes:
+    from starlette.responses import JSONResponse
+
+    return JSONResponse(content).body
+
+
+def _render_orjson(content: Any) -> bytes:
+    from fastapi.responses import ORJSONResponse
+
+    return ORJSONResponse(content).body
+
+
+@benchmark("response.quiz_list.fastapi_json")
+def bench_quiz_list_fastapi(ctx: Context) -> Callable[[], Any]:
+    from src.schemas.quiz import QuizResponse
+
+    quizzes = _quiz_list(ctx)
+    respond = _fastapi_response(list[QuizResponse], _render_stdlib)
+    return lambda: respond(quizzes)
+
+
+@benchmark("response.quiz_list.fastapi_orjson")
+def bench_quiz_list_orjson(ctx: Context) -> Callable[[], Any]:
+    from src.schemas.quiz import QuizResponse
+
+    quizzes = _quiz_list(ctx)
+    respond = _fastapi_response(list[QuizResponse], _render_orjson)
+    return lambda: respond(quizzes)
+
+
+@benchmark("response.quiz_list.serializer")
+def bench_quiz_list_serializer(ctx: Context) -> Callable[[], Any]:
+    from src.schemas.quiz import quiz_list_serializer
+
+    quizzes = _quiz_list(ctx)
+    return lambda: quiz_list_serializer.to_json(quizzes)
+
+
+def _leaderboard(ctx: Context) -> Any:
+    from src.crud.quiz import get_quiz_leaderboard
+    from src.schemas.quiz import LeaderboardEntry, LeaderboardResponse
+
+    entries = [
+        LeaderboardEntry(**entry)
+        for entry in get_quiz_leaderboard(ctx.session, ctx.quiz_id, 100)
+    ]
+    return LeaderboardResponse(
+        quiz_id=ctx.quiz_id, quiz_title="Quiz", entries=entries
+    )
+
+
+@benchmark("response.leaderboard.fastapi_json")
+def bench_leaderboard_fastapi(ctx: Context) -> Callable[[], Any]:
+    from src.schemas.quiz import LeaderboardResponse
+
+    leaderboard = _leaderboard(ctx)
+    respond = _fastapi_response(LeaderboardResponse, _render_stdlib)
+    return lambda: respond(leaderboard)
+
+
+@benchmark("response.leaderboard.serializer_trusted")
+def bench_leaderboard_trusted(ctx: Context) -> Callable[[], Any]:
+    from src.schemas.quiz import leaderboard_serializer
+
+    leaderboard = _leaderboard(ctx)
+    return lambda: leaderboard_serializer.to_json(leaderboard, trusted=True)
+
+
+@dataclass
+class Timing:
+    name: str
+    rounds: int
+    iterations: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+    iqr: float
+
+    @property
+    def ops(self) -> float:
+        return 1 / self.median if self.median else 0.0
+
+
+def measure(
+    fn: Callable[[], Any], name: str, rounds: int, min_time: float
+) -> Timing:
+    """Time ``fn`` per call over ``rounds`` rounds of calibrated length."""
+    fn()  # warm up caches and lazy imports
+
+    # Calibrate so that one round takes at least min_time
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if time.perf_counter() - start >= min_time or iterations >= 1 << 20:
+            break
+        iterations *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            samples.append((time.perf_counter() - start) / iterations)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [0, 0, 0]
+    return Timing(
+        name=name,
+        rounds=rounds,
+        iterations=iterations,
+        min=min(samples),
+        median=statistics.median(samples),
+        mean=statistics.fmean(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        iqr=quartiles[2] - quartiles[0],
+    )
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    size: DatasetSize,
+    names: list[str],
+    rounds: int = 7,
+    min_time: float = 0.1,
+    seed_value: int = 0,
+) -> dict[str, Any]:
+    """Run the selected benchmarks and return a machine-readable report."""
+    timings = []
+    for name in names:
+        # A fresh database per benchmark keeps writes from skewing reads
+        engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+            ctx = seed(session, size, seed_value)
+            fn = BENCHMARKS[name](ctx)
+            timings.append(measure(fn, name, rounds, min_time))
+        engine.dispose()
+
+    return {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "dataset": asdict(size),
+            "seed": seed_value,
+        },
+        "benchmarks": [
+            {**asdict(timing), "ops": round(timing.ops, 2)}
+            for timing in timings
+        ],
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"{'benchmark':<48}{'median':>12}{'min':>12}{'iqr':>12}{'ops/s':>12}"
+    ]
+    for b in report["benchmarks"]:
+        lines.append(
+            f"{b['name']:<48}"
+            f"{b['median'] * 1e6:>10.1f}us"
+            f"{b['min'] * 1e6:>10.1f}us"
+            f"{b['iqr'] * 1e6:>10.1f}us"
+            f"{b['ops']:>12.1f}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    defaults = DatasetSize()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="keyword", default="",
+                        help="Only run benchmarks whose name contains this")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--quizzes", type=int, default=defaults.quizzes)
+    parser.add_argument("--questions", type=int, default=defaults.questions)
+    parser.add_argument("--results", type=int, default=defaults.results)
+    parser.add_argument("--large-quiz-questions", type=int,
+                        default=defaults.large_quiz_questions)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.1,
+                        help="Minimum seconds per round")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write the report here")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    names = [name for name in BENCHMARKS if args.keyword in name]
+    if not names:
+        sys.stderr.write(f"No benchmark matches {args.keyword!r}\n")
+        return 1
+    size = DatasetSize(
+        users=args.users,
+        quizzes=args.quizzes,
+        questions=args.questions,
+        results=args.results,
+        large_quiz_questions=args.large_quiz_questions,
+    )
+    report = run(size, names, args.rounds, args.min_time, args.seed)
+    sys.stdout.write(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
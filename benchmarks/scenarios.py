@@ -0,0 +1,123 @@
+"""User scenarios for the load test, mirroring the Streamlit frontend flows."""
+
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+API = "/api/v1"
+
+
+@dataclass
+class VirtualUser:
+    """State kept by one simulated user between requests."""
+
+    username: str
+    password: str
+    rng: random.Random
+    token: str | None = None
+    quizzes: dict[int, list[dict[str, Any]]] = field(default_factory=dict)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def pick_quiz(self) -> int:
+        return self.rng.choice(list(self.quizzes))
+
+
+ScenarioFn = Callable[[httpx.AsyncClient, VirtualUser], Awaitable[httpx.Response]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A single user action with its relative frequency."""
+
+    name: str
+    weight: float
+    run: ScenarioFn
+
+
+async def login(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    """Log in with username and password, as on the login page."""
+    response = await client.post(
+        f"{API}/auth/token",
+        data={
+            "username": user.username,
+            "password": user.password,
+            "scope": "user",
+        },
+    )
+    if response.status_code == 200:
+        user.token = response.json()["access_token"]
+    return response
+
+
+async def list_quizzes(
+    client: httpx.AsyncClient, user: VirtualUser
+) -> httpx.Response:
+    """Load the quiz list shown on the home page."""
+    return await client.get(f"{API}/quizzes/", headers=user.headers)
+
+
+async def take_quiz(
+    client: httpx.AsyncClient, user: VirtualUser
+) -> httpx.Response:
+    """Open a quiz to answer its questions."""
+    quiz_id = user.pick_quiz()
+    response = await client.get(f"{API}/quizzes/{quiz_id}", headers=user.headers)
+    if response.status_code == 200:
+        user.quizzes[quiz_id] = response.json()["questions"]
+    return response
+
+
+async def submit_quiz(
+    client: httpx.AsyncClient, user: VirtualUser
+) -> httpx.Response:
+    """Submit answers, picking a random option for every question."""
+    quiz_id = user.pick_quiz()
+    answers = [
+        {"question_id": q["id"], "answer": user.rng.choice(q["options"])}
+        for q in user.quizzes[quiz_id]
+    ]
+    return await client.post(
+        f"{API}/quizzes/{quiz_id}/results/",
+        headers=user.headers,
+        json={"answers": answers},
+    )
+
+
+async def view_leaderboard(
+    client: httpx.AsyncClient, user: VirtualUser
+) -> httpx.Response:
+    """Open the leaderboard of a quiz after finishing it."""
+    quiz_id = user.pick_quiz()
+    return await client.get(
+        f"{API}/quizzes/{quiz_id}/results/leaderboard", headers=user.headers
+    )
+
+
+DEFAULT_SCENARIOS = (
+    Scenario("login", 1, login),
+    Scenario("list_quizzes", 3, list_quizzes),
+    Scenario("take_quiz", 4, take_quiz),
+    Scenario("submit_quiz", 4, submit_quiz),
+    Scenario("view_leaderboard", 2, view_leaderboard),
+)
+
+
+def with_weights(
+    overrides: dict[str, float],
+    scenarios: tuple[Scenario, ...] = DEFAULT_SCENARIOS,
+) -> tuple[Scenario, ...]:
+    """Return scenarios with some weights replaced; weight 0 drops one."""
+    unknown = set(overrides) - {s.name for s in scenarios}
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {sorted(unknown)}")
+    return tuple(
+        Scenario(s.name, overrides.get(s.name, s.weight), s.run)
+        for s in scenarios
+        if overrides.get(s.name, s.weight) > 0
+    )
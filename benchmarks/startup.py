@@ -0,0 +1,163 @@
+"""Startup profile of the application factory.
+
+Imports ``src.main`` and calls ``create_app`` in a fresh interpreter started
+with ``-X importtime``, then reports where the time went: the slowest
+modules by cumulative and self time, and self time summed per top-level
+package. Examples::
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --top 40 --json startup-report.json
+    python -m benchmarks.startup --budget 1.5
+
+``--budget`` exits with status 1 when importing and creating the app takes
+longer than the given number of seconds.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must not be imported just to create the app
+DEFERRED_MODULES = ("bcrypt", "jose", "passlib", "pyarrow", "requests")
+
+DEFAULT_BUDGET = 3.0
+
+_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from src.main import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+sys.stdout.write(json.dumps({
+    "import_s": imported - started,
+    "create_app_s": created - imported,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Parse the ``-X importtime`` lines written to stderr."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        records.append(ImportRecord(
+            module=module.rstrip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=depth,
+        ))
+    return records
+
+
+def by_package(records: list[ImportRecord]) -> dict[str, int]:
+    """Self time in microseconds summed per top-level package."""
+    totals: dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.module.split(".")[0]] += record.self_us
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def profile_startup(top: int = 25) -> dict[str, Any]:
+    """Create the app in a fresh interpreter and return the startup report."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    timings = json.loads(completed.stdout)
+    records = parse_importtime(completed.stderr)
+    modules = set(timings.pop("modules"))
+    return {
+        **timings,
+        "total_s": timings["import_s"] + timings["create_app_s"],
+        "module_count": len(records),
+        "deferred_imported": [
+            name for name in DEFERRED_MODULES if name in modules
+        ],
+        "packages_us": dict(list(by_package(records).items())[:top]),
+        "slowest_cumulative": [
+            asdict(r) for r in sorted(
+                records, key=lambda r: -r.cumulative_us
+            )[:top]
+        ],
+        "slowest_self": [
+            asdict(r) for r in sorted(records, key=lambda r: -r.self_us)[:top]
+        ],
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"import src.main  {report['import_s'] * 1000:>9.1f} ms",
+        f"create_app()     {report['create_app_s'] * 1000:>9.1f} ms",
+        f"modules imported {report['module_count']:>9}",
+        "",
+        f"{'package':<40}{'self':>12}",
+    ]
+    for name, self_us in report["packages_us"].items():
+        lines.append(f"{name:<40}{self_us / 1000:>10.1f}ms")
+    lines += ["", f"{'module':<60}{'cumulative':>12}{'self':>12}"]
+    for record in report["slowest_cumulative"]:
+        name = "  " * record["depth"] + record["module"]
+        lines.append(
+            f"{name[:60]:<60}"
+            f"{record['cumulative_us'] / 1000:>10.1f}ms"
+            f"{record['self_us'] / 1000:>10.1f}ms"
+        )
+    if report["deferred_imported"]:
+        lines += ["", "imported eagerly: " + ", ".join(
+            report["deferred_imported"]
+        )]
+    return "\n".join(lines) + "\n"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--top", type=int, default=25,
+                        help="Number of modules and packages to list")
+    parser.add_argument("--budget", type=float,
+                        help="Fail if startup takes longer (seconds)")
+    parser.add_argument("--json", type=Path, help="Write the report here")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    report = profile_startup(args.top)
+    sys.stdout.write(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    if args.budget is not None and report["total_s"] > args.budget:
+        sys.stdout.write(
+            f"OVER BUDGET {report['total_s']:.2f}s > {args.budget:.2f}s\n"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,8 @@ API routers.
 
 from fastapi import APIRouter
 
-from src.api import auth, questions, quiz_results, quizzes, trivia, users
+from src.api import (admin, auth, questions, quiz_results, quizzes, trivia,
+                     users)
 
 api_router = APIRouter(prefix="/api/v1")
 
@@ -25,3 +26,4 @@ api_router.include_router(
     tags=["user results"]
 )
 api_router.include_router(trivia.router, prefix="/trivia", tags=["trivia"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,136 @@
+import json
+from dataclasses import asdict
+from typing import Annotated, Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from src.auth import get_current_admin_user
+from src.models.user import User
+from src.settings.snapshot import snapshot_settings
+from src.utils.dependencies import get_db
+from src.utils.profiling import SamplingProfiler, sampler
+from src.utils.snapshot import (MANIFEST, SnapshotInProgress,
+                                list_snapshot_files, read_manifest,
+                                write_snapshot)
+
+router = APIRouter()
+
+
+def get_sampler() -> SamplingProfiler:
+    """Return the sampling profiler, if it is running."""
+    if not sampler.running:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sampling profiler is not running",
+        )
+    return sampler
+
+
+@router.get("/profiler")
+def read_profiler_status(
+    _: Annotated[User, Depends(get_current_admin_user)],
+) -> dict[str, Any]:
+    """Get the state of the sampling profiler. Admin only."""
+    return {
+        "running": sampler.running,
+        "interval": sampler.interval,
+        "samples": sampler.samples,
+        "stacks": len(sampler.stacks()),
+        "started_at": sampler.started_at,
+    }
+
+
+@router.get("/profiler/flamegraph")
+def download_flamegraph(
+    _: Annotated[User, Depends(get_current_admin_user)],
+    profiler: Annotated[SamplingProfiler, Depends(get_sampler)],
+    format: Literal["folded", "speedscope"] = "folded",
+) -> Response:
+    """Download aggregated stacks as folded text or speedscope JSON.
+
+    - **format**: `folded` for flamegraph.pl / inferno, `speedscope` for
+      https://www.speedscope.app
+    """
+    if format == "speedscope":
+        return Response(
+            content=json.dumps(profiler.speedscope()),
+            media_type="application/json",
+            headers={
+                "Content-Disposition":
+                    'attachment; filename="profile.speedscope.json"'
+            },
+        )
+    return Response(
+        content=profiler.folded(),
+        media_type="text/plain",
+        headers={"Content-Disposition": 'attachment; filename="profile.folded"'},
+    )
+
+
+@router.delete("/profiler", status_code=status.HTTP_200_OK)
+def reset_profiler(
+    _: Annotated[User, Depends(get_current_admin_user)],
+    profiler: Annotated[SamplingProfiler, Depends(get_sampler)],
+) -> dict[str, str]:
+    """Discard the samples collected so far. Admin only."""
+    profiler.reset()
+    return {"detail": "Profiler samples cleared"}
+
+
+@router.get("/snapshots")
+def read_snapshots(
+    _: Annotated[User, Depends(get_current_admin_user)],
+) -> dict[str, Any]:
+    """List the analytics snapshot runs and files. Admin only."""
+    directory = snapshot_settings.directory
+    manifest = read_manifest(directory)
+    return {
+        "watermark": manifest["watermark"],
+        "runs": manifest["runs"],
+        "files": list_snapshot_files(directory),
+    }
+
+
+@router.post("/snapshots", status_code=status.HTTP_201_CREATED)
+def create_snapshot(
+    _: Annotated[User, Depends(get_current_admin_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> dict[str, Any]:
+    """Append the results added since the last snapshot. Admin only."""
+    try:
+        run = write_snapshot(db)
+    except SnapshotInProgress as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=str(e)
+        ) from None
+    return asdict(run)
+
+
+@router.get("/snapshots/files/{path:path}")
+def download_snapshot_file(
+    path: str,
+    _: Annotated[User, Depends(get_current_admin_user)],
+) -> FileResponse:
+    """Download a Parquet file or the manifest of the snapshots. Admin only.
+
+    - **path**: as listed by `GET /admin/snapshots`, e.g.
+      `results/quiz_id=1/month=2026-10/part-000001.parquet`
+    """
+    directory = snapshot_settings.directory.resolve()
+    file = (directory / path).resolve()
+    if (
+        not file.is_relative_to(directory)
+        or not (file.suffix == ".parquet" or file.name == MANIFEST)
+        or not file.is_file()
+    ):
+        raise HTTPException(status_code=404, detail="Snapshot file not found")
+    return FileResponse(
+        file,
+        media_type=(
+            "application/json" if file.name == MANIFEST
+            else "application/vnd.apache.parquet"
+        ),
+        filename=file.relative_to(directory).as_posix().replace("/", "_"),
+    )
@@ -4,10 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from src.auth import get_current_active_user
-from src.crud.quiz import (create_question, delete_question, get_question,
-                           get_questions, get_quiz, update_question)
+from src.crud.quiz import (apply_question_edits, create_question,
+                           delete_question, get_question, get_questions,
+                           get_quiz, get_quiz_author_id, update_question)
 from src.models.user import User
-from src.schemas.quiz import QuestionCreate, QuestionResponse, QuestionUpdate
+from src.schemas.quiz import (QuestionBulkEdit, QuestionCreate,
+                              QuestionResponse, QuestionUpdate)
 from src.utils.dependencies import get_db
 
 router = APIRouter()
@@ -56,6 +58,34 @@ def create_question_endpoint(
     return db_question
 
 
+@router.patch("/", response_model=list[QuestionResponse])
+def edit_questions(
+    quiz_id: int,
+    edit: QuestionBulkEdit,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> Any:
+    """Create, update and delete questions of a quiz in one request.
+
+    All operations are applied in a single transaction, or none if any
+    fails. Returns the questions of the quiz after the edit. Only the quiz
+    author or an admin can edit questions.
+    """
+    author_id = get_quiz_author_id(db, quiz_id)
+    if author_id is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    if author_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    try:
+        return apply_question_edits(db, quiz_id, edit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from None
+
+
 @router.get("/{question_id}", response_model=QuestionResponse)
 def read_question(
     quiz_id: int,
@@ -1,81 +1,186 @@
+from collections.abc import Iterator
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (APIRouter, Depends, Header, HTTPException, Request,
+                     Response, status)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from src.auth import get_current_active_user
-from src.crud.quiz import (create_quiz_result, get_questions,
-                           get_quiz, get_quiz_results as get_results_db,
+from src.crud.quiz import (RESULT_EXPORT_COLUMNS, create_quiz_result,
+                           create_quiz_results_batch, get_answer_counts,
+                           get_answer_key, get_answering_users, get_question,
+                           get_quiz, get_quiz_author_id,
+                           get_quiz_results as get_results_db,
                            get_quiz_leaderboard as get_leaderboard_db,
-                           get_user_results)
+                           get_user_results, grade_quiz_result,
+                           iter_quiz_results)
+from src.models.quiz import Question, QuizResult
 from src.models.user import User
-from src.schemas.quiz import (LeaderboardEntry, LeaderboardResponse,
-                              QuizResultCreate, QuizResultResponse)
-from src.utils.dependencies import get_db
+from src.schemas.quiz import (AnswerOptionStats, LeaderboardEntry,
+                              LeaderboardResponse, QuestionAnswerStats,
+                              QuestionAnswerUser, QuizResultAccepted,
+                              QuizResultBatch,
+                              QuizResultBatchResponse, QuizResultCreate,
+                              QuizResultResponse, leaderboard_serializer,
+                              quiz_result_accepted_serializer,
+                              quiz_result_batch_serializer,
+                              quiz_result_list_serializer,
+                              quiz_result_serializer)
+from src.settings.export import export_settings
+from src.settings.submissions import submission_settings
+from src.utils.dependencies import db_session_for, get_db
+from src.utils.export import (CSV, EXTENSIONS, NDJSON, csv_chunks,
+                              ndjson_chunks, negotiate)
+from src.utils.query_stats import QueryBudget
+from src.utils.single_flight import SingleFlight
+from src.utils.write_behind import QueueClosed, QueueFull
 
 router = APIRouter()
 user_results_router = APIRouter()
 
+leaderboard_flight: SingleFlight[bytes] = SingleFlight("leaderboard")
+
+
+def _check_submission(
+    db: Session, quiz_id: int, quiz_result_create: QuizResultCreate
+) -> None:
+    # Check if quiz exists
+    answer_key = get_answer_key(db, quiz_id)
+    if answer_key is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    # Validate all questions exists in this quiz
+    invalid_q = [
+        answer.question_id
+        for answer in quiz_result_create.answers
+        if answer.question_id not in answer_key.answers
+    ]
+
+    if invalid_q:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Questions with IDs {invalid_q} not found in quiz",
+        )
+
+
+def _store_submission(
+    db: Session,
+    quiz_id: int,
+    quiz_result_create: QuizResultCreate,
+    user_id: int,
+) -> QuizResult:
+    _check_submission(db, quiz_id, quiz_result_create)
+    return create_quiz_result(db, quiz_result_create, quiz_id, user_id)
+
+
+def _grade_submission(
+    db: Session,
+    quiz_id: int,
+    quiz_result_create: QuizResultCreate,
+    user_id: int,
+) -> dict:
+    _check_submission(db, quiz_id, quiz_result_create)
+    return grade_quiz_result(db, quiz_result_create, quiz_id, user_id)
+
 
 @router.post(
     "/",
     response_model=QuizResultResponse,
-    status_code=status.HTTP_201_CREATED
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {
+        "model": QuizResultAccepted,
+        "description": "Graded and queued to be stored",
+    }},
 )
-def submit_quiz_result(
+async def submit_quiz_result(
     quiz_id: int,
     quiz_result_create: QuizResultCreate,
+    request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
 ) -> Any:
-    """Submit a quiz result with answers."""
-    # Check if quiz exists
-    quiz = get_quiz(db, quiz_id)
-    if not quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found")
-
-    # Validate all questions exists in this quiz
-    answers = quiz_result_create.answers
-    question_ids = [answer.question_id for answer in answers]
-    db_questions = get_questions(db, quiz_id)
-    db_question_ids = [q.id for q in db_questions]
+    """Submit a quiz result with answers.
 
-    # Find invalid question IDs
-    invalid_q = []
-    for qid in question_ids:
-        if qid not in db_question_ids:
-            invalid_q.append(qid)
+    With the write-behind queue enabled the result is graded right away
+    and stored in a group commit with other submissions. Depending on the
+    configured durability the response waits for that commit, or is a 202
+    without an id as soon as the result is queued.
+    """
+    queue = getattr(request.app.state, "submission_queue", None)
+    if queue is None:
+        return await run_in_threadpool(
+            _store_submission, db, quiz_id, quiz_result_create,
+            current_user.id,
+        )
 
-    if invalid_q:
+    graded = await run_in_threadpool(
+        _grade_submission, db, quiz_id, quiz_result_create, current_user.id
+    )
+    try:
+        stored = await queue.submit(graded)
+    except (QueueFull, QueueClosed):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Questions with IDs {invalid_q} not found in quiz",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many submissions, please retry",
+            headers={"Retry-After": "1"},
+        ) from None
+    if stored is None:
+        return quiz_result_accepted_serializer.response(
+            graded, status_code=status.HTTP_202_ACCEPTED
         )
+    return quiz_result_serializer.response(
+        stored, status_code=status.HTTP_201_CREATED
+    )
+
 
-    # Create the quiz result
-    result = create_quiz_result(
-        db, quiz_result_create, quiz.id, current_user.id
+@user_results_router.post("/batch", response_model=QuizResultBatchResponse)
+def submit_quiz_results_batch(
+    batch: QuizResultBatch,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> Response:
+    """Submit results of several quizzes at once, e.g. collected offline.
+
+    Every submission gets its own status: `created`, `duplicate` or
+    `error`. Valid submissions are stored in one transaction. Resending a
+    submission with the same `idempotency_key` returns the stored result
+    instead of creating another, so failed uploads can be retried.
+    """
+    outcomes = create_quiz_results_batch(
+        db, batch.submissions, current_user.id
     )
-    return result
+    statuses = [outcome.status for outcome in outcomes]
+    return quiz_result_batch_serializer.response({
+        "created": statuses.count("created"),
+        "duplicates": statuses.count("duplicate"),
+        "errors": statuses.count("error"),
+        "items": [
+            {
+                "index": index,
+                "status": outcome.status,
+                "result": outcome.result,
+                "detail": outcome.detail,
+            }
+            for index, outcome in enumerate(outcomes)
+        ],
+    })
 
 
-@user_results_router.get("/user", response_model=list[QuizResultResponse])
+@user_results_router.get(
+    "/user",
+    response_model=list[QuizResultResponse],
+    dependencies=[Depends(QueryBudget(2))],
+)
 def get_my_quiz_results(
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
-) -> Any:
-    """Get all quiz results for the current user."""
+) -> Response:
+    """Get all quiz results for the current user, archived ones included."""
+    # Quiz titles and usernames are joined in, in a single query
     results = get_user_results(db, current_user.id)
-
-    # Get quiz titles
-    for result in results:
-        quiz = get_quiz(db, result.quiz_id)
-        result.quiz_title = quiz.title if quiz else "Unknown Quiz"
-        result.username = (
-            result.user.username if result.user else "Unknown User"
-        )
-
-    return results
+    return quiz_result_list_serializer.response(results, trusted=True)
 
 
 @router.get("/", response_model=list[QuizResultResponse])
@@ -83,8 +188,11 @@ def get_quiz_results(
     quiz_id: int,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
-) -> Any:
-    """Get results for a specific quiz. Only the author can see these."""
+) -> Response:
+    """Get results for a specific quiz, archived ones included.
+
+    Only the author can see these.
+    """
     # Check if quiz exists
     quiz = get_quiz(db, quiz_id)
     if not quiz:
@@ -95,40 +203,197 @@ def get_quiz_results(
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     results = get_results_db(db, quiz_id)
-    return results
+    return quiz_result_list_serializer.response(results, trusted=True)
 
 
-@router.get("/leaderboard", response_model=LeaderboardResponse)
-def get_quiz_leaderboard(
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON: {}, CSV: {}}}},
+)
+def export_quiz_results(
     quiz_id: int,
+    request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
-) -> Any:
-    """Get leaderboard for a quiz. Only available for public quizzes."""
-    # Check if quiz exists and is public
+    accept: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """Stream all results of a quiz. Only the author can export them.
+
+    The ``Accept`` header selects the format: ``application/x-ndjson``
+    (the default) or ``text/csv``. Rows are read from a server-side cursor
+    in batches, so memory use does not grow with the number of results.
+    """
+    media_type = negotiate(accept)
+    if media_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"Results can be exported as {NDJSON} or {CSV}",
+        )
+
     quiz = get_quiz(db, quiz_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
+    if quiz.author_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    # The request session is closed before the body is sent, so the
+    # stream reads through a session of its own
+    def batches() -> Iterator[list[dict]]:
+        with db_session_for(request.app) as export_db:
+            yield from iter_quiz_results(
+                export_db, quiz_id, export_settings.batch_size
+            )
+
+    if media_type == CSV:
+        chunks = csv_chunks(RESULT_EXPORT_COLUMNS, batches())
+    else:
+        chunks = ndjson_chunks(batches())
+    filename = f"quiz-{quiz_id}-results.{EXTENSIONS[media_type]}"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-    if not quiz.is_public:
+
+def _leaderboard_json(request: Request, quiz_id: int) -> bytes:
+    with db_session_for(request.app) as db:
+        # Check if quiz exists and is public
+        quiz = get_quiz(db, quiz_id)
+        if not quiz:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+
+        if not quiz.is_public:
+            raise HTTPException(
+                status_code=403,
+                detail="Leaderboard available only for public quizzes",
+            )
+
+        leaderboard = get_leaderboard_db(db, quiz_id)
+        entries = []
+        for item in leaderboard:
+            entries.append(
+                LeaderboardEntry(
+                    username=item["username"],
+                    score=item["score"],
+                    max_score=item["max_score"],
+                    percentage=item["percentage"],
+                    completed_at=item["completed_at"],
+                )
+            )
+
+        response = LeaderboardResponse(
+            quiz_id=quiz_id, quiz_title=quiz.title, entries=entries
+        )
+        return leaderboard_serializer.to_json(response, trusted=True)
+
+
+@router.get("/leaderboard", response_model=LeaderboardResponse)
+async def get_quiz_leaderboard(
+    quiz_id: int,
+    request: Request,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> Response:
+    """Get leaderboard for a quiz. Only available for public quizzes.
+
+    Concurrent requests for the same leaderboard share one computation.
+    """
+    content = await leaderboard_flight.do(
+        quiz_id,
+        lambda: run_in_threadpool(_leaderboard_json, request, quiz_id),
+    )
+    return Response(content=content, media_type="application/json")
+
+
+def _answered_question(
+    db: Session, quiz_id: int, question_id: int, user: User
+) -> Question:
+    """Check that the user may see the answer statistics of a question."""
+    # Without answer rows for every submission the counts would be partial
+    if not submission_settings.answer_rows:
         raise HTTPException(
-            status_code=403,
-            detail="Leaderboard available only for public quizzes",
+            status_code=404, detail="Answer statistics are not enabled"
         )
+    author_id = get_quiz_author_id(db, quiz_id)
+    if author_id is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    if author_id != user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    question = get_question(db, question_id)
+    if question is None or question.quiz_id != quiz_id:
+        raise HTTPException(status_code=404, detail="Question not found")
+    return question
 
-    leaderboard = get_leaderboard_db(db, quiz_id)
-    entries = []
-    for item in leaderboard:
-        entries.append(
-            LeaderboardEntry(
-                username=item["username"],
-                score=item["score"],
-                max_score=item["max_score"],
-                percentage=item["percentage"],
-                completed_at=item["completed_at"],
-            )
+
+@router.get(
+    "/questions/{question_id}/stats", response_model=QuestionAnswerStats
+)
+def get_question_answer_stats(
+    quiz_id: int,
+    question_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> QuestionAnswerStats:
+    """Count how often each option of a question was picked and correct.
+
+    Only the author can see these. Options are counted by their index when
+    the answer was submitted and named as they are now. Archived results
+    are counted too.
+    """
+    question = _answered_question(db, quiz_id, question_id, current_user)
+    picked = {
+        index: AnswerOptionStats(
+            index=index, option=option, answers=0, correct=0
         )
+        for index, option in enumerate(question.options or [])
+    }
+    other = correct = 0
+    for row in get_answer_counts(db, question_id):
+        if row.is_correct:
+            correct += row.answers
+        if row.option_index is None:
+            other += row.answers
+            continue
+        stats = picked.setdefault(
+            row.option_index,
+            AnswerOptionStats(index=row.option_index, answers=0, correct=0),
+        )
+        stats.answers += row.answers
+        if row.is_correct:
+            stats.correct += row.answers
+    option_stats = sorted(picked.values(), key=lambda stats: stats.index)
+    return QuestionAnswerStats(
+        question_id=question_id,
+        answers=other + sum(stats.answers for stats in option_stats),
+        correct=correct,
+        options=option_stats,
+        other=other,
+    )
+
+
+@router.get(
+    "/questions/{question_id}/users",
+    response_model=list[QuestionAnswerUser],
+)
+def get_question_answer_users(
+    quiz_id: int,
+    question_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    correct: bool | None = None,
+    option: int | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[dict]:
+    """List the users who answered a question, by username.
 
-    return LeaderboardResponse(
-        quiz_id=quiz_id, quiz_title=quiz.title, entries=entries
+    Only the author can see these. ``correct`` keeps the users who answered
+    right or wrong, ``option`` those who picked the option at that index.
+    Archived results are included.
+    """
+    _answered_question(db, quiz_id, question_id, current_user)
+    return get_answering_users(
+        db, question_id, is_correct=correct, option_index=option,
+        skip=skip, limit=limit,
     )
@@ -1,43 +1,89 @@
-from typing import Annotated, Any
+import logging
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (APIRouter, BackgroundTasks, Depends, FastAPI, Header,
+                     HTTPException, Request, Response, UploadFile, status)
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from src.auth import get_current_active_user
-from src.crud.quiz import (create_quiz, delete_quiz, get_quiz, get_quizzes,
+from src.crud.quiz import (create_quiz, delete_quiz, delete_quiz_in_batches,
+                           get_cached_quiz_payload, get_quiz,
+                           get_quiz_version, get_quizzes, load_quiz_payload,
                            update_quiz)
 from src.models.user import User
-from src.schemas.quiz import QuizCreate, QuizResponse, QuizUpdate
-from src.utils.dependencies import get_db
+from src.schemas.quiz import (QuizCreate, QuizImportReport,
+                              QuizListResponse, QuizResponse, QuizUpdate,
+                              quiz_list_serializer)
+from src.utils.dependencies import db_session_for, get_db
+from src.utils.etag import etag_matches, make_etag
+from src.utils.orm import database_settings
+from src.utils.quiz_import import PARSERS, detect_format, import_quizzes
+from src.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+quiz_flight: SingleFlight[tuple[int, bytes]] = SingleFlight("quiz")
+
+
+def _load_quiz_payload(request: Request, quiz_id: int) -> tuple[int, bytes]:
+    with db_session_for(request.app) as db:
+        loaded = load_quiz_payload(db, quiz_id)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return loaded
+
 
-@router.get("/", response_model=list[QuizResponse])
+@router.get("/", response_model=list[QuizListResponse])
 def read_quizzes(
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
     skip: int = 0,
     limit: int = 100,
     my_quizzes: bool = False,
-) -> Any:
+) -> Response:
     """Get all quizzes. If my_quizzes is true, get only the user's quizzes."""
     author_id = current_user.id if my_quizzes else None
     quizzes = get_quizzes(db, skip=skip, limit=limit, author_id=author_id)
-    return quizzes
+    return quiz_list_serializer.response(quizzes)
 
 
 @router.get("/{quiz_id}", response_model=QuizResponse)
-def read_quiz(
+async def read_quiz(
     quiz_id: int,
+    request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
-) -> Any:
-    """Get a specific quiz."""
-    quiz = get_quiz(db, quiz_id)
-    if quiz is None:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Get a specific quiz.
+
+    The response carries an ``ETag`` derived from the quiz version and
+    ``If-None-Match`` is answered with 304. Serialized versions are cached,
+    and concurrent requests for the same version share one serialization.
+    """
+    version = await run_in_threadpool(get_quiz_version, db, quiz_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    return quiz
+    if etag_matches(if_none_match, make_etag(quiz_id, version)):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": make_etag(quiz_id, version)},
+        )
+
+    content = get_cached_quiz_payload(quiz_id, version)
+    if content is None:
+        version, content = await quiz_flight.do(
+            (quiz_id, version),
+            lambda: run_in_threadpool(_load_quiz_payload, request, quiz_id),
+        )
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={"ETag": make_etag(quiz_id, version)},
+    )
 
 
 @router.post(
@@ -55,6 +101,32 @@ def create_quiz_endpoint(
     return quiz
 
 
+@router.post("/import", response_model=QuizImportReport)
+def import_quizzes_endpoint(
+    file: UploadFile,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    format: Literal["jsonl", "csv"] | None = None,
+) -> Any:
+    """Import quizzes from a JSON lines or CSV file, one question per row.
+
+    - **file**: rows with `quiz` (key grouping the rows of one quiz),
+      `title`, `description`, `is_public`, `text`, `options`,
+      `correct_answer` and `points`
+    - **format**: `jsonl` or `csv`, guessed from the file name or media
+      type when omitted
+
+    Valid rows are imported in batches; the rest are listed in the report.
+    """
+    format = format or detect_format(file.filename, file.content_type)
+    if format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload a .jsonl or .csv file, or pass format",
+        )
+    return import_quizzes(db, PARSERS[format](file.file), current_user.id)
+
+
 @router.put("/{quiz_id}", response_model=QuizResponse)
 def update_quiz_endpoint(
     quiz_id: int,
@@ -75,13 +147,28 @@ def update_quiz_endpoint(
     return updated_quiz
 
 
+def _delete_quiz_in_background(app: FastAPI, quiz_id: int) -> None:
+    with db_session_for(app) as db:
+        deleted = delete_quiz_in_batches(
+            db, quiz_id, database_settings.delete_batch_size
+        )
+    logger.info("Deleted quiz %d with %d results", quiz_id, deleted)
+
+
 @router.delete("/{quiz_id}", status_code=status.HTTP_200_OK)
 def delete_quiz_endpoint(
     quiz_id: int,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
 ) -> Any:
-    """Delete a quiz. Only the author can delete it."""
+    """Delete a quiz. Only the author can delete it.
+
+    Quizzes with many attempts are deleted in the background, a batch of
+    results per transaction, and answered with 202.
+    """
     quiz = get_quiz(db, quiz_id)
     if quiz is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -90,5 +177,12 @@ def delete_quiz_endpoint(
     if quiz.author_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
+    if quiz.attempt_count > database_settings.background_delete_threshold:
+        background_tasks.add_task(
+            _delete_quiz_in_background, request.app, quiz_id
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"detail": "Quiz deletion started"}
+
     delete_quiz(db, quiz_id)
     return {"detail": "Quiz deleted successfully"}
@@ -1,7 +1,7 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from src.auth import get_current_active_user
 from src.crud.quiz import create_quiz
@@ -75,7 +75,7 @@ def get_trivia_questions(
 )
 def create_trivia_quiz(
     title: str,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[UserInDB, Depends(get_current_active_user)],
     description: str | None = None,
     amount: int = 10,
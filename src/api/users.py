@@ -1,13 +1,20 @@
+import logging
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import (APIRouter, BackgroundTasks, Depends, FastAPI,
+                     HTTPException, Request, Response, status)
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from src.auth import get_current_active_user, get_current_admin_user
-from src.crud.user import delete_user, get_user, get_users, update_user
+from src.crud.user import (delete_user, delete_user_in_batches, get_user,
+                           get_user_delete_size, get_users, update_user)
 from src.models.user import User
 from src.schemas.user import UserResponse, UserUpdate
-from src.utils.dependencies import get_db
+from src.utils.dependencies import db_session_for, get_db
+from src.utils.orm import database_settings
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -70,13 +77,32 @@ def update_user_api(
     return db_user
 
 
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def _delete_user_in_background(app: FastAPI, user_id: int) -> None:
+    with db_session_for(app) as db:
+        deleted = delete_user_in_batches(
+            db, user_id, database_settings.delete_batch_size
+        )
+    logger.info("Deleted user %d with %d results", user_id, deleted)
+
+
+@router.delete(
+    "/{user_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={202: {"description": "Deletion started in the background"}},
+)
 def delete_user_api(
     user_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
 ) -> Response:
-    """Delete a user."""
+    """Delete a user.
+
+    Users whose own and whose quizzes' results add up to many attempts are
+    deleted in the background, a batch of results per transaction, and
+    answered with 202.
+    """
     # Only allow users to delete themselves, unless they're an admin
     if user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -85,5 +111,17 @@ def delete_user_api(
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
+    if (
+        get_user_delete_size(db, user_id)
+        > database_settings.background_delete_threshold
+    ):
+        background_tasks.add_task(
+            _delete_user_in_background, request.app, user_id
+        )
+        return JSONResponse(
+            {"detail": "User deletion started"},
+            status_code=status.HTTP_202_ACCEPTED,
+        )
+
     delete_user(db, user_id=user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -4,11 +4,10 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
-from jose import JWTError, jwt
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-from src.auth.utils import ALGORITHM, SECRET_KEY, verify_password
+from src.auth.utils import decode_access_token, verify_password
 from src.schemas.user import TokenData, UserInDB
 from src.utils.dependencies import get_db
 
@@ -61,8 +60,10 @@ def get_current_user(
         headers={"WWW-Authenticate": authenticate_value},
     )
 
+    from jose import JWTError
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -1,36 +1,48 @@
-"""Authentication utilities."""
+"""Authentication utilities.
 
-from datetime import datetime, timedelta
-from typing import Any
+``jose`` and ``passlib`` are imported on first use rather than at import
+time, so that starting the application does not pay for them.
+"""
 
-from jose import jwt
-from passlib.context import CryptContext
+from datetime import datetime, timedelta
+from functools import cache
+from typing import TYPE_CHECKING, Any
 
 from src.settings.general import general_settings
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
 # Constants for JWT token
 SECRET_KEY = general_settings.secret_key
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 1 week
 
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@cache
+def get_pwd_context() -> "CryptContext":
+    """Password hashing configuration, created on first use."""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Get password hash."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(
     data: dict[str, Any], expires_delta: timedelta | None = None
 ) -> str:
     """Create access token."""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -41,3 +53,13 @@ def create_access_token(
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+
+def decode_access_token(token: str) -> dict[str, Any]:
+    """Decode and verify an access token.
+
+    Raises ``jose.JWTError`` if the token is invalid or expired.
+    """
+    from jose import jwt
+
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -0,0 +1,3 @@
+"""
+Operational commands, run as ``python -m src.commands.<name>``.
+"""
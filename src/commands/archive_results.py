@@ -0,0 +1,46 @@
+"""Move old quiz results to the archive database.
+
+Results completed more than ``ARCHIVE_AFTER_DAYS`` days ago move from the
+hot ``quizresult`` table to the file at ``ARCHIVE_PATH``, attached as
+``archive``, ``ARCHIVE_BATCH_SIZE`` per transaction. User history and
+exports keep reading them. Examples::
+
+    python -m src.commands.archive_results
+    python -m src.commands.archive_results --older-than-days 365
+
+Exits with status 2 if no archive is configured.
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+
+from src.crud.quiz import archive_old_results
+from src.settings.archive import archive_settings
+from src.utils.orm import archive_enabled, get_db_session
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--older-than-days", type=int,
+                        default=archive_settings.after_days,
+                        help="Days after which results are archived")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if not archive_enabled():
+        sys.stderr.write("No archive configured, set ARCHIVE_PATH\n")
+        return 2
+    before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+        days=args.older_than_days
+    )
+    with get_db_session() as db:
+        moved = archive_old_results(db, before, archive_settings.batch_size)
+    sys.stdout.write(f"{moved} results archived\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""Store the answers of stored quiz results as rows of quizresult_answer.
+
+Run once after enabling ``SUBMISSIONS_ANSWER_ROWS``, which from then on
+stores the rows of new submissions. Results that already have rows are
+skipped, so the command can be stopped and run again. Results already
+archived get no rows. Examples::
+
+    python -m src.commands.fill_answer_rows
+    python -m src.commands.fill_answer_rows --batch-size 5000
+"""
+
+import argparse
+import sys
+
+from src.crud.quiz import fill_answer_rows
+from src.utils.orm import get_db_session
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Results filled per transaction")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    with get_db_session() as db:
+        stored = fill_answer_rows(db, args.batch_size)
+    sys.stdout.write(f"{stored} answer rows stored\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
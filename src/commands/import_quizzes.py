@@ -0,0 +1,54 @@
+"""Import quizzes from a JSON lines or CSV file.
+
+Rows are validated and inserted in batches for the given author, see
+``src.utils.quiz_import`` for the columns. Examples::
+
+    python -m src.commands.import_quizzes quizzes.jsonl --author alice
+    python -m src.commands.import_quizzes export.txt --format csv --author bob
+
+Prints the import report as JSON and exits with status 1 if any row was
+rejected.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlalchemy import select
+
+from src.models.user import User
+from src.utils.orm import get_db_session
+from src.utils.quiz_import import PARSERS, detect_format, import_quizzes
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("file", type=Path, help="File to import")
+    parser.add_argument("--author", required=True,
+                        help="Username of the author of the quizzes")
+    parser.add_argument("--format", choices=sorted(PARSERS),
+                        help="Guessed from the file name when omitted")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    format = args.format or detect_format(args.file.name, None)
+    if format is None:
+        sys.stderr.write(f"Cannot tell the format of {args.file}\n")
+        return 2
+    with get_db_session() as db:
+        author_id = db.execute(
+            select(User.id).filter(User.username == args.author)
+        ).scalar()
+        if author_id is None:
+            sys.stderr.write(f"No user named {args.author!r}\n")
+            return 2
+        with args.file.open("rb") as stream:
+            report = import_quizzes(db, PARSERS[format](stream), author_id)
+    sys.stdout.write(report.model_dump_json(indent=2) + "\n")
+    return 1 if report.rows_rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Pack the stored JSON answers of quiz results and report the savings.
+
+Answers are packed into one byte per question, against the current
+version of their quiz, see ``src.utils.answer_packing``. Answers that are
+not one of the options stay JSON. The report compares the bytes stored in
+either format and how fast a sample of recent results decodes from each.
+Examples::
+
+    python -m src.commands.pack_answers
+    python -m src.commands.pack_answers --report
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from sqlalchemy import LargeBinary, cast, func, select
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import answers_of, get_answer_keys, pack_stored_answers
+from src.models.quiz import QuizResult
+from src.utils.orm import get_db_session
+
+
+def _stored_bytes(db: Session) -> dict[str, tuple[int, int]]:
+    """Results and bytes of answers stored as JSON and packed."""
+    json_bytes = func.length(cast(QuizResult.answers, LargeBinary))
+    packed = QuizResult.answers_packed.is_not(None)
+    stored = {}
+    for name, condition, size in (
+        ("JSON", ~packed, json_bytes),
+        ("packed", packed, func.length(QuizResult.answers_packed)),
+    ):
+        count, total = db.execute(
+            select(func.count(QuizResult.id), func.coalesce(func.sum(size), 0))
+            .where(condition)
+        ).one()
+        stored[name] = (count, total)
+    return stored
+
+
+def _rate(decode: Callable[[Any], Any], values: Sequence[Any]) -> float:
+    """Values decoded per second."""
+    start = time.perf_counter()
+    for value in values:
+        decode(value)
+    return len(values) / max(time.perf_counter() - start, 1e-9)
+
+
+def storage_report(db: Session, sample_size: int = 1000) -> dict:
+    """Compare JSON and packed answers in storage and decoding speed.
+
+    The latest results that fit their quiz's current layout are encoded
+    both ways to compare like with like.
+    """
+    rows = db.execute(
+        select(
+            QuizResult.quiz_id,
+            QuizResult.answers,
+            QuizResult.answers_packed,
+            QuizResult.answers_version,
+        )
+        .order_by(QuizResult.id.desc())
+        .limit(sample_size)
+    ).all()
+    texts, packed, layouts = [], [], []
+    answer_keys = get_answer_keys(db, {row.quiz_id for row in rows})
+    for row in rows:
+        answers = answers_of(db, row)
+        answer_key = answer_keys[row.quiz_id]
+        encoded = answer_key.layout.pack(answers) if answer_key else None
+        if encoded is None:
+            continue
+        texts.append(json.dumps(answers))
+        packed.append(encoded)
+        layouts.append(answer_key.layout)
+    pairs = list(zip(layouts, packed))
+    return {
+        "stored": _stored_bytes(db),
+        "sample": len(texts),
+        "sample_bytes": {
+            "JSON": sum(len(text.encode()) for text in texts),
+            "packed": sum(len(value) for value in packed),
+        },
+        "decoded_per_second": {
+            "JSON": _rate(json.loads, texts),
+            "packed": _rate(lambda pair: pair[0].unpack(pair[1]), pairs),
+        },
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--report", action="store_true",
+                        help="Only report, do not pack")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Results packed per transaction")
+    parser.add_argument("--sample-size", type=int, default=1000,
+                        help="Latest results the decoding speed is "
+                             "measured on")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    with get_db_session() as db:
+        if not args.report:
+            packed = pack_stored_answers(db, args.batch_size)
+            sys.stdout.write(f"{packed} results packed\n")
+        report = storage_report(db, args.sample_size)
+    for name, (count, size) in report["stored"].items():
+        sys.stdout.write(f"stored {name}: {count} results, {size} bytes\n")
+    sizes = report["sample_bytes"]
+    saved = 1 - sizes["packed"] / sizes["JSON"] if sizes["JSON"] else 0
+    rates = report["decoded_per_second"]
+    sys.stdout.write(
+        f"sample of {report['sample']} results: "
+        f"JSON {sizes['JSON']} bytes, packed {sizes['packed']} bytes "
+        f"({saved:.0%} smaller); decoded per second: "
+        f"JSON {rates['JSON']:.0f}, packed {rates['packed']:.0f}\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
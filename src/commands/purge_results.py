@@ -0,0 +1,66 @@
+"""Purge the quiz results the retention policy no longer keeps.
+
+Runs at once, regardless of the purge window, with the rules of
+``RETENTION_KEEP_BEST`` and ``RETENTION_MAX_AGE_DAYS`` unless given here;
+see ``src.utils.retention``. Examples::
+
+    python -m src.commands.purge_results --keep-best 3
+    python -m src.commands.purge_results --max-age-days 365
+    python -m src.commands.purge_results --enable-incremental-vacuum
+
+Exits with status 1 if another purge is running, and 2 without any rule.
+"""
+
+import argparse
+import sys
+
+from src.settings.retention import retention_settings
+from src.utils.orm import get_db_session, get_engine
+from src.utils.retention import (PurgeInProgress, enable_incremental_vacuum,
+                                 purge_lock, purge_results)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--keep-best", type=int,
+                        default=retention_settings.keep_best,
+                        help="Attempts kept per user and quiz")
+    parser.add_argument("--max-age-days", type=int,
+                        default=retention_settings.max_age_days,
+                        help="Days after which attempts are purged")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="Switch the database to incremental auto-vacuum "
+                             "with a one-off VACUUM")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.enable_incremental_vacuum:
+        enable_incremental_vacuum(get_engine())
+        sys.stdout.write("incremental auto-vacuum enabled\n")
+        return 0
+    if args.keep_best is None and args.max_age_days is None:
+        sys.stderr.write("No retention rule, give --keep-best or "
+                         "--max-age-days\n")
+        return 2
+    settings = retention_settings.model_copy(update={
+        "keep_best": args.keep_best,
+        "max_age_days": args.max_age_days,
+    })
+    try:
+        with purge_lock(), get_db_session() as db:
+            report = purge_results(db, settings)
+    except PurgeInProgress as e:
+        sys.stderr.write(f"{e}\n")
+        return 1
+    sys.stdout.write(
+        f"purged {report.purged['age']} by age, "
+        f"{report.purged['best']} beyond the best attempts; "
+        f"reclaimed {report.reclaimed_bytes} bytes\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
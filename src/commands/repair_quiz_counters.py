@@ -0,0 +1,45 @@
+"""Recount the denormalized counters of quizzes.
+
+Question and attempt counts and score sums are kept on ``quiz`` by the
+writes that change them. This recounts them from ``question`` and
+``quizresult`` and fixes the quizzes that drifted, for instance after rows
+were changed by hand. Examples::
+
+    python -m src.commands.repair_quiz_counters
+    python -m src.commands.repair_quiz_counters --dry-run
+
+Exits with status 1 if a dry run found drifted quizzes.
+"""
+
+import argparse
+import sys
+
+from src.crud.quiz import QUIZ_COUNTERS, repair_quiz_counters
+from src.utils.orm import get_db_session
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only report drifted quizzes")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    with get_db_session() as db:
+        drifted = repair_quiz_counters(db, dry_run=args.dry_run)
+    for quiz in drifted:
+        changes = ", ".join(
+            f"{name} {quiz['stored'][name]} -> {quiz['actual'][name]}"
+            for name in QUIZ_COUNTERS
+            if quiz["stored"][name] != quiz["actual"][name]
+        )
+        sys.stdout.write(f"quiz {quiz['quiz_id']}: {changes}\n")
+    verb = "drifted" if args.dry_run else "repaired"
+    sys.stdout.write(f"{len(drifted)} quizzes {verb}\n")
+    return 1 if args.dry_run and drifted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
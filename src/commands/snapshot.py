@@ -0,0 +1,46 @@
+"""Write an incremental Parquet snapshot of quizzes and results.
+
+Appends the results submitted since the previous run and rewrites quizzes
+and questions, see ``src.utils.snapshot`` for the layout. Examples::
+
+    python -m src.commands.snapshot
+    python -m src.commands.snapshot --directory /data/snapshots
+
+Exits with status 1 if another snapshot of the directory is running.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.settings.snapshot import snapshot_settings
+from src.utils.orm import get_db_session
+from src.utils.snapshot import SnapshotInProgress, write_snapshot
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--directory", type=Path,
+                        default=snapshot_settings.directory,
+                        help="Snapshot directory")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    try:
+        with get_db_session() as db:
+            run = write_snapshot(db, args.directory)
+    except SnapshotInProgress as e:
+        sys.stderr.write(f"{e}\n")
+        return 1
+    sys.stdout.write(
+        f"run {run.run}: watermark {run.watermark}, "
+        + ", ".join(f"{table} {rows}" for table, rows in run.rows.items())
+        + f" rows in {len(run.files)} files\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
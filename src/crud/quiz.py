@@ -1,10 +1,162 @@
-from sqlalchemy import select
+import logging
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import (DateTime, Integer, Row, Select, Table, bindparam,
+                        cast, delete, exists, func, insert, literal_column,
+                        select, type_coerce, union_all, update)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from src.models.quiz import Question, Quiz, QuizResult
+from src.models.archive import (archived_quiz_result,
+                                archived_quiz_result_answer)
+from src.models.quiz import (Question, Quiz, QuizAnswerLayout, QuizResult,
+                             quiz_result_answer)
 from src.models.user import User
-from src.schemas.quiz import (QuestionCreate, QuestionUpdate, QuizCreate,
-                              QuizResultCreate, QuizUpdate)
+from src.schemas.quiz import (QuestionBulkEdit, QuestionCreate,
+                              QuestionUpdate, QuizAnswer, QuizCreate,
+                              QuizResultBatchItem, QuizResultCreate,
+                              QuizResultResponse, QuizUpdate,
+                              quiz_serializer)
+from src.settings.cache import cache_settings
+from src.settings.submissions import submission_settings
+from src.utils.answer_packing import AnswerLayout
+from src.utils.local_cache import LocalCache
+from src.utils.orm import archive_enabled
+from src.utils.unit_of_work import transactional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Correct answer and points of every question of a quiz."""
+
+    quiz_id: int
+    answers: dict[int, tuple[str, int]]
+    # Questions and options of the version the key was loaded at
+    layout: AnswerLayout
+
+    @property
+    def max_score(self) -> int:
+        return sum(points for _, points in self.answers.values())
+
+
+# Keyed by (quiz_id, version): an edit in any process changes the version,
+# so no worker grades against an old key
+answer_key_cache: LocalCache[AnswerKey | None] = LocalCache(
+    "answer_key", ttl=cache_settings.answer_key_ttl
+)
+leaderboard_cache: LocalCache[list[dict]] = LocalCache(
+    "leaderboard", ttl=cache_settings.leaderboard_ttl
+)
+# Keyed by (quiz_id, version), so entries never go stale, only unused
+quiz_payload_cache: LocalCache[bytes] = LocalCache(
+    "quiz_payload",
+    ttl=cache_settings.quiz_payload_ttl,
+    max_entries=cache_settings.quiz_payload_max_entries,
+)
+# Keyed by (quiz_id, version) as well
+answer_layout_cache: LocalCache[AnswerLayout | None] = LocalCache(
+    "answer_layout",
+    ttl=cache_settings.quiz_payload_ttl,
+    max_entries=cache_settings.quiz_payload_max_entries,
+)
+
+
+def invalidate_quiz_caches(quiz_id: int) -> None:
+    """Drop everything cached about a quiz in this process."""
+    answer_key_cache.invalidate_matching(lambda key: key[0] == quiz_id)
+    invalidate_leaderboards(quiz_id)
+    quiz_payload_cache.invalidate_matching(lambda key: key[0] == quiz_id)
+
+
+def invalidate_leaderboards(quiz_id: int) -> None:
+    """Drop the cached leaderboards of a quiz in this process."""
+    leaderboard_cache.invalidate_matching(lambda key: key[0] == quiz_id)
+
+
+# Counters change in place, they are not part of the quiz version
+_quiz_table = Quiz.__table__
+_add_to_counters = (
+    _quiz_table.update()
+    .where(_quiz_table.c.id == bindparam("quiz"))
+    .values(
+        question_count=_quiz_table.c.question_count + bindparam("questions"),
+        attempt_count=_quiz_table.c.attempt_count + bindparam("attempts"),
+        score_sum=_quiz_table.c.score_sum + bindparam("score"),
+        max_score_sum=_quiz_table.c.max_score_sum + bindparam("max_score"),
+    )
+)
+
+
+def add_to_quiz_counters(
+    db: Session, deltas: dict[int, dict[str, int]]
+) -> None:
+    """Add to the counters of quizzes, within the caller's transaction.
+
+    ``deltas`` maps quiz ids to amounts for ``questions``, ``attempts``,
+    ``score`` and ``max_score``. All quizzes are updated with one
+    executemany of ``SET x = x + :amount``.
+    """
+    if not deltas:
+        return
+    db.execute(_add_to_counters, [
+        {
+            "quiz": quiz_id,
+            "questions": 0,
+            "attempts": 0,
+            "score": 0,
+            "max_score": 0,
+            **delta,
+        }
+        for quiz_id, delta in deltas.items()
+    ])
+
+
+def _result_deltas(
+    results: Iterable[tuple[int, int, int]]
+) -> dict[int, dict[str, int]]:
+    """Sum (quiz_id, score, max_score) of new results per quiz."""
+    deltas: dict[int, dict[str, int]] = defaultdict(
+        lambda: {"attempts": 0, "score": 0, "max_score": 0}
+    )
+    for quiz_id, score, max_score in results:
+        delta = deltas[quiz_id]
+        delta["attempts"] += 1
+        delta["score"] += score
+        delta["max_score"] += max_score
+    return deltas
+
+
+def get_user_attempts(db: Session, user_id: int) -> dict[int, dict[str, int]]:
+    """Sum the attempts and scores of a user per quiz, archive included."""
+    tables = [QuizResult.__table__]
+    if archive_enabled():
+        tables.append(archived_quiz_result)
+    attempts: dict[int, dict[str, int]] = defaultdict(
+        lambda: {"attempts": 0, "score": 0, "max_score": 0}
+    )
+    for table in tables:
+        rows = db.execute(
+            select(
+                table.c.quiz_id,
+                func.count(table.c.id).label("attempts"),
+                func.sum(table.c.score).label("score"),
+                func.sum(table.c.max_score).label("max_score"),
+            )
+            .where(table.c.user_id == user_id)
+            .group_by(table.c.quiz_id)
+        )
+        for row in rows:
+            quiz = attempts[row.quiz_id]
+            quiz["attempts"] += row.attempts
+            quiz["score"] += row.score
+            quiz["max_score"] += row.max_score
+    return dict(attempts)
 
 
 def get_quiz(db: Session, quiz_id: int) -> Quiz:
@@ -23,6 +175,32 @@ def get_quiz(db: Session, quiz_id: int) -> Quiz:
     return db_quiz
 
 
+def get_quiz_version(db: Session, quiz_id: int) -> int | None:
+    """Get the current version of a quiz, or None if it does not exist."""
+    query = select(Quiz.version).filter(Quiz.id == quiz_id)
+    return db.execute(query).scalar()
+
+
+def get_cached_quiz_payload(quiz_id: int, version: int) -> bytes | None:
+    """Get the serialized quiz response of a version if cached."""
+    return quiz_payload_cache.get((quiz_id, version))
+
+
+def load_quiz_payload(db: Session, quiz_id: int) -> tuple[int, bytes] | None:
+    """Serialize the current version of a quiz and cache the JSON bytes.
+
+    Returns the version that was serialized with the bytes, or None if the
+    quiz does not exist.
+    """
+    quiz = get_quiz(db, quiz_id)
+    if quiz is None:
+        return None
+    payload = quiz_serializer.to_json(quiz)
+    if cache_settings.enabled:
+        quiz_payload_cache.set((quiz.id, quiz.version), payload)
+    return quiz.version, payload
+
+
 def get_quizzes(
     db: Session,
     skip: int = 0,
@@ -41,22 +219,27 @@ def get_quizzes(
     return result.scalars().all()
 
 
+@transactional
 def create_quiz(db: Session, quiz: QuizCreate, author_id: int) -> Quiz:
-    """Create a new quiz."""
+    """Create a new quiz with its questions in one transaction."""
     db_quiz = Quiz(
         title=quiz.title,
         description=quiz.description,
         is_public=quiz.is_public,
         author_id=author_id,
+        question_count=len(quiz.questions or []),
+        questions=[
+            Question(
+                text=question.text,
+                options=question.options,
+                correct_answer=question.correct_answer,
+                points=question.points,
+            )
+            for question in quiz.questions or []
+        ],
     )
     db.add(db_quiz)
     db.commit()
-    db.refresh(db_quiz)
-
-    # Add questions if provided
-    if quiz.questions:
-        for question_data in quiz.questions:
-            create_question(db, question_data, db_quiz.id)
 
     # Reload the quiz with questions eagerly loaded
     query = (
@@ -68,6 +251,7 @@ def create_quiz(db: Session, quiz: QuizCreate, author_id: int) -> Quiz:
     return result.scalars().first()
 
 
+@transactional
 def update_quiz(db: Session, quiz_id: int, quiz: QuizUpdate) -> Quiz | None:
     """Update a quiz."""
     db_quiz = get_quiz(db, quiz_id)
@@ -83,15 +267,176 @@ def update_quiz(db: Session, quiz_id: int, quiz: QuizUpdate) -> Quiz | None:
     return db_quiz
 
 
-def delete_quiz(db: Session, quiz_id: int) -> Quiz | None:
-    """Delete a quiz."""
-    db_quiz = get_quiz(db, quiz_id)
-    if not db_quiz:
-        return None
+@transactional
+def delete_quiz(db: Session, quiz_id: int) -> bool:
+    """Delete a quiz with one statement.
 
-    db.delete(db_quiz)
+    Its questions and results are deleted by ON DELETE CASCADE, without
+    being loaded. Returns whether the quiz existed.
+    """
+    deleted = db.execute(delete(Quiz).where(Quiz.id == quiz_id)).rowcount
+    if archive_enabled():
+        # The archive is another file, out of reach of the foreign keys
+        db.execute(
+            delete(archived_quiz_result)
+            .where(archived_quiz_result.c.quiz_id == quiz_id)
+        )
     db.commit()
-    return db_quiz
+    invalidate_quiz_caches(quiz_id)
+    return bool(deleted)
+
+
+@transactional
+def delete_results(db: Session, result_ids: Sequence[int]) -> int:
+    """Delete results by id in one transaction.
+
+    The counters of their quizzes lose the attempts first, in the same
+    transaction. Returns the number of results deleted.
+    """
+    if not result_ids:
+        return 0
+    played = db.execute(
+        select(
+            QuizResult.quiz_id,
+            func.count(QuizResult.id).label("attempts"),
+            func.sum(QuizResult.score).label("score"),
+            func.sum(QuizResult.max_score).label("max_score"),
+        )
+        .where(QuizResult.id.in_(result_ids))
+        .group_by(QuizResult.quiz_id)
+    ).all()
+    add_to_quiz_counters(db, {
+        row.quiz_id: {
+            "attempts": -row.attempts,
+            "score": -row.score,
+            "max_score": -row.max_score,
+        }
+        for row in played
+    })
+    deleted = db.execute(
+        delete(QuizResult)
+        .where(QuizResult.id.in_(result_ids))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    for row in played:
+        invalidate_leaderboards(row.quiz_id)
+    return deleted
+
+
+@transactional
+def delete_quiz_results_batch(
+    db: Session, quiz_id: int, batch_size: int, after_id: int = 0
+) -> list[int]:
+    """Delete the next ``batch_size`` results of a quiz by id.
+
+    Every batch is its own short transaction, so other writes get the
+    database in between. Returns the ids of the deleted results.
+    """
+    result_ids = db.execute(
+        select(QuizResult.id)
+        .where(QuizResult.quiz_id == quiz_id, QuizResult.id > after_id)
+        .order_by(QuizResult.id)
+        .limit(batch_size)
+    ).scalars().all()
+    delete_results(db, result_ids)
+    return result_ids
+
+
+def delete_quiz_in_batches(
+    db: Session, quiz_id: int, batch_size: int
+) -> int:
+    """Delete the results of a quiz a batch at a time, then the quiz.
+
+    Batches as in ``delete_quiz_results_batch``. Returns the number of
+    results deleted.
+    """
+    total = last_id = 0
+    while ids := delete_quiz_results_batch(db, quiz_id, batch_size, last_id):
+        total += len(ids)
+        last_id = ids[-1]
+    delete_quiz(db, quiz_id)
+    return total
+
+
+@transactional
+def archive_results(db: Session, result_ids: Sequence[int]) -> int:
+    """Move results by id to the archive in one transaction.
+
+    The counters are left alone, archived results still count. Returns
+    the number of results moved.
+    """
+    if not result_ids:
+        return 0
+    hot = QuizResult.__table__.c
+    quiz_ids = db.execute(
+        select(hot.quiz_id).where(hot.id.in_(result_ids)).distinct()
+    ).scalars().all()
+    # OR IGNORE: in WAL mode the two files commit separately, so a crash
+    # in between leaves results in both, which the next run then removes
+    # from the hot table
+    db.execute(
+        insert(archived_quiz_result)
+        .prefix_with("OR IGNORE")
+        .from_select(
+            [column.name for column in archived_quiz_result.c],
+            select(
+                hot.id,
+                hot.quiz_id,
+                hot.user_id,
+                hot.score,
+                hot.max_score,
+                hot.correct_answers,
+                cast(func.strftime("%s", hot.completed_at), Integer),
+                func.json(hot.answers),
+                hot.answers_packed,
+                hot.answers_version,
+            ).where(hot.id.in_(result_ids)),
+        )
+    )
+    db.execute(
+        insert(archived_quiz_result_answer)
+        .prefix_with("OR IGNORE")
+        .from_select(
+            [column.name for column in archived_quiz_result_answer.c],
+            select(quiz_result_answer).where(
+                quiz_result_answer.c.result_id.in_(result_ids)
+            ),
+        )
+    )
+    # Their answer rows go by ON DELETE CASCADE
+    moved = db.execute(
+        delete(QuizResult)
+        .where(QuizResult.id.in_(result_ids))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    # A leaderboard loaded between the commits of the two files may list
+    # results twice
+    for quiz_id in quiz_ids:
+        invalidate_leaderboards(quiz_id)
+    return moved
+
+
+def archive_old_results(
+    db: Session, completed_before: datetime, batch_size: int
+) -> int:
+    """Move results completed before a time to the archive, in batches.
+
+    Batches as in ``delete_quiz_results_batch``. Returns the number of
+    results moved.
+    """
+    # Old results have low ids, so each batch is found near the start
+    query = (
+        select(QuizResult.id)
+        .where(QuizResult.completed_at < completed_before)
+        .order_by(QuizResult.id)
+        .limit(batch_size)
+    )
+    total = 0
+    while ids := db.execute(query).scalars().all():
+        total += archive_results(db, ids)
+    return total
 
 
 # Question CRUD operations
@@ -109,6 +454,7 @@ def get_questions(db: Session, quiz_id: int) -> list[Question]:
     return result.scalars().all()
 
 
+@transactional
 def create_question(
     db: Session, question: QuestionCreate, quiz_id: int
 ) -> Question:
@@ -121,11 +467,93 @@ def create_question(
         points=question.points,
     )
     db.add(db_question)
+    add_to_quiz_counters(db, {quiz_id: {"questions": 1}})
     db.commit()
     db.refresh(db_question)
     return db_question
 
 
+def get_quiz_author_id(db: Session, quiz_id: int) -> int | None:
+    """Get the author of a quiz without loading its questions."""
+    query = select(Quiz.author_id).filter(Quiz.id == quiz_id)
+    return db.execute(query).scalar()
+
+
+@transactional
+def apply_question_edits(
+    db: Session, quiz_id: int, edit: QuestionBulkEdit
+) -> list[Question]:
+    """Create, update and delete questions of a quiz in one transaction.
+
+    Updated and deleted questions are checked against the quiz before
+    anything is written. Fields left out of an update, or set to null, keep
+    their value. The quiz version is bumped once for the whole edit.
+    Raises ``ValueError`` if the edit cannot be applied.
+    """
+    update_ids = [question.id for question in edit.update]
+    touched = set(update_ids) | set(edit.delete)
+    if len(touched) != len(update_ids) + len(set(edit.delete)):
+        raise ValueError("A question can only be updated or deleted once")
+
+    current = {}
+    if touched:
+        current = {
+            row.id: row._asdict()
+            for row in db.execute(
+                select(
+                    Question.id, Question.text, Question.options,
+                    Question.correct_answer, Question.points,
+                ).filter(
+                    Question.quiz_id == quiz_id, Question.id.in_(touched)
+                )
+            )
+        }
+    missing = sorted(touched - current.keys())
+    if missing:
+        raise ValueError(f"Questions with IDs {missing} not found in quiz")
+
+    updates = []
+    for question in edit.update:
+        row = {
+            **current[question.id],
+            **question.model_dump(exclude_unset=True, exclude_none=True),
+        }
+        if row["correct_answer"] not in row["options"]:
+            raise ValueError(
+                f"Question {question.id}: "
+                "Correct answer must be one of the options"
+            )
+        updates.append(row)
+
+    if edit.delete:
+        db.execute(delete(Question).where(Question.id.in_(edit.delete)))
+    if updates:
+        # Bulk UPDATE by primary key, sent as one executemany
+        db.execute(update(Question), updates)
+    if edit.create:
+        db.execute(insert(Question), [
+            {"quiz_id": quiz_id, **question.model_dump()}
+            for question in edit.create
+        ])
+    # Core statements skip the before_flush hook that bumps versions
+    if touched or edit.create:
+        db.execute(
+            update(Quiz)
+            .where(Quiz.id == quiz_id)
+            .values(
+                version=Quiz.version + 1,
+                question_count=(
+                    Quiz.question_count
+                    + len(edit.create) - len(set(edit.delete))
+                ),
+            )
+        )
+    db.commit()
+    invalidate_quiz_caches(quiz_id)
+    return get_questions(db, quiz_id)
+
+
+@transactional
 def update_question(
     db: Session,
     question_id: int,
@@ -145,6 +573,7 @@ def update_question(
     return db_question
 
 
+@transactional
 def delete_question(db: Session, question_id: int) -> Question | None:
     """Delete a question."""
     db_question = get_question(db, question_id)
@@ -152,6 +581,7 @@ def delete_question(db: Session, question_id: int) -> Question | None:
         return None
 
     db.delete(db_question)
+    add_to_quiz_counters(db, {db_question.quiz_id: {"questions": -1}})
     db.commit()
     return db_question
 
@@ -160,105 +590,461 @@ def delete_question(db: Session, question_id: int) -> Question | None:
 def get_quiz_result(db: Session, result_id: int) -> QuizResult | None:
     """Get a quiz result by ID."""
     query = select(QuizResult).filter(QuizResult.id == result_id)
-    result = db.execute(query)
-    return result.scalars().first()
+    result = db.execute(query).scalars().first()
+    if result is not None:
+        unpack_result_answers(db, [result])
+    return result
 
 
 def get_quiz_results(
     db: Session,
     quiz_id: int | None = None,
     user_id: int | None = None,
-) -> list[QuizResult]:
-    """Get all quiz results, optionally filtered by quiz or user."""
-    query = select(QuizResult)
-    if quiz_id:
-        query = query.filter(QuizResult.quiz_id == quiz_id)
-    if user_id:
-        query = query.filter(QuizResult.user_id == user_id)
+) -> list[QuizResultResponse]:
+    """Get all quiz results, optionally filtered by quiz or user.
+
+    Archived results are included, see ``get_user_results``.
+    """
+    return _result_responses(db, quiz_id=quiz_id, user_id=user_id)
+
+
+RESULT_EXPORT_COLUMNS = (
+    "id", "user_id", "username", "score", "max_score", "correct_answers",
+    "completed_at", "answers",
+)
+
+
+def _archived_completed_at() -> object:
+    # Unix seconds back to the text SQLite stores hot timestamps as
+    return type_coerce(
+        func.datetime(archived_quiz_result.c.completed_at, "unixepoch"),
+        DateTime,
+    )
+
+
+def _with_archived(hot: Select, archived: Select) -> Select:
+    """Union the hot rows with the archived ones, if there is an archive.
+
+    The hot select names and types the columns. Ordered by id, so the
+    archived rows come first.
+    """
+    if not archive_enabled():
+        return hot.order_by(QuizResult.id)
+    query = union_all(hot, archived)
+    return select(query.subquery()).order_by(literal_column("id"))
+
+
+def iter_quiz_results(
+    db: Session, quiz_id: int, batch_size: int = 1000
+) -> Iterator[list[dict]]:
+    """Stream the results of a quiz in batches from a server-side cursor.
+
+    Plain rows are fetched instead of ORM objects so that nothing is kept
+    in the session between batches. Archived results are included, and
+    packed answers are unpacked.
+    """
+    archived = archived_quiz_result.c
+    query = _with_archived(
+        select(
+            QuizResult.id,
+            QuizResult.user_id,
+            User.username,
+            QuizResult.score,
+            QuizResult.max_score,
+            QuizResult.correct_answers,
+            QuizResult.completed_at,
+            QuizResult.answers,
+            QuizResult.answers_packed,
+            QuizResult.answers_version,
+        )
+        .join(User, User.id == QuizResult.user_id)
+        .filter(QuizResult.quiz_id == quiz_id),
+        select(
+            archived.id,
+            archived.user_id,
+            User.username,
+            archived.score,
+            archived.max_score,
+            archived.correct_answers,
+            _archived_completed_at().label("completed_at"),
+            archived.answers,
+            archived.answers_packed,
+            archived.answers_version,
+        )
+        .join(User, User.id == archived.user_id)
+        .filter(archived.quiz_id == quiz_id),
+    ).execution_options(stream_results=True, yield_per=batch_size)
     result = db.execute(query)
-    return result.scalars().all()
+    try:
+        for rows in result.partitions():
+            yield _rows_with_answers(db, rows, quiz_id)
+    finally:
+        result.close()
 
 
-def get_user_results(db: Session, user_id: int) -> list[QuizResult]:
-    """Get all quiz results for a specific user."""
-    return get_quiz_results(db, user_id=user_id)
+def get_user_results(
+    db: Session, user_id: int
+) -> list[QuizResultResponse]:
+    """Get all quiz results of a user with quiz titles and usernames.
 
+    Archived results are included; they were created when completed.
+    Packed answers are unpacked.
+    """
+    return _result_responses(db, user_id=user_id)
 
-def create_quiz_result(
-    db: Session,
-    result_in: QuizResultCreate,
-    quiz_id: int,
-    user_id: int,
-) -> QuizResult:
-    """Create a new quiz result."""
-    # Process answers and calculate score
-    from src.models.quiz import Question
 
-    # Get all questions for the quiz to check answers
-    query = select(Question).filter(Question.quiz_id == quiz_id)
-    questions = db.execute(query).scalars().all()
+def _result_responses(
+    db: Session, quiz_id: int | None = None, user_id: int | None = None
+) -> list[QuizResultResponse]:
+    archived = archived_quiz_result.c
+    completed_at = _archived_completed_at()
+    quiz_title = func.coalesce(Quiz.title, "Unknown Quiz").label("quiz_title")
+    username = func.coalesce(User.username, "Unknown User").label("username")
+    hot_filters, archived_filters = [], []
+    if quiz_id:
+        hot_filters.append(QuizResult.quiz_id == quiz_id)
+        archived_filters.append(archived.quiz_id == quiz_id)
+    if user_id:
+        hot_filters.append(QuizResult.user_id == user_id)
+        archived_filters.append(archived.user_id == user_id)
+    query = _with_archived(
+        select(
+            QuizResult.id,
+            QuizResult.quiz_id,
+            QuizResult.user_id,
+            QuizResult.score,
+            QuizResult.max_score,
+            QuizResult.correct_answers,
+            QuizResult.answers,
+            QuizResult.answers_packed,
+            QuizResult.answers_version,
+            QuizResult.completed_at,
+            QuizResult.created_at,
+            QuizResult.updated_at,
+            quiz_title,
+            username,
+        )
+        .outerjoin(Quiz, Quiz.id == QuizResult.quiz_id)
+        .outerjoin(User, User.id == QuizResult.user_id)
+        .filter(*hot_filters),
+        select(
+            archived.id,
+            archived.quiz_id,
+            archived.user_id,
+            archived.score,
+            archived.max_score,
+            archived.correct_answers,
+            archived.answers,
+            archived.answers_packed,
+            archived.answers_version,
+            completed_at.label("completed_at"),
+            completed_at.label("created_at"),
+            completed_at.label("updated_at"),
+            quiz_title,
+            username,
+        )
+        .outerjoin(Quiz, Quiz.id == archived.quiz_id)
+        .outerjoin(User, User.id == archived.user_id)
+        .filter(*archived_filters),
+    )
+    return [
+        QuizResultResponse.model_validate(values)
+        for values in _rows_with_answers(db, db.execute(query))
+    ]
+
 
-    # Build a dictionary of question_id -> correct_answer for easier lookup
-    correct_answers = {q.id: q.correct_answer for q in questions}
-    question_points = {q.id: q.points for q in questions}
+def _grade(
+    answer_key: AnswerKey | None, answers: list[QuizAnswer]
+) -> dict:
+    """Score answers against a key, returning the result's column values."""
+    correct_answers = answer_key.answers if answer_key else {}
 
     # Calculate score
     score = 0
-    max_score = sum(question_points.values())
+    max_score = answer_key.max_score if answer_key else 0
     correct_count = 0
 
     # Store answers in a dictionary format that can be serialized to JSON
     answers_dict = {}
 
-    for answer in result_in.answers:
+    for answer in answers:
         question_id = answer.question_id
-        str_question_id = str(question_id)
         user_answer = answer.answer
-        answers_dict[str_question_id] = user_answer
+        answers_dict[str(question_id)] = user_answer
 
         # Check if this answer is correct
-        if (
-            question_id in correct_answers
-            and user_answer == correct_answers[question_id]
-        ):
-            score += question_points.get(question_id, 0)
+        expected = correct_answers.get(question_id)
+        if expected is not None and user_answer == expected[0]:
+            score += expected[1]
             correct_count += 1
 
-    # Create the result
+    return {
+        "score": score,
+        "max_score": max_score,
+        "correct_answers": correct_count,
+        "answers": answers_dict,
+    }
+
+
+def grade_quiz_result(
+    db: Session,
+    result_in: QuizResultCreate,
+    quiz_id: int,
+    user_id: int,
+) -> dict:
+    """Grade a submission without storing it.
+
+    Returns the column values of the result, stamped with the time of
+    grading, for ``insert_quiz_results``.
+    """
+    answer_key = get_answer_key(db, quiz_id)
+    return {
+        "quiz_id": quiz_id,
+        "user_id": user_id,
+        "completed_at": datetime.now(timezone.utc).replace(tzinfo=None),
+        **_grade(answer_key, result_in.answers),
+    }
+
+
+@transactional
+def insert_quiz_results(db: Session, rows: list[dict]) -> list[dict]:
+    """Store graded results with one statement and one commit.
+
+    Returns the rows with the values the database generated.
+    """
+    answer_keys = {}
+    if submission_settings.packed_answers or submission_settings.answer_rows:
+        answer_keys = get_answer_keys(db, {row["quiz_id"] for row in rows})
+    generated = db.execute(
+        insert(QuizResult).returning(
+            QuizResult.id,
+            QuizResult.completed_at,
+            QuizResult.created_at,
+            QuizResult.updated_at,
+            sort_by_parameter_order=True,
+        ),
+        [
+            {
+                **row,
+                **_stored_answers(
+                    db, answer_keys.get(row["quiz_id"]), row["answers"]
+                ),
+            }
+            for row in rows
+        ],
+    ).mappings().all()
+    if submission_settings.answer_rows:
+        _insert_answer_rows(db, [
+            answer_row
+            for row, values in zip(rows, generated)
+            for answer_row in _answer_rows(
+                answer_keys[row["quiz_id"]], values["id"], row["answers"]
+            )
+        ])
+    add_to_quiz_counters(db, _result_deltas(
+        (row["quiz_id"], row["score"], row["max_score"]) for row in rows
+    ))
+    db.commit()
+    for quiz_id in {row["quiz_id"] for row in rows}:
+        invalidate_leaderboards(quiz_id)
+    return [{**row, **values} for row, values in zip(rows, generated)]
+
+
+@transactional
+def create_quiz_result(
+    db: Session,
+    result_in: QuizResultCreate,
+    quiz_id: int,
+    user_id: int,
+) -> QuizResult:
+    """Create a new quiz result."""
+    answer_key = get_answer_key(db, quiz_id)
+    graded = _grade(answer_key, result_in.answers)
     db_result = QuizResult(
         quiz_id=quiz_id,
         user_id=user_id,
-        score=score,
-        max_score=max_score,
-        correct_answers=correct_count,
-        answers=answers_dict,
+        **{**graded, **_stored_answers(db, answer_key, graded["answers"])},
     )
     db.add(db_result)
+    if submission_settings.answer_rows:
+        db.flush()
+        _insert_answer_rows(db, _answer_rows(
+            answer_key, db_result.id, graded["answers"]
+        ))
+    add_to_quiz_counters(db, _result_deltas(
+        [(quiz_id, db_result.score, db_result.max_score)]
+    ))
     db.commit()
     db.refresh(db_result)
+    set_committed_value(db_result, "answers", graded["answers"])
+    invalidate_leaderboards(quiz_id)
     return db_result
 
 
+@dataclass
+class BatchOutcome:
+    """What happened to one submission of a batch."""
+
+    status: str
+    result: QuizResult | None = None
+    detail: str | None = None
+
+
+@transactional
+def create_quiz_results_batch(
+    db: Session, submissions: list[QuizResultBatchItem], user_id: int
+) -> list[BatchOutcome]:
+    """Grade and store many submissions of a user in one transaction.
+
+    Submissions are grouped by quiz so every answer key is loaded once.
+    One whose idempotency key is already stored, or used earlier in the
+    batch, is a duplicate and comes back with the stored result.
+    """
+    try:
+        return _create_quiz_results_batch(db, submissions, user_id)
+    except IntegrityError:
+        # A concurrent retry stored one of the keys first; this time its
+        # result is found and reported as a duplicate
+        db.rollback()
+        return _create_quiz_results_batch(db, submissions, user_id)
+
+
+def _create_quiz_results_batch(
+    db: Session, submissions: list[QuizResultBatchItem], user_id: int
+) -> list[BatchOutcome]:
+    keys = {s.idempotency_key for s in submissions if s.idempotency_key}
+    stored: dict[str, QuizResult] = {}
+    if keys:
+        stored = {
+            result.idempotency_key: result
+            for result in db.execute(
+                select(QuizResult).filter(
+                    QuizResult.user_id == user_id,
+                    QuizResult.idempotency_key.in_(keys),
+                )
+            ).scalars()
+        }
+
+    outcomes: list[BatchOutcome | None] = [None] * len(submissions)
+    by_quiz: dict[int, list[int]] = defaultdict(list)
+    for index, submission in enumerate(submissions):
+        if submission.idempotency_key in stored:
+            outcomes[index] = BatchOutcome(
+                "duplicate", stored[submission.idempotency_key]
+            )
+        else:
+            by_quiz[submission.quiz_id].append(index)
+
+    created: list[QuizResult] = []
+    # Answer key and answers of every created result, for its answer rows
+    graded_answers: list[tuple[AnswerKey, dict]] = []
+    for quiz_id, indexes in by_quiz.items():
+        answer_key = get_answer_key(db, quiz_id)
+        for index in indexes:
+            submission = submissions[index]
+            if answer_key is None:
+                outcomes[index] = BatchOutcome("error", detail="Quiz not found")
+                continue
+            invalid_q = [
+                answer.question_id
+                for answer in submission.answers
+                if answer.question_id not in answer_key.answers
+            ]
+            if invalid_q:
+                outcomes[index] = BatchOutcome(
+                    "error",
+                    detail=f"Questions with IDs {invalid_q} not found in quiz",
+                )
+                continue
+            key = submission.idempotency_key
+            if key in stored:
+                outcomes[index] = BatchOutcome("duplicate", stored[key])
+                continue
+            graded = _grade(answer_key, submission.answers)
+            result = QuizResult(
+                quiz_id=quiz_id,
+                user_id=user_id,
+                idempotency_key=key,
+                **{
+                    **graded,
+                    **_stored_answers(db, answer_key, graded["answers"]),
+                },
+            )
+            if key:
+                stored[key] = result
+            created.append(result)
+            graded_answers.append((answer_key, graded["answers"]))
+            outcomes[index] = BatchOutcome("created", result)
+
+    if created:
+        db.add_all(created)
+        if submission_settings.answer_rows:
+            db.flush()
+            _insert_answer_rows(db, [
+                answer_row
+                for result, (answer_key, answers) in zip(
+                    created, graded_answers
+                )
+                for answer_row in _answer_rows(answer_key, result.id, answers)
+            ])
+        add_to_quiz_counters(db, _result_deltas(
+            (result.quiz_id, result.score, result.max_score)
+            for result in created
+        ))
+        db.commit()
+        for quiz_id in {result.quiz_id for result in created}:
+            invalidate_leaderboards(quiz_id)
+    unpack_result_answers(
+        db, [outcome.result for outcome in outcomes if outcome.result]
+    )
+    return outcomes
+
+
 def get_quiz_leaderboard(
     db: Session, quiz_id: int, limit: int = 10
 ) -> list[dict]:
-    """Get the leaderboard for a quiz."""
-    results = (
-        db.query(
+    """Get the leaderboard for a quiz.
+
+    The list is cached per process and shared between callers, so it must
+    not be modified.
+    """
+    return leaderboard_cache.get_or_set(
+        (quiz_id, limit), lambda: _load_leaderboard(db, quiz_id, limit)
+    )
+
+
+def _load_leaderboard(db: Session, quiz_id: int, limit: int) -> list[dict]:
+    # Archived results are ranked too
+    archived = archived_quiz_result.c
+    scored = select(
+        User.username,
+        QuizResult.score,
+        QuizResult.max_score,
+        QuizResult.completed_at,
+    ).join(User, User.id == QuizResult.user_id).filter(
+        QuizResult.quiz_id == quiz_id
+    )
+    if archive_enabled():
+        scored = union_all(scored, select(
             User.username,
-            QuizResult.score,
-            QuizResult.max_score,
-            (QuizResult.score * 100 / QuizResult.max_score).label(
-                "percentage"
-            ),
-            QuizResult.completed_at,
+            archived.score,
+            archived.max_score,
+            _archived_completed_at().label("completed_at"),
+        ).join(User, User.id == archived.user_id).filter(
+            archived.quiz_id == quiz_id
+        ))
+    scored = scored.subquery()
+    results = db.execute(
+        select(
+            scored.c.username,
+            scored.c.score,
+            scored.c.max_score,
+            (scored.c.score * 100 / scored.c.max_score).label("percentage"),
+            scored.c.completed_at,
         )
-        .join(User)
-        .filter(QuizResult.quiz_id == quiz_id)
-        .order_by(QuizResult.score.desc())
+        .order_by(scored.c.score.desc())
         .limit(limit)
-        .all()
-    )
+    ).all()
 
     return [
         {
@@ -270,3 +1056,440 @@ def get_quiz_leaderboard(
         }
         for result in results
     ]
+
+
+def get_answer_key(db: Session, quiz_id: int) -> AnswerKey | None:
+    """Get the answer key of a quiz, or None if the quiz does not exist.
+
+    The version of the quiz is read on every call and picks the cached key.
+    """
+    version = get_quiz_version(db, quiz_id)
+    if version is None:
+        return None
+    return answer_key_cache.get_or_set(
+        (quiz_id, version), lambda: _load_answer_key(db, quiz_id)
+    )
+
+
+def get_answer_keys(
+    db: Session, quiz_ids: Iterable[int]
+) -> dict[int, AnswerKey | None]:
+    """Get the answer keys of several quizzes, each looked up once."""
+    return {quiz_id: get_answer_key(db, quiz_id) for quiz_id in quiz_ids}
+
+
+def _load_answer_key(db: Session, quiz_id: int) -> AnswerKey | None:
+    # One query, so the layout is the one of the version read with it
+    rows = db.execute(
+        select(
+            Quiz.version,
+            Question.id,
+            Question.correct_answer,
+            Question.points,
+            Question.options,
+        )
+        .outerjoin(Question, Question.quiz_id == Quiz.id)
+        .filter(Quiz.id == quiz_id)
+        .order_by(Question.id)
+    ).all()
+    if not rows:
+        return None
+    questions = [row for row in rows if row.id is not None]
+    return AnswerKey(
+        quiz_id=quiz_id,
+        answers={
+            row.id: (row.correct_answer, row.points or 0) for row in questions
+        },
+        layout=AnswerLayout(
+            quiz_id=quiz_id,
+            version=rows[0].version,
+            questions=tuple(
+                (row.id, tuple(row.options or ())) for row in questions
+            ),
+        ),
+    )
+
+
+def get_answer_layout(
+    db: Session, quiz_id: int, version: int
+) -> AnswerLayout | None:
+    """Get the layout packed answers of a quiz version were stored with."""
+    return answer_layout_cache.get_or_set(
+        (quiz_id, version), lambda: _load_answer_layout(db, quiz_id, version)
+    )
+
+
+def _load_answer_layout(
+    db: Session, quiz_id: int, version: int
+) -> AnswerLayout | None:
+    questions = db.execute(
+        select(QuizAnswerLayout.questions).filter(
+            QuizAnswerLayout.quiz_id == quiz_id,
+            QuizAnswerLayout.version == version,
+        )
+    ).scalar()
+    if questions is None:
+        return None
+    return AnswerLayout(
+        quiz_id=quiz_id,
+        version=version,
+        questions=tuple(
+            (question_id, tuple(options)) for question_id, options in questions
+        ),
+    )
+
+
+def _packed_answers(
+    db: Session, answer_key: AnswerKey, answers: dict
+) -> dict | None:
+    """The packed answer columns of a result, or None if they do not fit.
+
+    The layout is stored in the caller's transaction.
+    """
+    layout = answer_key.layout
+    packed = layout.pack(answers)
+    if packed is None:
+        return None
+    db.execute(
+        insert(QuizAnswerLayout)
+        .prefix_with("OR IGNORE")
+        .values(
+            quiz_id=layout.quiz_id,
+            version=layout.version,
+            questions=[list(question) for question in layout.questions],
+        )
+    )
+    return {"answers": None, "answers_packed": packed,
+            "answers_version": layout.version}
+
+
+def _stored_answers(
+    db: Session, answer_key: AnswerKey | None, answers: dict
+) -> dict:
+    """The answer columns of a new result, packed if enabled and possible."""
+    if submission_settings.packed_answers and answer_key is not None:
+        packed = _packed_answers(db, answer_key, answers)
+        if packed is not None:
+            return packed
+    return {"answers": answers, "answers_packed": None,
+            "answers_version": None}
+
+
+def _unpack(db: Session, quiz_id: int, version: int, packed: bytes) -> dict:
+    layout = get_answer_layout(db, quiz_id, version)
+    if layout is None:
+        logger.error(
+            "No answer layout for version %s of quiz %s", version, quiz_id
+        )
+        return {}
+    return layout.unpack(packed)
+
+
+def answers_of(db: Session, result: QuizResult | Row) -> dict:
+    """The answers of a result or result row, unpacked if packed."""
+    if result.answers_packed is None:
+        return result.answers
+    return _unpack(
+        db, result.quiz_id, result.answers_version, result.answers_packed
+    )
+
+
+def unpack_result_answers(db: Session, results: Iterable[QuizResult]) -> None:
+    """Fill in the answers of packed results, without changing them."""
+    for result in results:
+        if result.answers_packed is not None:
+            set_committed_value(result, "answers", answers_of(db, result))
+
+
+def _rows_with_answers(
+    db: Session, rows: Iterable[Row], quiz_id: int | None = None
+) -> list[dict]:
+    """Result rows as dicts with unpacked answers and no packed columns.
+
+    Rows without a ``quiz_id`` column need the ``quiz_id`` they are of.
+    """
+    unpacked = []
+    for row in rows:
+        values = row._asdict()
+        packed = values.pop("answers_packed")
+        version = values.pop("answers_version")
+        if packed is not None:
+            values["answers"] = _unpack(
+                db, quiz_id or row.quiz_id, version, packed
+            )
+        unpacked.append(values)
+    return unpacked
+
+
+def get_most_played_quiz_ids(db: Session, limit: int) -> list[int]:
+    """Get the ids of the quizzes with the most results, most played first.
+
+    Reads the attempt counters through their index, not the results.
+    """
+    query = (
+        select(Quiz.id)
+        .where(Quiz.attempt_count > 0)
+        .order_by(Quiz.attempt_count.desc())
+        .limit(limit)
+    )
+    return list(db.execute(query).scalars())
+
+
+@transactional
+def _pack_results(db: Session, rows: Sequence[Row]) -> int:
+    updates = []
+    answer_keys = get_answer_keys(db, {row.quiz_id for row in rows})
+    for row in rows:
+        answer_key = answer_keys[row.quiz_id]
+        if answer_key is None:
+            continue
+        packed = _packed_answers(db, answer_key, row.answers)
+        if packed is not None:
+            updates.append({"id": row.id, **packed})
+    if updates:
+        db.execute(update(QuizResult), updates)
+    db.commit()
+    return len(updates)
+
+
+def pack_stored_answers(db: Session, batch_size: int = 1000) -> int:
+    """Pack the JSON answers of stored results, a batch at a time.
+
+    Answers are packed against the current version of their quiz; those
+    that are not one of its options stay JSON. Every batch is its own
+    transaction. Returns the number of results packed.
+    """
+    query = (
+        select(QuizResult.id, QuizResult.quiz_id, QuizResult.answers)
+        .where(QuizResult.answers_packed.is_(None))
+        .order_by(QuizResult.id)
+        .limit(batch_size)
+    )
+    total = after_id = 0
+    while rows := db.execute(query.where(QuizResult.id > after_id)).all():
+        after_id = rows[-1].id
+        total += _pack_results(db, rows)
+    return total
+
+
+def _answer_rows(
+    answer_key: AnswerKey | None, result_id: int, answers: dict
+) -> list[dict]:
+    """The quizresult_answer rows of a result's answers."""
+    if answer_key is None:
+        return []
+    options = dict(answer_key.layout.questions)
+    rows = []
+    for question_id, answer in answers.items():
+        question_id = int(question_id)
+        choices = options.get(question_id, ())
+        expected = answer_key.answers.get(question_id)
+        rows.append({
+            "result_id": result_id,
+            "question_id": question_id,
+            "option_index": (
+                choices.index(answer) if answer in choices else None
+            ),
+            "is_correct": expected is not None and answer == expected[0],
+        })
+    return rows
+
+
+def _insert_answer_rows(db: Session, rows: list[dict]) -> None:
+    if rows:
+        db.execute(insert(quiz_result_answer), rows)
+
+
+@transactional
+def _fill_answer_rows(db: Session, rows: Sequence[Row]) -> int:
+    answer_rows = []
+    answer_keys = get_answer_keys(db, {row.quiz_id for row in rows})
+    for row in rows:
+        answer_rows.extend(_answer_rows(
+            answer_keys[row.quiz_id], row.id, answers_of(db, row)
+        ))
+    _insert_answer_rows(db, answer_rows)
+    db.commit()
+    return len(answer_rows)
+
+
+def fill_answer_rows(db: Session, batch_size: int = 1000) -> int:
+    """Store the answer rows of results that have none, a batch at a time.
+
+    Answers are checked against the current version of their quiz, which
+    may differ from the one they were graded against. Every batch is its
+    own transaction. Returns the number of answer rows stored.
+    """
+    query = (
+        select(
+            QuizResult.id,
+            QuizResult.quiz_id,
+            QuizResult.answers,
+            QuizResult.answers_packed,
+            QuizResult.answers_version,
+        )
+        .where(~exists().where(
+            quiz_result_answer.c.result_id == QuizResult.id
+        ))
+        .order_by(QuizResult.id)
+        .limit(batch_size)
+    )
+    total = after_id = 0
+    while rows := db.execute(query.where(QuizResult.id > after_id)).all():
+        after_id = rows[-1].id
+        total += _fill_answer_rows(db, rows)
+    return total
+
+
+def _answer_tables() -> list[tuple[Table, Table]]:
+    """The answer rows and their results, hot and archived."""
+    tables = [(quiz_result_answer, QuizResult.__table__)]
+    if archive_enabled():
+        tables.append((archived_quiz_result_answer, archived_quiz_result))
+    return tables
+
+
+def get_answer_counts(db: Session, question_id: int) -> list[Row]:
+    """Count the answers to a question by option and correctness.
+
+    Archived answers are counted too.
+    """
+    counted = union_all(*(
+        select(
+            answers.c.option_index,
+            answers.c.is_correct,
+            func.count().label("answers"),
+        )
+        .where(answers.c.question_id == question_id)
+        .group_by(answers.c.option_index, answers.c.is_correct)
+        for answers, _ in _answer_tables()
+    )).subquery()
+    return db.execute(
+        select(
+            counted.c.option_index,
+            counted.c.is_correct,
+            func.sum(counted.c.answers).label("answers"),
+        ).group_by(counted.c.option_index, counted.c.is_correct)
+    ).all()
+
+
+def get_answering_users(
+    db: Session,
+    question_id: int,
+    is_correct: bool | None = None,
+    option_index: int | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[dict]:
+    """Get the users who answered a question, with how many times.
+
+    Filters by whether the answer was correct and by the option picked.
+    Archived answers are included.
+    """
+    selects = []
+    for answers, results in _answer_tables():
+        query = (
+            select(results.c.user_id)
+            .select_from(answers)
+            .join(results, results.c.id == answers.c.result_id)
+            .where(answers.c.question_id == question_id)
+        )
+        if is_correct is not None:
+            query = query.where(answers.c.is_correct == is_correct)
+        if option_index is not None:
+            query = query.where(answers.c.option_index == option_index)
+        selects.append(query)
+    answered = union_all(*selects).subquery()
+    query = (
+        select(
+            User.id.label("user_id"),
+            User.username,
+            func.count().label("answers"),
+        )
+        .select_from(answered)
+        .join(User, User.id == answered.c.user_id)
+        .group_by(User.id)
+        .order_by(User.username)
+        .offset(skip)
+        .limit(limit)
+    )
+    return [dict(row) for row in db.execute(query).mappings()]
+
+
+QUIZ_COUNTERS = ("question_count", "attempt_count", "score_sum",
+                 "max_score_sum")
+
+
+def _recounted() -> dict[str, object]:
+    """Correlated subqueries computing every counter of a quiz afresh."""
+    tables = [QuizResult.__table__]
+    if archive_enabled():
+        # Archived results still count as attempts
+        tables.append(archived_quiz_result)
+
+    def results(value: Callable[[Table], object]) -> object:
+        subqueries = [
+            select(value(table)).where(table.c.quiz_id == Quiz.id)
+            .scalar_subquery()
+            for table in tables
+        ]
+        return sum(subqueries[1:], subqueries[0])
+
+    return {
+        "question_count": (
+            select(func.count(Question.id))
+            .where(Question.quiz_id == Quiz.id)
+            .scalar_subquery()
+        ),
+        "attempt_count": results(lambda table: func.count(table.c.id)),
+        "score_sum": results(
+            lambda table: func.coalesce(func.sum(table.c.score), 0)
+        ),
+        "max_score_sum": results(
+            lambda table: func.coalesce(func.sum(table.c.max_score), 0)
+        ),
+    }
+
+
+@transactional
+def repair_quiz_counters(
+    db: Session, dry_run: bool = False, batch_size: int = 500
+) -> list[dict]:
+    """Recount the counters of quizzes whose stored values drifted.
+
+    Returns the drifted quizzes with their stored and actual counters.
+    Each batch is recounted with one UPDATE, so increments committed
+    meanwhile are not lost.
+    """
+    recounted = _recounted()
+    query = select(
+        Quiz.id,
+        *(getattr(Quiz, name) for name in QUIZ_COUNTERS),
+        *(recounted[name].label(f"actual_{name}") for name in QUIZ_COUNTERS),
+    ).order_by(Quiz.id)
+    drifted = [
+        {
+            "quiz_id": row.id,
+            "stored": {name: getattr(row, name) for name in QUIZ_COUNTERS},
+            "actual": {
+                name: getattr(row, f"actual_{name}") for name in QUIZ_COUNTERS
+            },
+        }
+        for row in db.execute(query)
+        if any(
+            getattr(row, name) != getattr(row, f"actual_{name}")
+            for name in QUIZ_COUNTERS
+        )
+    ]
+    if dry_run or not drifted:
+        return drifted
+    ids = [quiz["quiz_id"] for quiz in drifted]
+    for start in range(0, len(ids), batch_size):
+        db.execute(
+            update(Quiz)
+            .where(Quiz.id.in_(ids[start:start + batch_size]))
+            .values(**recounted)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return drifted
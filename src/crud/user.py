@@ -1,9 +1,16 @@
-from sqlalchemy import select
+from sqlalchemy import delete, or_, select
 from sqlalchemy.orm import Session
 
 from src.auth.utils import get_password_hash
+from src.crud.quiz import (add_to_quiz_counters, delete_quiz_in_batches,
+                           delete_results, get_user_attempts,
+                           invalidate_leaderboards, invalidate_quiz_caches)
+from src.models.archive import archived_quiz_result
+from src.models.quiz import Quiz, QuizResult
 from src.models.user import User
 from src.schemas.user import UserCreate, UserUpdate
+from src.utils.orm import archive_enabled
+from src.utils.unit_of_work import transactional
 
 
 def get_user(db: Session, user_id: int) -> User | None:
@@ -34,6 +41,7 @@ def get_users(db: Session, skip: int = 0, limit: int = 100) -> list[User]:
     return result.scalars().all()
 
 
+@transactional
 def create_user(db: Session, user: UserCreate) -> User:
     """Create a new user."""
     hashed_password = get_password_hash(user.password)
@@ -54,6 +62,7 @@ def create_user(db: Session, user: UserCreate) -> User:
     return db_user
 
 
+@transactional
 def update_user(db: Session, user_id: int, user: UserUpdate) -> User | None:
     """Update a user."""
     db_user = get_user(db, user_id)
@@ -77,12 +86,89 @@ def update_user(db: Session, user_id: int, user: UserUpdate) -> User | None:
     return db_user
 
 
-def delete_user(db: Session, user_id: int) -> User | None:
-    """Delete a user."""
-    db_user = get_user(db, user_id)
-    if not db_user:
-        return None
-
-    db.delete(db_user)
+@transactional
+def delete_user(db: Session, user_id: int) -> bool:
+    """Delete a user with one statement.
+
+    Their quizzes and results are deleted by ON DELETE CASCADE, and the
+    counters of the quizzes they played lose their attempts. Returns
+    whether the user existed.
+    """
+    played = get_user_attempts(db, user_id)
+    authored = set(db.execute(
+        select(Quiz.id).where(Quiz.author_id == user_id)
+    ).scalars())
+    add_to_quiz_counters(db, {
+        quiz_id: {name: -amount for name, amount in attempts.items()}
+        for quiz_id, attempts in played.items()
+        if quiz_id not in authored
+    })
+    deleted = db.execute(delete(User).where(User.id == user_id)).rowcount
+    if archive_enabled():
+        # The archive is another file, out of reach of the foreign keys
+        db.execute(delete(archived_quiz_result).where(or_(
+            archived_quiz_result.c.user_id == user_id,
+            archived_quiz_result.c.quiz_id.in_(authored),
+        )))
     db.commit()
-    return db_user
+    for quiz_id in authored:
+        invalidate_quiz_caches(quiz_id)
+    for quiz_id in played:
+        invalidate_leaderboards(quiz_id)
+    return bool(deleted)
+
+
+def get_user_delete_size(db: Session, user_id: int) -> int:
+    """Count the results deleting a user removes: theirs and their quizzes'.
+
+    Uses the quiz counters, so archived results are included.
+    """
+    authored = dict(db.execute(
+        select(Quiz.id, Quiz.attempt_count).where(Quiz.author_id == user_id)
+    ).all())
+    played = get_user_attempts(db, user_id)
+    return sum(authored.values()) + sum(
+        attempts["attempts"]
+        for quiz_id, attempts in played.items()
+        if quiz_id not in authored
+    )
+
+
+@transactional
+def delete_user_results_batch(
+    db: Session, user_id: int, batch_size: int, after_id: int = 0
+) -> list[int]:
+    """Delete the next ``batch_size`` results of a user by id.
+
+    Returns the ids of the deleted results.
+    """
+    result_ids = db.execute(
+        select(QuizResult.id)
+        .where(QuizResult.user_id == user_id, QuizResult.id > after_id)
+        .order_by(QuizResult.id)
+        .limit(batch_size)
+    ).scalars().all()
+    delete_results(db, result_ids)
+    return result_ids
+
+
+def delete_user_in_batches(
+    db: Session, user_id: int, batch_size: int
+) -> int:
+    """Delete a user's quizzes and results a batch at a time, then the user.
+
+    Batches as in ``delete_quiz_results_batch``. Returns the number of
+    results deleted.
+    """
+    total = 0
+    authored = db.execute(
+        select(Quiz.id).where(Quiz.author_id == user_id)
+    ).scalars().all()
+    for quiz_id in authored:
+        total += delete_quiz_in_batches(db, quiz_id, batch_size)
+    last_id = 0
+    while ids := delete_user_results_batch(db, user_id, batch_size, last_id):
+        total += len(ids)
+        last_id = ids[-1]
+    delete_user(db, user_id)
+    return total
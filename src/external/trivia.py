@@ -1,9 +1,13 @@
+"""Client for the Open Trivia DB API.
+
+``requests`` is imported by the functions that use it, so that the API
+routers can be loaded without it.
+"""
+
 import html
 import json
 from typing import Any
 
-import requests
-
 from src.schemas.quiz import QuestionCreate
 
 
@@ -32,6 +36,8 @@ def fetch_trivia_questions(
         TriviaAPIException: If there is an issue with the API
 
     """
+    import requests
+
     url = "https://opentdb.com/api.php"
 
     # Build query params
@@ -106,6 +112,8 @@ def get_trivia_categories() -> list[dict[str, Any]]:
         TriviaAPIException: If there's an issue with the API
 
     """
+    import requests
+
     url = "https://opentdb.com/api_category.php"
 
     try:
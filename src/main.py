@@ -1,12 +1,30 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
-from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from src.api import api_router
 from src.choices import Environment
 from src.settings.general import general_settings
+from src.settings.metrics import metrics_settings
+from src.settings.profiling import profiling_settings
+from src.settings.queries import query_settings
+from src.settings.retention import retention_settings
+from src.settings.submissions import submission_settings
+from src.settings.warmup import warmup_settings
 from src.utils.exceptions import http_exception_handler
+from src.utils.metrics import (PrometheusMiddleware, mark_process_dead,
+                               render_metrics)
+from src.utils.profiling import ProfilingMiddleware, sampler
+from src.utils.query_stats import QueryStatsMiddleware
+from src.utils.retention import RetentionPurger
+from src.utils.unit_of_work import DatabaseBusy, database_busy_handler
+from src.utils.warmup import WarmupState, run_warmup
+from src.utils.write_behind import create_queue
 
 root_router = APIRouter()
 
@@ -38,18 +56,62 @@ def healthz() -> dict[str, Any]:
     "/readyz",
     summary="K8S readiness probe",
 )
-def readyz() -> dict[str, Any]:
+def readyz(request: Request) -> Any:
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        return {
+            "status": "ok",
+        }
+    if not warmup.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming up", "warmup": warmup.describe()},
+        )
     return {
         "status": "ok",
+        "warmup": warmup.describe(),
     }
 
 
+def metrics() -> Response:
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if profiling_settings.sampler_enabled:
+        sampler.start()
+    warmup_task = None
+    if warmup_settings.enabled:
+        app.state.warmup = WarmupState()
+        warmup_task = asyncio.create_task(run_warmup(app, app.state.warmup))
+    if submission_settings.write_behind:
+        app.state.submission_queue = create_queue(app)
+        app.state.submission_queue.start()
+    if retention_settings.enabled:
+        app.state.retention_purger = RetentionPurger(app)
+        app.state.retention_purger.start()
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+    if submission_settings.write_behind:
+        # Store every queued result before the process exits
+        await app.state.submission_queue.close()
+    if retention_settings.enabled:
+        await app.state.retention_purger.close()
+    sampler.stop()
+    mark_process_dead()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title=general_settings.app_name,
         summary=general_settings.app_description,
         debug=(general_settings.environment == Environment.DEV),
         version=general_settings.version,
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # Add CORS middleware
@@ -65,9 +127,30 @@ def create_app() -> FastAPI:
         HTTPException,
         http_exception_handler
     )  # type: ignore[arg-type]
+    app.add_exception_handler(
+        DatabaseBusy,
+        database_busy_handler
+    )  # type: ignore[arg-type]
 
     # Include routers
     app.include_router(root_router)
     app.include_router(api_router)
 
+    if profiling_settings.request_profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
+
+    if query_settings.instrumentation_enabled:
+        app.add_middleware(QueryStatsMiddleware)
+
+    # Metrics go last so the middleware wraps everything else
+    if metrics_settings.enabled:
+        app.add_api_route(
+            metrics_settings.path,
+            metrics,
+            methods=["GET"],
+            summary="Prometheus metrics",
+            include_in_schema=False,
+        )
+        app.add_middleware(PrometheusMiddleware)
+
     return app
@@ -0,0 +1,57 @@
+"""Archived quiz results, in a SQLite file attached as ``archive``.
+
+The tables are plain Core tables of their own metadata: they live in
+another database file, so they have no foreign keys into the main one and
+are not part of the Alembic migrations. ``src.utils.orm`` attaches the file
+and creates the tables. Answer rows go with their results and are deleted
+with them by ON DELETE CASCADE within the archive.
+
+Rows keep only what history and exports read: no idempotency key, no
+``created_at`` or ``updated_at``, ``completed_at`` as whole Unix seconds
+and the answers as minified JSON, or packed as in the hot table.
+"""
+
+from sqlalchemy import (JSON, Boolean, Column, ForeignKey, Index, Integer,
+                        LargeBinary, MetaData, SmallInteger, Table)
+
+ARCHIVE_SCHEMA = "archive"
+
+archive_metadata = MetaData(schema=ARCHIVE_SCHEMA)
+
+archived_quiz_result = Table(
+    "quizresult",
+    archive_metadata,
+    # Keeps the id the result had in the hot table
+    Column("id", Integer, primary_key=True),
+    Column("quiz_id", Integer, nullable=False),
+    Column("user_id", Integer, nullable=False),
+    Column("score", Integer, nullable=False),
+    Column("max_score", Integer, nullable=False),
+    Column("correct_answers", Integer, nullable=False),
+    Column("completed_at", Integer, nullable=False),
+    Column("answers", JSON(none_as_null=True), nullable=True),
+    Column("answers_packed", LargeBinary, nullable=True),
+    Column("answers_version", Integer, nullable=True),
+    Index("ix_archive_quizresult_user_id", "user_id"),
+    Index("ix_archive_quizresult_quiz_id", "quiz_id"),
+)
+
+archived_quiz_result_answer = Table(
+    "quizresult_answer",
+    archive_metadata,
+    Column(
+        "result_id",
+        Integer,
+        ForeignKey(archived_quiz_result.c.id, ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("question_id", Integer, primary_key=True),
+    Column("option_index", SmallInteger, nullable=True),
+    Column("is_correct", Boolean, nullable=False),
+    Index(
+        "ix_archive_quizresult_answer_question_id_is_correct",
+        "question_id",
+        "is_correct",
+        "option_index",
+    ),
+)
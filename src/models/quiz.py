@@ -1,6 +1,9 @@
-from sqlalchemy import (JSON, Boolean, Column, DateTime, ForeignKey, Integer,
-                        String, Text, func)
-from sqlalchemy.orm import relationship
+from typing import Any
+
+from sqlalchemy import (JSON, Boolean, Column, DateTime, ForeignKey, Index,
+                        Integer, LargeBinary, SmallInteger, String, Table,
+                        Text, event, func, update)
+from sqlalchemy.orm import Session, backref, relationship
 
 from src.models.base import Base
 
@@ -11,24 +14,66 @@ class Quiz(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    author_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    author_id = Column(
+        Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False
+    )
     is_public = Column(Boolean, default=True)
+    # Bumped by every write to the quiz or its questions
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Denormalized for listings, kept in step by the writes in src.crud.quiz
+    # with atomic increments; see src.commands.repair_quiz_counters
+    question_count = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    attempt_count = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    score_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    max_score_sum = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
-    # Relationships
-    author = relationship("User", backref="quizzes")
+    __table_args__ = (
+        # Most played quizzes first, e.g. for the startup warm-up
+        Index("ix_quiz_attempt_count", "attempt_count"),
+    )
+
+    # Relationships. Children are deleted by the database's ON DELETE
+    # CASCADE rather than loaded and deleted one by one.
+    author = relationship(
+        "User",
+        backref=backref(
+            "quizzes", cascade="all, delete-orphan", passive_deletes=True
+        ),
+    )
     questions = relationship(
-        "Question", back_populates="quiz", cascade="all, delete-orphan"
+        "Question",
+        back_populates="quiz",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     results = relationship(
-        "QuizResult", back_populates="quiz", cascade="all, delete-orphan"
+        "QuizResult",
+        back_populates="quiz",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
+    @property
+    def average_score_percent(self) -> float | None:
+        """Average share of the points scored, over all attempts."""
+        if not self.max_score_sum:
+            return None
+        return round(100 * self.score_sum / self.max_score_sum, 1)
+
 
 class Question(Base):
     """Question model."""
 
     id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("quiz.id"), nullable=False)
+    quiz_id = Column(
+        Integer, ForeignKey("quiz.id", ondelete="CASCADE"), nullable=False
+    )
     text = Column(Text, nullable=False)
     options = Column(JSON, nullable=False)  # List of possible answers
     correct_answer = Column(String(255), nullable=False)
@@ -42,19 +87,120 @@ class QuizResult(Base):
     """Quiz result model."""
 
     id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("quiz.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    quiz_id = Column(
+        Integer, ForeignKey("quiz.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = Column(
+        Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False
+    )
     score = Column(Integer, nullable=False)
     max_score = Column(Integer, nullable=False)
     correct_answers = Column(
         Integer, nullable=False, default=0
     )  # Number of correct answers
     answers = Column(
-        JSON,
-        nullable=False
-    )  # User's answers with question_id -> answer
+        JSON(none_as_null=True),
+        nullable=True
+    )  # User's answers with question_id -> answer, unless packed
+    # Answers as option indexes of a quiz version, see
+    # src.utils.answer_packing
+    answers_packed = Column(LargeBinary, nullable=True)
+    answers_version = Column(Integer, nullable=True)
     completed_at = Column(DateTime, server_default=func.now(), nullable=False)
+    # Set by clients that retry submissions, unique per user
+    idempotency_key = Column(String(64), nullable=True)
 
     # Relationships
     quiz = relationship("Quiz", back_populates="results")
-    user = relationship("User", backref="quiz_results")
+    user = relationship(
+        "User",
+        backref=backref(
+            "quiz_results", cascade="all, delete-orphan", passive_deletes=True
+        ),
+    )
+
+    __table_args__ = (
+        # Deletes of quizzes cascade to their results by it
+        Index("ix_quizresult_quiz_id", "quiz_id"),
+        Index(
+            "ix_quizresult_user_id_idempotency_key",
+            "user_id",
+            "idempotency_key",
+            unique=True,
+        ),
+    )
+
+
+class QuizAnswerLayout(Base):
+    """Questions and options of a quiz version, to unpack packed answers."""
+
+    quiz_id = Column(
+        Integer,
+        ForeignKey("quiz.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version = Column(Integer, primary_key=True)
+    # [[question_id, [option, ...]], ...] in question order
+    questions = Column(JSON, nullable=False)
+
+
+# One row per answer of a result, for answer statistics that would
+# otherwise parse the answers of every result; filled with
+# SUBMISSIONS_ANSWER_ROWS. A core table, so it has no created/updated times.
+quiz_result_answer = Table(
+    "quizresult_answer",
+    Base.metadata,
+    Column(
+        "result_id",
+        Integer,
+        ForeignKey("quizresult.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    # Not a foreign key: results keep the answers of deleted questions
+    Column("question_id", Integer, primary_key=True),
+    # Index into the question's options when submitted, NULL if the answer
+    # was not one of them
+    Column("option_index", SmallInteger, nullable=True),
+    Column("is_correct", Boolean, nullable=False),
+    # option_index makes the per-option counts index-only
+    Index(
+        "ix_quizresult_answer_question_id_is_correct",
+        "question_id",
+        "is_correct",
+        "option_index",
+    ),
+)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_quiz_versions(session: Session, *_: Any) -> None:
+    """Bump the version of every quiz whose row or questions change.
+
+    Only ORM unit-of-work changes are seen here; bulk ``update()`` or
+    ``delete()`` statements must bump the version themselves.
+    """
+    quiz_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Question):
+            quiz_id = obj.quiz_id
+            if quiz_id is None and obj.quiz is not None:
+                quiz_id = obj.quiz.id
+            if quiz_id is not None:
+                quiz_ids.add(quiz_id)
+        elif (
+            isinstance(obj, Quiz)
+            and obj in session.dirty
+            and session.is_modified(obj, include_collections=False)
+        ):
+            quiz_ids.add(obj.id)
+
+    for quiz_id in quiz_ids:
+        quiz = session.identity_map.get((Quiz, (quiz_id,), None))
+        if quiz is None:
+            session.execute(
+                update(Quiz)
+                .where(Quiz.id == quiz_id)
+                .values(version=Quiz.version + 1)
+            )
+        elif quiz not in session.deleted and quiz not in session.new:
+            quiz.version = Quiz.version + 1
@@ -1,7 +1,10 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field, model_validator
 
+from src.utils.serialization import Serializer
+
 
 class QuestionBase(BaseModel):
     """Base question schema."""
@@ -40,6 +43,20 @@ class QuestionUpdate(BaseModel):
         return self
 
 
+class QuestionBulkUpdate(QuestionUpdate):
+    """Schema for a question update within a bulk edit."""
+
+    id: int
+
+
+class QuestionBulkEdit(BaseModel):
+    """Schema for creating, updating and deleting questions at once."""
+
+    create: list[QuestionCreate] = []
+    update: list[QuestionBulkUpdate] = []
+    delete: list[int] = []
+
+
 class QuestionInDB(QuestionBase):
     """Schema for question in database."""
 
@@ -101,6 +118,14 @@ class QuizResponse(QuizInDB):
     author_username: str | None = None
 
 
+class QuizListResponse(QuizResponse):
+    """Schema for quizzes in listings, with their play statistics."""
+
+    question_count: int = 0
+    attempt_count: int = 0
+    average_score_percent: float | None = None
+
+
 class QuizAnswer(BaseModel):
     """Schema for quiz answer."""
 
@@ -121,6 +146,22 @@ class QuizResultCreate(BaseModel):
     answers: list[QuizAnswer]
 
 
+class QuizResultBatchItem(QuizResultCreate):
+    """Schema for one submission of a batch."""
+
+    quiz_id: int
+    # Retrying a submission with the same key does not store it twice
+    idempotency_key: str | None = Field(None, min_length=1, max_length=64)
+
+
+class QuizResultBatch(BaseModel):
+    """Schema for a batch of submissions across quizzes."""
+
+    submissions: list[QuizResultBatchItem] = Field(
+        ..., min_length=1, max_length=1000
+    )
+
+
 class QuizResultBase(BaseModel):
     """Base quiz result schema."""
 
@@ -153,6 +194,31 @@ class QuizResultResponse(QuizResultInDB):
     correct_answers: int | None = None
 
 
+class QuizResultAccepted(QuizResultBase):
+    """Schema for a graded result that is queued to be stored."""
+
+    correct_answers: int
+    completed_at: datetime
+
+
+class QuizResultBatchItemResponse(BaseModel):
+    """Schema for the outcome of one submission of a batch."""
+
+    index: int
+    status: Literal["created", "duplicate", "error"]
+    result: QuizResultResponse | None = None
+    detail: str | None = None
+
+
+class QuizResultBatchResponse(BaseModel):
+    """Schema for the outcome of a batch of submissions."""
+
+    created: int
+    duplicates: int
+    errors: int
+    items: list[QuizResultBatchItemResponse]
+
+
 class LeaderboardEntry(BaseModel):
     """Schema for leaderboard entry."""
 
@@ -169,3 +235,61 @@ class LeaderboardResponse(BaseModel):
     quiz_id: int
     quiz_title: str
     entries: list[LeaderboardEntry]
+
+
+class AnswerOptionStats(BaseModel):
+    """Schema for how often an option of a question was picked."""
+
+    index: int
+    # None if the question no longer has an option at this index
+    option: str | None = None
+    answers: int
+    correct: int
+
+
+class QuestionAnswerStats(BaseModel):
+    """Schema for the answers given to a question."""
+
+    question_id: int
+    answers: int
+    correct: int
+    options: list[AnswerOptionStats]
+    # Answers that were not one of the options
+    other: int
+
+
+class QuestionAnswerUser(BaseModel):
+    """Schema for a user who answered a question."""
+
+    user_id: int
+    username: str
+    answers: int
+
+
+class QuizImportRowError(BaseModel):
+    """Schema for a row rejected by a quiz import."""
+
+    line: int
+    quiz: str | None = None
+    errors: list[str]
+
+
+class QuizImportReport(BaseModel):
+    """Schema for the outcome of a quiz import."""
+
+    rows: int = 0
+    quizzes_created: int = 0
+    questions_created: int = 0
+    rows_rejected: int = 0
+    # Only the first QUIZ_IMPORT_MAX_ERRORS rejected rows are listed
+    errors: list[QuizImportRowError] = []
+
+
+# Precompiled serializers for the hot read paths
+quiz_serializer = Serializer(QuizResponse)
+quiz_list_serializer = Serializer(list[QuizListResponse])
+quiz_result_serializer = Serializer(QuizResultResponse)
+quiz_result_accepted_serializer = Serializer(QuizResultAccepted)
+quiz_result_list_serializer = Serializer(list[QuizResultResponse])
+quiz_result_batch_serializer = Serializer(QuizResultBatchResponse)
+leaderboard_serializer = Serializer(LeaderboardResponse)
@@ -0,0 +1,25 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class ArchiveSettings(BaseSettings):
+    path: str | None = Field(
+        None,
+        description="SQLite file old quiz results are moved to, attached to "
+                    "every connection as ``archive``; unset disables it"
+    )
+    after_days: int = Field(
+        180,
+        description="Days after which results are moved to the archive"
+    )
+    batch_size: int = Field(
+        5000,
+        description="Results moved to the archive per transaction"
+    )
+
+    model_config = get_base_config("archive_")
+
+
+archive_settings = ArchiveSettings()
@@ -0,0 +1,40 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class CacheSettings(BaseSettings):
+    enabled: bool = Field(
+        True,
+        description="Keep hot read data in per-process memory caches"
+    )
+    max_entries: int = Field(
+        10_000,
+        description="Entries kept by each cache before evicting the oldest"
+    )
+    coalesce_reads: bool = Field(
+        True,
+        description="Share one computation between identical concurrent reads"
+    )
+    answer_key_ttl: float = Field(
+        60.0,
+        description="Seconds an answer key may be served from memory"
+    )
+    leaderboard_ttl: float = Field(
+        5.0,
+        description="Seconds a leaderboard may be served from memory"
+    )
+    quiz_payload_ttl: float = Field(
+        3600.0,
+        description="Seconds a serialized quiz version may stay in memory"
+    )
+    quiz_payload_max_entries: int = Field(
+        1_000,
+        description="Serialized quiz versions kept in memory"
+    )
+
+    model_config = get_base_config("cache_")
+
+
+cache_settings = CacheSettings()
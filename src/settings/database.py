@@ -9,6 +9,49 @@ class SqliteDatabaseSettings(BaseSettings):
         "./inno_quiz.db",
         description="SQLite database path"
     )
+    busy_timeout: float = Field(
+        5.0,
+        description="Seconds SQLite waits for a lock before failing"
+    )
+    write_retries: int = Field(
+        3,
+        description="Retries of a write transaction that found the database "
+                    "locked"
+    )
+    write_retry_backoff: float = Field(
+        0.05,
+        description="Base delay in seconds before retrying a locked write, "
+                    "doubled per retry and jittered"
+    )
+    write_retry_max_backoff: float = Field(
+        1.0,
+        description="Longest delay in seconds before retrying a locked write"
+    )
+    delete_batch_size: int = Field(
+        10000,
+        description="Results deleted per transaction when a large quiz or "
+                    "user is deleted in the background"
+    )
+    background_delete_threshold: int = Field(
+        50000,
+        description="Attempts above which a quiz, or a user with their "
+                    "quizzes, is deleted in the background, in batches"
+    )
+    single_writer: bool = Field(
+        False,
+        description=(
+            "Send writes through one writer connection and reads to a pool "
+            "of read-only connections, in WAL mode"
+        )
+    )
+    read_pool_size: int = Field(
+        5,
+        description="Read-only connections kept open in single-writer mode"
+    )
+    writer_timeout: float = Field(
+        30.0,
+        description="Seconds a session waits for the writer connection"
+    )
 
     @property
     def dsn(self) -> str:
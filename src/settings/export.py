@@ -0,0 +1,16 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class ExportSettings(BaseSettings):
+    batch_size: int = Field(
+        1_000,
+        description="Rows fetched from the cursor and written per chunk"
+    )
+
+    model_config = get_base_config("export_")
+
+
+export_settings = ExportSettings()
@@ -0,0 +1,14 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class MetricsSettings(BaseSettings):
+    enabled: bool = Field(True, description="Collect and expose metrics")
+    path: str = Field("/metrics", description="Prometheus scrape endpoint")
+
+    model_config = get_base_config("metrics_")
+
+
+metrics_settings = MetricsSettings()
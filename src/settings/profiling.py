@@ -0,0 +1,32 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class ProfilingSettings(BaseSettings):
+    request_profiling_enabled: bool = Field(
+        False,
+        description="Allow admins to profile single requests via a header"
+    )
+    header: str = Field(
+        "X-Profile",
+        description="Request header that triggers a per-request profile"
+    )
+    sampler_enabled: bool = Field(
+        False,
+        description="Run the always-on statistical sampling profiler"
+    )
+    sampler_interval: float = Field(
+        0.01,
+        description="Seconds between two stack samples"
+    )
+    sampler_max_stacks: int = Field(
+        20_000,
+        description="Distinct stacks kept before new ones are truncated"
+    )
+
+    model_config = get_base_config("profiling_")
+
+
+profiling_settings = ProfilingSettings()
@@ -0,0 +1,24 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class QuerySettings(BaseSettings):
+    instrumentation_enabled: bool = Field(
+        True,
+        description="Attribute SQL statements to the current request"
+    )
+    repeat_threshold: int = Field(
+        10,
+        description="Identical statements per request reported as N+1"
+    )
+    strict: bool = Field(
+        False,
+        description="Raise instead of logging on N+1 or budget overrun"
+    )
+
+    model_config = get_base_config("query_")
+
+
+query_settings = QuerySettings()
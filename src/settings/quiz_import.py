@@ -0,0 +1,20 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class QuizImportSettings(BaseSettings):
+    batch_size: int = Field(
+        5_000,
+        description="Rows validated and inserted per transaction"
+    )
+    max_errors: int = Field(
+        1_000,
+        description="Rejected rows listed in the import report"
+    )
+
+    model_config = get_base_config("quiz_import_")
+
+
+quiz_import_settings = QuizImportSettings()
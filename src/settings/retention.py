@@ -0,0 +1,56 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class RetentionSettings(BaseSettings):
+    enabled: bool = Field(
+        False,
+        description="Purge old quiz results in the background, once a day "
+                    "within the purge window"
+    )
+    keep_best: int | None = Field(
+        None,
+        description="Attempts kept per user and quiz, the best scores first; "
+                    "unset keeps all"
+    )
+    max_age_days: int | None = Field(
+        None,
+        description="Days after which attempts are purged; unset keeps all"
+    )
+    batch_size: int = Field(
+        1000,
+        description="Results deleted per transaction"
+    )
+    pause: float = Field(
+        0.05,
+        description="Seconds to pause between two batches"
+    )
+    window_start: int = Field(
+        2,
+        description="UTC hour at which the purge window opens"
+    )
+    window_end: int = Field(
+        5,
+        description="UTC hour at which the purge window closes"
+    )
+    check_interval: float = Field(
+        300.0,
+        description="Seconds between checks whether the window is open"
+    )
+    vacuum_pages: int = Field(
+        10_000,
+        description="Free pages returned to the file system after a purge "
+                    "at most; 0 returns all"
+    )
+    vacuum_batch_pages: int = Field(
+        500,
+        description="Free pages returned per transaction, with a pause "
+                    "between two"
+    )
+
+    model_config = get_base_config("retention_")
+
+
+retention_settings = RetentionSettings()
@@ -0,0 +1,16 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class SerializationSettings(BaseSettings):
+    validate_trusted: bool = Field(
+        False,
+        description="Validate trusted response objects before serializing"
+    )
+
+    model_config = get_base_config("serialization_")
+
+
+serialization_settings = SerializationSettings()
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class SnapshotSettings(BaseSettings):
+    directory: Path = Field(
+        Path("snapshots"),
+        description="Local directory the Parquet snapshots are written to"
+    )
+    batch_size: int = Field(
+        10_000,
+        description="Rows read from the database and written per row group"
+    )
+    compression: str = Field(
+        "zstd",
+        description="Parquet compression codec"
+    )
+
+    model_config = get_base_config("snapshot_")
+
+
+snapshot_settings = SnapshotSettings()
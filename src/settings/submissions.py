@@ -0,0 +1,52 @@
+from typing import Literal
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class SubmissionSettings(BaseSettings):
+    write_behind: bool = Field(
+        False,
+        description="Queue graded results and store them in group commits"
+    )
+    durability: Literal["commit", "queue"] = Field(
+        "commit",
+        description=(
+            "Answer once the result is committed, or as soon as it is "
+            "queued (lost if the process dies before the next commit)"
+        )
+    )
+    queue_size: int = Field(
+        10_000,
+        description="Results waiting to be written before submitters wait"
+    )
+    batch_size: int = Field(
+        500,
+        description="Results written per group commit at most"
+    )
+    flush_interval: float = Field(
+        0.005,
+        description="Seconds the writer gathers results before a commit"
+    )
+    enqueue_timeout: float = Field(
+        1.0,
+        description="Seconds a submission waits for room in a full queue"
+    )
+    packed_answers: bool = Field(
+        False,
+        description="Store answers as option indexes of the quiz version, "
+                    "packed into bytes; answers that are not an option stay "
+                    "JSON"
+    )
+    answer_rows: bool = Field(
+        False,
+        description="Also store every answer as a row of quizresult_answer, "
+                    "for the answer statistics endpoints"
+    )
+
+    model_config = get_base_config("submissions_")
+
+
+submission_settings = SubmissionSettings()
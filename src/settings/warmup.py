@@ -0,0 +1,49 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from src.utils.base.settings import get_base_config
+
+
+class WarmupSettings(BaseSettings):
+    enabled: bool = Field(
+        True,
+        description="Warm caches and connections before reporting ready"
+    )
+    quizzes: int = Field(
+        100,
+        description="Number of most played quizzes to preload"
+    )
+    connections: int = Field(
+        5,
+        description="Pool connections to open during warm-up"
+    )
+    touch_indexes: bool = Field(
+        True,
+        description="Read the hot indexes once to fill the page cache"
+    )
+    hot_indexes: list[str] = Field(
+        [
+            "ix_user_username",
+            "ix_quiz_attempt_count",
+            "ix_quizresult_quiz_id",
+            "ix_quizresult_user_id_idempotency_key",
+        ],
+        description="Indexes read by touch_indexes, as a JSON list of names"
+    )
+    full_scan: bool = Field(
+        False,
+        description="Read every table and index instead of the hot indexes"
+    )
+    scan_rows: int = Field(
+        100_000,
+        description="Rows read at most by each table or index scan"
+    )
+    timeout: float = Field(
+        30.0,
+        description="Seconds after which the app reports ready regardless"
+    )
+
+    model_config = get_base_config("warmup_")
+
+
+warmup_settings = WarmupSettings()
@@ -0,0 +1,55 @@
+"""Compact storage of submitted answers.
+
+A JSON answers object repeats every question id and the full text of every
+chosen option in every result. Packed, a result stores one byte per
+question of the quiz version it was graded against, in question order: the
+index of the chosen option, or ``NOT_ANSWERED``. The questions and options
+of that version, its ``AnswerLayout``, are stored once in
+``quizanswerlayout`` and turn the bytes back into the same object.
+
+Answers that are not one of the options, for instance free text, cannot be
+packed and stay JSON.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cached_property
+
+NOT_ANSWERED = 0xFF
+
+
+@dataclass(frozen=True)
+class AnswerLayout:
+    """Questions and their options of one quiz version, in order."""
+
+    quiz_id: int
+    version: int
+    questions: tuple[tuple[int, tuple[str, ...]], ...]
+
+    @cached_property
+    def _positions(self) -> dict[str, tuple[int, tuple[str, ...]]]:
+        return {
+            str(question_id): (position, options)
+            for position, (question_id, options) in enumerate(self.questions)
+        }
+
+    def pack(self, answers: Mapping[str, str]) -> bytes | None:
+        """Pack answers keyed by question id, or None if they do not fit."""
+        packed = bytearray([NOT_ANSWERED]) * len(self.questions)
+        for question_id, answer in answers.items():
+            position = self._positions.get(question_id)
+            if position is None or answer not in position[1]:
+                return None
+            index = position[1].index(answer)
+            if index >= NOT_ANSWERED:
+                return None
+            packed[position[0]] = index
+        return bytes(packed)
+
+    def unpack(self, packed: bytes) -> dict[str, str]:
+        """Turn packed answers back into answers keyed by question id."""
+        return {
+            str(question_id): options[index]
+            for (question_id, options), index in zip(self.questions, packed)
+            if index != NOT_ANSWERED
+        }
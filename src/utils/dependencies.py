@@ -1,7 +1,8 @@
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, FastAPI
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
@@ -22,6 +23,17 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+@contextmanager
+def db_session_for(app: FastAPI) -> Iterator[Session]:
+    """Open a session outside of a route, honouring overrides of get_db."""
+    dependency = app.dependency_overrides.get(get_db, get_db)
+    generator = dependency()
+    try:
+        yield next(generator)
+    finally:
+        generator.close()
+
+
 def get_current_user_id(
     bearer: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
 ) -> str:
@@ -0,0 +1,22 @@
+"""Entity tags for conditional GET requests."""
+
+
+def make_etag(*parts: object) -> str:
+    """Build a strong entity tag from the parts identifying a representation."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag``.
+
+    Uses the weak comparison required for ``If-None-Match``, so ``W/``
+    prefixes are ignored, and ``*`` matches any tag.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in (
+        tag.removeprefix("W/") for tag in candidates
+    )
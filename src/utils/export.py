@@ -0,0 +1,91 @@
+"""Streaming encoders for bulk exports.
+
+Rows arrive in batches from a database cursor and leave as encoded chunks,
+so an export holds one batch in memory however many rows it has.
+"""
+
+import csv
+import io
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+import orjson
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+# Media types accepted as a request for each export format
+MEDIA_TYPES = {
+    NDJSON: NDJSON,
+    "application/jsonl": NDJSON,
+    "application/json-lines": NDJSON,
+    CSV: CSV,
+}
+EXTENSIONS = {NDJSON: "ndjson", CSV: "csv"}
+
+
+def negotiate(accept: str | None, default: str = NDJSON) -> str | None:
+    """Pick the export format for an ``Accept`` header.
+
+    Returns None when the client accepts none of the export formats.
+    """
+    if not accept:
+        return default
+    ranked = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranked.append((-quality, position, media_type.lower()))
+    for _, _, media_type in sorted(ranked):
+        if media_type in MEDIA_TYPES:
+            return MEDIA_TYPES[media_type]
+        if media_type in ("*/*", "application/*"):
+            return default
+        if media_type == "text/*":
+            return CSV
+    return None
+
+
+def ndjson_chunks(
+    batches: Iterable[Sequence[Mapping[str, Any]]],
+) -> Iterator[bytes]:
+    """Encode every batch of rows as newline-delimited JSON."""
+    for batch in batches:
+        yield b"".join(orjson.dumps(dict(row)) + b"\n" for row in batch)
+
+
+def csv_chunks(
+    columns: Sequence[str],
+    batches: Iterable[Sequence[Mapping[str, Any]]],
+) -> Iterator[bytes]:
+    """Encode a header and every batch of rows as CSV.
+
+    Values that are not strings or numbers are written as JSON.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [_csv_value(row[column]) for column in columns] for row in batch
+        )
+        yield buffer.getvalue().encode()
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None or isinstance(value, str | int | float):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return orjson.dumps(value).decode()
@@ -0,0 +1,113 @@
+"""Per-process memory caches for hot read paths.
+
+Each uvicorn worker keeps its own copy. Writes in this process invalidate
+the affected entries directly; entries written by other workers expire
+after the cache's time to live. Hits, misses and sizes are exported through
+the ``cache_*`` Prometheus metrics under the cache name.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from src.settings.cache import cache_settings
+from src.utils.metrics import CACHE_ENTRIES, CACHE_HITS, CACHE_MISSES
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+_caches: list["LocalCache"] = []
+
+
+class LocalCache(Generic[T]):
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(
+        self, name: str, ttl: float, max_entries: int | None = None
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries or cache_settings.max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, T]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = CACHE_HITS.labels(name)
+        self._misses = CACHE_MISSES.labels(name)
+        self._size = CACHE_ENTRIES.labels(name)
+        _caches.append(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self._size.set(len(self._entries))
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def get(self, key: Hashable) -> T | None:
+        value = self._lookup(key)
+        if value is _MISSING:
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._size.set(len(self._entries))
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """Return the cached value, computing and storing it on a miss.
+
+        Nothing is cached while caching is disabled in the settings.
+        """
+        if not cache_settings.enabled:
+            return compute()
+        value = self._lookup(key)
+        if value is not _MISSING:
+            self._hits.inc()
+            return value
+        self._misses.inc()
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._size.set(len(self._entries))
+
+    def invalidate_matching(self, predicate: Callable[[Any], bool]) -> None:
+        """Drop every entry whose key satisfies ``predicate``."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+            self._size.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size.set(0)
+
+
+def clear_all() -> None:
+    """Empty every cache of this process."""
+    for cache in _caches:
+        cache.clear()
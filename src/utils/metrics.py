@@ -0,0 +1,272 @@
+"""Prometheus metrics.
+
+Metrics live in the default ``prometheus_client`` registry. When the
+``PROMETHEUS_MULTIPROC_DIR`` environment variable points to a writable
+directory before the workers start, every uvicorn worker writes its samples
+there and ``render_metrics`` aggregates them, so a scrape sees the whole
+process group instead of whichever worker happened to answer.
+"""
+
+import os
+import time
+from typing import Any
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+UNMATCHED_ROUTE = "<unmatched>"
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# HTTP
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Database connection pool
+DB_POOL_OPEN = Gauge(
+    "db_pool_open_connections",
+    "DBAPI connections currently held open by connection pools.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Pooled connections currently checked out by a session.",
+    multiprocess_mode="livesum",
+)
+
+# Write transactions that found the database locked
+DB_WRITE_RETRIES = Counter(
+    "db_write_retries_total",
+    "Write transactions retried because the database was locked.",
+    ["operation"],
+)
+DB_WRITE_LOCK_FAILURES = Counter(
+    "db_write_lock_failures_total",
+    "Write transactions that gave up because the database stayed locked.",
+    ["operation"],
+)
+DB_WRITE_CONTENTION = Histogram(
+    "db_write_contention_seconds",
+    "Time write transactions lost to a locked database before finishing.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Retention purges of old quiz results
+RETENTION_PURGED = Counter(
+    "retention_purged_results_total",
+    "Quiz results purged by the retention policy.",
+    ["rule"],
+)
+RETENTION_RECLAIMED = Counter(
+    "retention_reclaimed_bytes_total",
+    "Bytes returned to the file system by incremental vacuum after purges.",
+)
+RETENTION_LAST_PURGE = Gauge(
+    "retention_last_purge_timestamp_seconds",
+    "Time the last complete retention purge finished.",
+    multiprocess_mode="max",
+)
+
+# Single SQLite writer connection
+DB_WRITER_WAITING = Gauge(
+    "db_writer_waiting_sessions",
+    "Sessions queued for the single writer connection.",
+    multiprocess_mode="livesum",
+)
+DB_WRITER_WAIT = Histogram(
+    "db_writer_wait_seconds",
+    "Time sessions waited for the single writer connection.",
+    buckets=LATENCY_BUCKETS,
+)
+DB_WRITER_HOLD = Histogram(
+    "db_writer_hold_seconds",
+    "Time sessions held the single writer connection.",
+    buckets=LATENCY_BUCKETS,
+)
+
+# In-process caches
+CACHE_HITS = Counter(
+    "cache_hits_total",
+    "Cache lookups answered from the cache.",
+    ["cache"],
+)
+CACHE_MISSES = Counter(
+    "cache_misses_total",
+    "Cache lookups that had to compute the value.",
+    ["cache"],
+)
+CACHE_ENTRIES = Gauge(
+    "cache_entries",
+    "Entries currently held by a cache.",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+# Coalescing of identical concurrent reads
+SINGLEFLIGHT_EXECUTIONS = Counter(
+    "singleflight_executions_total",
+    "Computations started by a single-flight group.",
+    ["name"],
+)
+SINGLEFLIGHT_COALESCED = Counter(
+    "singleflight_coalesced_total",
+    "Requests that joined an in-flight computation instead of running one.",
+    ["name"],
+)
+SINGLEFLIGHT_FANOUT = Histogram(
+    "singleflight_fanout",
+    "Requests served by one single-flight computation.",
+    ["name"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+# Startup warm-up
+WARMUP_DURATION = Gauge(
+    "warmup_duration_seconds",
+    "Time the last warm-up took, or ran before timing out.",
+    multiprocess_mode="liveall",
+)
+WARMUP_ITEMS = Gauge(
+    "warmup_items",
+    "Items warmed by the last warm-up, by kind.",
+    ["kind"],
+    multiprocess_mode="liveall",
+)
+WARMUP_COVERAGE = Gauge(
+    "warmup_coverage_ratio",
+    "Share of the planned warm-up work that completed.",
+    multiprocess_mode="liveall",
+)
+
+# Write-behind queue of quiz results
+SUBMISSION_QUEUE_DEPTH = Gauge(
+    "submission_queue_depth",
+    "Graded results waiting in the write-behind queue.",
+    multiprocess_mode="livesum",
+)
+SUBMISSION_BATCH_SIZE = Histogram(
+    "submission_batch_size",
+    "Results stored per group commit of the write-behind queue.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+SUBMISSION_REJECTED = Counter(
+    "submission_rejected_total",
+    "Submissions refused because the write-behind queue stayed full.",
+)
+SUBMISSION_WRITE_ERRORS = Counter(
+    "submission_write_errors_total",
+    "Queued results that could not be stored.",
+)
+
+
+def _route_template(scope: Scope) -> str:
+    """Return the path template of the matched route, e.g. ``/quizzes/{quiz_id}``."""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording latency, status and concurrency per route.
+
+    Routes are labelled by their template rather than the raw path so that
+    label cardinality stays bounded by the number of declared routes.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = _route_template(scope)
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUESTS_TOTAL.labels(method, route, str(status_code)).inc()
+
+
+@event.listens_for(Pool, "connect")
+def _on_pool_connect(*_: Any) -> None:
+    DB_POOL_OPEN.inc()
+
+
+@event.listens_for(Pool, "close")
+def _on_pool_close(*_: Any) -> None:
+    DB_POOL_OPEN.dec()
+
+
+@event.listens_for(Pool, "detach")
+def _on_pool_detach(*_: Any) -> None:
+    DB_POOL_OPEN.dec()
+
+
+@event.listens_for(Pool, "checkout")
+def _on_pool_checkout(*_: Any) -> None:
+    DB_POOL_CHECKED_OUT.inc()
+
+
+@event.listens_for(Pool, "checkin")
+def _on_pool_checkin(*_: Any) -> None:
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def is_multiprocess() -> bool:
+    """Whether samples are shared between workers through the filesystem."""
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text exposition format."""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop the live gauges of this worker from the shared directory."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
@@ -2,11 +2,18 @@ import datetime
 import uuid
 from collections.abc import Generator
 from contextlib import contextmanager
+from functools import cache
+from typing import Any
 
 import sqlalchemy
-from sqlalchemy import Boolean, Column, String, create_engine
+from sqlalchemy import Boolean, Column, Engine, String, create_engine, event
 from sqlalchemy.orm import Mapped, Session, mapped_column, sessionmaker
 
+from src.models.archive import ARCHIVE_SCHEMA, archive_metadata
+from src.settings.archive import archive_settings
+from src.utils.single_writer import (RoutingEngines, RoutingSession,
+                                     create_routing_engines)
+
 try:
     from src.settings.database_override import \
         sqlite_database_settings as database_settings
@@ -39,32 +46,107 @@ class AvailableMixin:
     available = Column(Boolean, default=True, nullable=False)
 
 
-# Use standard database URL
-db_url = database_settings.dsn
+def enable_foreign_keys(dbapi_connection: Any, _: Any) -> None:
+    """Turn on foreign keys, which SQLite leaves off, so deletes cascade."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
 
-# Configure engine based on database type
-connect_args = {}
-if "sqlite" in db_url:
-    connect_args = {"check_same_thread": False}
 
-engine = create_engine(
-    db_url,
-    connect_args=connect_args,
-    echo=False,
-)
+def attach_archive(dbapi_connection: Any, _: Any) -> None:
+    """Attach the archive of old quiz results, see src.models.archive."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(
+        f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (archive_settings.path,)
+    )
+    cursor.close()
+
+
+def archive_enabled() -> bool:
+    return bool(archive_settings.path)
+
+
+@cache
+def get_engine() -> Engine:
+    """Create the application engine on first use."""
+    # Use standard database URL
+    db_url = database_settings.dsn
 
+    # Configure engine based on database type
+    connect_args = {}
+    if "sqlite" in db_url:
+        connect_args = {
+            "check_same_thread": False,
+            "timeout": database_settings.busy_timeout,
+        }
+
+    engine = create_engine(
+        db_url,
+        connect_args=connect_args,
+        echo=False,
+    )
+    if "sqlite" in db_url:
+        event.listen(engine, "connect", enable_foreign_keys)
+        if archive_enabled():
+            event.listen(engine, "connect", attach_archive)
+            archive_metadata.create_all(engine)
+    return engine
+
+
+# Sessions are bound to the engine when opened, see get_db_session
 SessionLocal = sessionmaker(
-    bind=engine,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
 
+# Sessions of the single-writer mode, see src.utils.single_writer
+RoutingSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+@cache
+def get_routing_engines() -> RoutingEngines:
+    """Create the writer and reader engines on first use."""
+    engines = create_routing_engines(
+        database_settings.dsn,
+        database_settings.read_pool_size,
+        database_settings.writer_timeout,
+        database_settings.busy_timeout,
+        on_connect=attach_archive if archive_enabled() else None,
+    )
+    if archive_enabled():
+        archive_metadata.create_all(engines.writer)
+    return engines
+
+
+def single_writer_enabled() -> bool:
+    return (
+        database_settings.single_writer
+        and database_settings.dsn.startswith("sqlite")
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # Keep ``from src.utils.orm import engine`` working without creating the
+    # engine at import time
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 @contextmanager
 def get_db_session() -> Generator[Session, None, None]:
     """Provide a database session."""
-    session = SessionLocal()
+    if single_writer_enabled():
+        session = RoutingSessionLocal(engines=get_routing_engines())
+    else:
+        session = SessionLocal(bind=get_engine())
     try:
         yield session
     except Exception:
@@ -0,0 +1,268 @@
+"""Request and sampling profilers.
+
+Two independent tools, both off by default:
+
+* ``ProfilingMiddleware`` runs ``cProfile`` around a single request when an
+  admin sends the profiling header, and answers with the profile instead of
+  the normal response body.
+* ``SamplingProfiler`` is a background thread that periodically captures the
+  stacks of all other threads and aggregates them into flame graph data.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.auth.dependencies import get_db_user
+from src.auth.utils import decode_access_token
+from src.settings.profiling import profiling_settings
+from src.utils.dependencies import db_session_for
+
+Frame = tuple[str, str, int]  # function name, file name, first line
+
+# Frames where a thread is parked rather than doing work
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+}
+_TRUNCATED: tuple[Frame, ...] = (("[truncated]", "", 0),)
+
+
+def _is_admin(app: FastAPI, authorization: str | None) -> bool:
+    """Check that the bearer token belongs to an active superuser."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    from jose import JWTError
+
+    try:
+        payload = decode_access_token(token)
+    except JWTError:
+        return False
+    if "admin" not in payload.get("scopes", []):
+        return False
+
+    with db_session_for(app) as db:
+        user = get_db_user(db, payload.get("sub"))
+        return bool(user and user.is_active and user.is_superuser)
+
+
+class ProfilingMiddleware:
+    """Profile a request deterministically when an admin asks for it.
+
+    The header value selects the artifact: ``pstats`` (default) returns a
+    file loadable with ``pstats.Stats``, ``text`` a cumulative-time report.
+    Profiled requests are serialized, since only one profiler can be active
+    at a time; on Python 3.12+ ``cProfile`` observes all threads, so the
+    threadpool running sync endpoints is included.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.header = profiling_settings.header.lower().encode()
+        self.lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not any(
+            name == self.header for name, _ in scope["headers"]
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not await run_in_threadpool(
+            _is_admin, scope["app"], headers.get("authorization")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        await run_in_threadpool(self.lock.acquire)
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                profiler.disable()
+        finally:
+            self.lock.release()
+
+        response = self._artifact(profiler, headers[self.header.decode()])
+        response.headers["X-Profiled-Status"] = str(status_code)
+        await response(scope, receive, send)
+
+    @staticmethod
+    def _artifact(profiler: cProfile.Profile, kind: str) -> Response:
+        if kind.strip().lower() == "text":
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+            return Response(stream.getvalue(), media_type="text/plain")
+
+        profiler.create_stats()
+        return Response(
+            marshal.dumps(profiler.stats),
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": 'attachment; filename="request.pstats"'
+            },
+        )
+
+
+class SamplingProfiler:
+    """Low-overhead statistical profiler aggregating stacks of all threads."""
+
+    def __init__(self, interval: float, max_stacks: int) -> None:
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.samples = 0
+        self.started_at: float | None = None
+        self._stacks: Counter[tuple[Frame, ...]] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling, keeping the data collected so far."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self) -> None:
+        """Forget all collected samples."""
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.started_at = time.time()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(exclude=own_id)
+
+    def sample(self, exclude: int | None = None) -> None:
+        """Record the current stack of every thread once."""
+        frames = sys._current_frames()
+        with self._lock:
+            self.samples += 1
+            for thread_id, frame in frames.items():
+                if thread_id == exclude:
+                    continue
+                stack = self._walk(frame)
+                if stack is None:
+                    continue
+                if (
+                    stack not in self._stacks
+                    and len(self._stacks) >= self.max_stacks
+                ):
+                    stack = _TRUNCATED
+                self._stacks[stack] += 1
+
+    @staticmethod
+    def _walk(frame: FrameType | None) -> tuple[Frame, ...] | None:
+        """Return the stack root first, or None for idle threads."""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(
+                (code.co_name, code.co_filename, code.co_firstlineno)
+            )
+            frame = frame.f_back
+        if not stack:
+            return None
+        leaf_name, leaf_file, _ = stack[0]
+        if (leaf_file.rsplit("/", 1)[-1], leaf_name) in _IDLE_FRAMES:
+            return None
+        return tuple(reversed(stack))
+
+    def stacks(self) -> dict[tuple[Frame, ...], int]:
+        with self._lock:
+            return dict(self._stacks)
+
+    def folded(self) -> str:
+        """Render stacks in the folded format used by flamegraph.pl."""
+        lines = []
+        for stack, count in self.stacks().items():
+            names = ";".join(
+                f"{name} ({file}:{line})" if file else name
+                for name, file, line in stack
+            )
+            lines.append(f"{names} {count}")
+        return "\n".join(sorted(lines)) + "\n"
+
+    def speedscope(self) -> dict[str, Any]:
+        """Render stacks as a sampled speedscope profile."""
+        frame_index: dict[Frame, int] = {}
+        samples = []
+        weights = []
+        for stack, count in self.stacks().items():
+            samples.append(
+                [frame_index.setdefault(frame, len(frame_index))
+                 for frame in stack]
+            )
+            weights.append(count * self.interval)
+        total = sum(weights)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "inno-quiz",
+            "name": "inno-quiz sampling profile",
+            "shared": {
+                "frames": [
+                    {"name": name, "file": file, "line": line}
+                    for name, file, line in frame_index
+                ],
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": "all threads",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": total,
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+sampler = SamplingProfiler(
+    interval=profiling_settings.sampler_interval,
+    max_stacks=profiling_settings.sampler_max_stacks,
+)
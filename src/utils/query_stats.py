@@ -0,0 +1,168 @@
+"""Per-request SQL statement accounting.
+
+Every statement executed through any SQLAlchemy engine is attributed to the
+request that is active in the current context. The totals are reported in
+the ``Server-Timing`` response header and in the logs, and statements that
+repeat suspiciously often (the usual N+1 symptom) are flagged.
+"""
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.settings.queries import query_settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a request runs too many statements."""
+
+
+@dataclass
+class QueryStats:
+    """Statements executed while tracking was active."""
+
+    count: int = 0
+    duration: float = 0.0
+    budget: int | None = None
+    statements: Counter[str] = field(default_factory=Counter)
+    reported: set[str] = field(default_factory=set)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """Account for one executed statement."""
+        self.count += 1
+        self.duration += elapsed
+        self.statements[statement] += 1
+
+        repeats = self.statements[statement]
+        if (
+            repeats >= query_settings.repeat_threshold
+            and statement not in self.reported
+        ):
+            self.reported.add(statement)
+            _violation(
+                f"Statement executed {repeats} times in one request "
+                f"(possible N+1): {statement}"
+            )
+        if self.budget is not None and self.count == self.budget + 1:
+            _violation(f"Query budget of {self.budget} statements exceeded")
+
+    @property
+    def repeated(self) -> dict[str, int]:
+        """Statements executed at least ``repeat_threshold`` times."""
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= query_settings.repeat_threshold
+        }
+
+    def server_timing(self) -> str:
+        """Format the totals as a ``Server-Timing`` metric."""
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+def _violation(message: str) -> None:
+    if query_settings.strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+_current: ContextVar[QueryStats | None] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_stats() -> QueryStats | None:
+    """Return the statistics collected for the current request, if any."""
+    return _current.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect statistics for every statement executed inside the block."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+# The start time lives on the execution context, which is discarded with
+# the statement whether it succeeds or fails
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+    *_: Any,
+) -> None:
+    if _current.get() is not None and context is not None:
+        context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+    *_: Any,
+) -> None:
+    stats = _current.get()
+    start = getattr(context, "_query_start", None)
+    if stats is None or start is None:
+        return
+    stats.record(statement, time.perf_counter() - start)
+
+
+class QueryBudget:
+    """Route dependency declaring how many statements a request may run.
+
+    The budget covers the whole request, authentication included::
+
+        @router.get("/", dependencies=[Depends(QueryBudget(3))])
+    """
+
+    def __init__(self, max_queries: int) -> None:
+        self.max_queries = max_queries
+
+    async def __call__(self) -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = self.max_queries
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware reporting per-request query count and database time."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        logger.debug(
+            "%s %s ran %d queries in %.2f ms",
+            scope["method"],
+            scope["path"],
+            stats.count,
+            stats.duration * 1000,
+        )
@@ -0,0 +1,283 @@
+"""Bulk import of quizzes from JSON lines or CSV.
+
+Every row is one question and names the quiz it belongs to::
+
+    {"quiz": "geo-1", "title": "Capitals", "text": "Capital of France?",
+     "options": ["Paris", "Rome"], "correct_answer": "Paris", "points": 2}
+
+Rows with the same ``quiz`` key go into one new quiz. Its ``title``,
+``description`` and ``is_public`` are taken from the first row of the key,
+and the title defaults to the key itself. CSV files have the same columns,
+with the options as a JSON array or separated by ``|``.
+
+Uploads are parsed line by line, validated with ``QuestionCreate`` a batch
+at a time and inserted with one ``executemany`` and one transaction per
+batch. Rows that fail are skipped and listed in the report.
+"""
+
+import csv
+import io
+import json
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import IO, Any
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import add_to_quiz_counters, invalidate_quiz_caches
+from src.models.quiz import Question, Quiz
+from src.schemas.quiz import (QuestionCreate, QuizBase, QuizImportReport,
+                              QuizImportRowError)
+from src.settings.quiz_import import (QuizImportSettings,
+                                      quiz_import_settings)
+from src.utils.unit_of_work import transactional
+
+JSONL = "jsonl"
+CSV = "csv"
+
+# Parsed row with its line number, or the reason it could not be parsed
+Row = tuple[int, dict[str, Any] | str]
+
+_questions_adapter = TypeAdapter(list[QuestionCreate])
+
+
+def detect_format(
+    filename: str | None, content_type: str | None
+) -> str | None:
+    """Guess the import format from an upload's file name or media type."""
+    name = (filename or "").lower()
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if name.endswith((".jsonl", ".ndjson")) or media_type in (
+        "application/x-ndjson", "application/jsonl", "application/json-lines"
+    ):
+        return JSONL
+    if name.endswith(".csv") or media_type == "text/csv":
+        return CSV
+    return None
+
+
+def parse_jsonl(stream: IO[bytes]) -> Iterator[Row]:
+    """Parse one JSON object per line, skipping blank lines."""
+    for line, raw in enumerate(stream, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as e:
+            yield line, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line, "Expected a JSON object"
+            continue
+        yield line, row
+
+
+def parse_csv(stream: IO[bytes]) -> Iterator[Row]:
+    """Parse CSV rows with a header line; empty cells count as missing."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for cells in reader:
+            row = {
+                key: value for key, value in cells.items()
+                if key is not None and value not in (None, "")
+            }
+            options = row.get("options")
+            if options is not None:
+                try:
+                    row["options"] = (
+                        json.loads(options) if options.startswith("[")
+                        else options.split("|")
+                    )
+                except ValueError as e:
+                    yield reader.line_num, f"options: Invalid JSON: {e}"
+                    continue
+            yield reader.line_num, row
+    finally:
+        # Leave the upload open for its owner
+        text.detach()
+
+
+PARSERS = {JSONL: parse_jsonl, CSV: parse_csv}
+
+
+def _messages(error: ValidationError, skip: int = 0) -> dict[Any, list[str]]:
+    """Group error messages by the first ``skip`` items of their location."""
+    grouped: dict[Any, list[str]] = defaultdict(list)
+    for item in error.errors():
+        loc = item["loc"]
+        field = ".".join(str(part) for part in loc[skip:])
+        message = f"{field}: {item['msg']}" if field else item["msg"]
+        grouped[loc[:skip] if skip else None].append(message)
+    return grouped
+
+
+class _Importer:
+    def __init__(
+        self, db: Session, author_id: int, settings: QuizImportSettings
+    ) -> None:
+        self.db = db
+        self.author_id = author_id
+        self.settings = settings
+        self.report = QuizImportReport()
+        self.quiz_ids: dict[str, int] = {}
+        self.pending: dict[str, QuizBase] = {}
+        self.rejected: dict[str, str] = {}
+
+    def reject(self, line: int, quiz: str | None, errors: list[str]) -> None:
+        self.report.rows_rejected += 1
+        if len(self.report.errors) < self.settings.max_errors:
+            self.report.errors.append(
+                QuizImportRowError(line=line, quiz=quiz, errors=errors)
+            )
+
+    def quiz_key(self, line: int, row: dict[str, Any]) -> str | None:
+        """Return the quiz key of a row, or None after rejecting it."""
+        key = row.get("quiz")
+        if key is None or key == "":
+            self.reject(line, None, ["quiz: Field required"])
+            return None
+        key = str(key)
+        if key in self.rejected:
+            self.reject(line, key, [self.rejected[key]])
+            return None
+        if key not in self.quiz_ids and key not in self.pending:
+            try:
+                self.pending[key] = QuizBase.model_validate({
+                    "title": row.get("title") or key,
+                    **{
+                        name: row[name]
+                        for name in ("description", "is_public")
+                        if name in row
+                    },
+                })
+            except ValidationError as e:
+                errors = _messages(e)[None]
+                self.rejected[key] = f"Quiz {key!r} is invalid"
+                self.reject(line, key, errors)
+                return None
+        return key
+
+    def validate(
+        self, candidates: list[tuple[int, str, dict[str, Any]]]
+    ) -> list[tuple[str, QuestionCreate]]:
+        """Validate a batch at once, then again without the failed rows."""
+        try:
+            questions = _questions_adapter.validate_python(
+                [row for _, _, row in candidates]
+            )
+        except ValidationError as e:
+            failed = _messages(e, skip=1)
+            for (index,), errors in failed.items():
+                line, key, _ = candidates[index]
+                self.reject(line, key, errors)
+            candidates = [
+                candidate for index, candidate in enumerate(candidates)
+                if (index,) not in failed
+            ]
+            questions = _questions_adapter.validate_python(
+                [row for _, _, row in candidates]
+            )
+        return [
+            (key, question)
+            for (_, key, _), question in zip(candidates, questions)
+        ]
+
+    def import_batch(self, batch: list[Row]) -> None:
+        candidates = []
+        for line, row in batch:
+            self.report.rows += 1
+            if isinstance(row, str):
+                self.reject(line, None, [row])
+                continue
+            key = self.quiz_key(line, row)
+            if key is not None:
+                candidates.append((line, key, row))
+        questions = self.validate(candidates) if candidates else []
+        if not questions:
+            return
+
+        # Quizzes are created with their first valid question
+        keys = list(dict.fromkeys(key for key, _ in questions))
+        new = {key: self.pending[key] for key in keys if key in self.pending}
+        existing = [self.quiz_ids[key] for key in keys if key in self.quiz_ids]
+        created = _write_batch(
+            self.db, self.author_id, new, self.quiz_ids, questions
+        )
+        self.quiz_ids.update(created)
+        for key in new:
+            del self.pending[key]
+        for quiz_id in existing:
+            invalidate_quiz_caches(quiz_id)
+        self.report.quizzes_created += len(new)
+        self.report.questions_created += len(questions)
+
+
+@transactional
+def _write_batch(
+    db: Session,
+    author_id: int,
+    new: dict[str, QuizBase],
+    quiz_ids: dict[str, int],
+    questions: list[tuple[str, QuestionCreate]],
+) -> dict[str, int]:
+    """Store a validated batch in one commit and return the new quiz ids.
+
+    Takes no importer state, so a locked attempt can simply run again.
+    """
+    created: dict[str, int] = {}
+    if new:
+        ids = db.execute(
+            insert(Quiz).returning(Quiz.id, sort_by_parameter_order=True),
+            [
+                {**quiz.model_dump(), "author_id": author_id}
+                for quiz in new.values()
+            ],
+        ).scalars().all()
+        created = dict(zip(new, ids))
+    ids = {**quiz_ids, **created}
+    db.execute(insert(Question), [
+        {
+            "quiz_id": ids[key],
+            "text": question.text,
+            "options": question.options,
+            "correct_answer": question.correct_answer,
+            "points": question.points,
+        }
+        for key, question in questions
+    ])
+    added = Counter(ids[key] for key, _ in questions)
+    add_to_quiz_counters(db, {
+        quiz_id: {"questions": count} for quiz_id, count in added.items()
+    })
+    # Core statements skip the before_flush hook that bumps versions
+    existing = {quiz_ids[key] for key, _ in questions if key in quiz_ids}
+    if existing:
+        db.execute(
+            update(Quiz)
+            .where(Quiz.id.in_(existing))
+            .values(version=Quiz.version + 1)
+        )
+    db.commit()
+    return created
+
+
+def import_quizzes(
+    db: Session,
+    rows: Iterable[Row],
+    author_id: int,
+    settings: QuizImportSettings = quiz_import_settings,
+) -> QuizImportReport:
+    """Create the quizzes and questions of parsed rows for one author.
+
+    Each batch of ``settings.batch_size`` rows is committed on its own, so
+    an import that fails halfway keeps the batches before.
+    """
+    importer = _Importer(db, author_id, settings)
+    rows = iter(rows)
+    while batch := list(islice(rows, settings.batch_size)):
+        importer.import_batch(batch)
+    return importer.report
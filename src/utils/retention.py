@@ -0,0 +1,289 @@
+"""Retention policy for quiz results.
+
+``RETENTION_KEEP_BEST`` keeps the best attempts of every user at every
+quiz, by score and then the latest, and ``RETENTION_MAX_AGE_DAYS`` drops
+attempts older than that. Either rule may be left unset. A purge deletes
+what the policy no longer keeps ``RETENTION_BATCH_SIZE`` results at a
+time. Each batch is its own transaction that first takes the results out
+of the quiz counters, and the purge pauses between batches so submissions
+get the database. Afterwards ``PRAGMA incremental_vacuum`` hands up to
+``RETENTION_VACUUM_PAGES`` freed pages back to the file system,
+``RETENTION_VACUUM_BATCH_PAGES`` per transaction with the same pauses. This
+needs a database in ``auto_vacuum=INCREMENTAL`` mode, see
+``enable_incremental_vacuum``.
+
+With ``RETENTION_ENABLED=true`` every worker checks every
+``RETENTION_CHECK_INTERVAL`` seconds whether the purge window is open,
+from ``RETENTION_WINDOW_START`` to ``RETENTION_WINDOW_END`` in UTC hours.
+The purge runs once a day and stops between batches when the window
+closes. A lock file next to the database lets one process purge at a
+time.
+"""
+
+import asyncio
+import fcntl
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import FastAPI
+from sqlalchemy import Engine, func, select, text
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import delete_results
+from src.models.quiz import Quiz, QuizResult
+from src.settings.retention import RetentionSettings, retention_settings
+from src.utils.dependencies import db_session_for
+from src.utils.metrics import (RETENTION_LAST_PURGE, RETENTION_PURGED,
+                               RETENTION_RECLAIMED)
+from src.utils.orm import database_settings
+
+logger = logging.getLogger(__name__)
+
+# PRAGMA auto_vacuum value of incremental mode
+_INCREMENTAL = 2
+
+
+class PurgeInProgress(Exception):
+    """Raised when another process holds the purge lock."""
+
+
+@dataclass
+class PurgeReport:
+    """What a purge deleted and reclaimed."""
+
+    purged: dict[str, int] = field(
+        default_factory=lambda: {"age": 0, "best": 0}
+    )
+    reclaimed_bytes: int = 0
+    # False if the purge stopped before it was done
+    complete: bool = True
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def in_window(now: datetime, settings: RetentionSettings) -> bool:
+    """Whether the purge window is open, wrapping around midnight."""
+    start, end = settings.window_start, settings.window_end
+    if start <= end:
+        return start <= now.hour < end
+    return now.hour >= start or now.hour < end
+
+
+@contextmanager
+def purge_lock() -> Iterator[None]:
+    """Hold the lock file next to the database, or raise PurgeInProgress."""
+    path = Path(f"{database_settings.database_path}.purge.lock")
+    with open(path, "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise PurgeInProgress(
+                "A purge of the database is already running"
+            ) from None
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _batches(
+    db: Session, settings: RetentionSettings, now: datetime
+) -> Iterator[tuple[str, list[int]]]:
+    """Yield the rule and ids of every batch of results to purge."""
+    if settings.max_age_days is not None:
+        cutoff = now - timedelta(days=settings.max_age_days)
+        # Old results have low ids, so each batch is found near the start
+        query = (
+            select(QuizResult.id)
+            .where(QuizResult.completed_at < cutoff)
+            .order_by(QuizResult.id)
+            .limit(settings.batch_size)
+        )
+        while ids := db.execute(query).scalars().all():
+            yield "age", ids
+
+    if settings.keep_best is not None:
+        # The counters tell which quizzes can have a user above the limit
+        quiz_ids = db.execute(
+            select(Quiz.id)
+            .where(Quiz.attempt_count > settings.keep_best)
+            .order_by(Quiz.id)
+        ).scalars().all()
+        for quiz_id in quiz_ids:
+            # Served by ix_quizresult_quiz_id. Purging excess results never
+            # changes which ones rank within the limit, so the ranks are
+            # computed again for every page
+            ranked = select(
+                QuizResult.id,
+                func.row_number().over(
+                    partition_by=QuizResult.user_id,
+                    order_by=(
+                        QuizResult.score.desc(),
+                        QuizResult.completed_at.desc(),
+                        QuizResult.id.desc(),
+                    ),
+                ).label("rank"),
+            ).where(QuizResult.quiz_id == quiz_id).subquery()
+            query = (
+                select(ranked.c.id)
+                .where(ranked.c.rank > settings.keep_best)
+                .order_by(ranked.c.id)
+                .limit(settings.batch_size)
+            )
+            last_id = 0
+            while ids := db.execute(
+                query.where(ranked.c.id > last_id)
+            ).scalars().all():
+                yield "best", ids
+                last_id = ids[-1]
+
+
+def incremental_vacuum(
+    db: Session,
+    pages: int = 0,
+    batch_pages: int = 500,
+    pause: float = 0.0,
+    keep_going: Callable[[], bool] = lambda: True,
+) -> int:
+    """Return up to ``pages`` free pages, or all with 0, to the file system.
+
+    Every ``batch_pages`` pages are committed on their own, so writers get
+    the database in between; ``keep_going`` is asked before each batch.
+    Returns the bytes reclaimed.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return 0
+    if db.execute(text("PRAGMA auto_vacuum")).scalar() != _INCREMENTAL:
+        logger.warning(
+            "The database is not in incremental auto-vacuum mode, "
+            "freed pages stay in the file"
+        )
+        db.commit()
+        return 0
+    page_size = db.execute(text("PRAGMA page_size")).scalar()
+    before = db.execute(text("PRAGMA freelist_count")).scalar()
+    remaining = min(pages, before) if pages else before
+    while remaining and keep_going():
+        batch = min(batch_pages, remaining)
+        # Every step of the pragma frees one page, but the driver steps a
+        # statement without rows only once; executescript runs it to the end
+        db.connection().connection.driver_connection.executescript(
+            f"PRAGMA incremental_vacuum({batch})"
+        )
+        db.commit()
+        remaining -= batch
+        if remaining:
+            time.sleep(pause)
+    after = db.execute(text("PRAGMA freelist_count")).scalar()
+    db.commit()
+    reclaimed = (before - after) * page_size
+    RETENTION_RECLAIMED.inc(reclaimed)
+    return reclaimed
+
+
+def enable_incremental_vacuum(engine: Engine) -> None:
+    """Switch a SQLite database to incremental auto-vacuum mode.
+
+    Rewrites the whole file with VACUUM, so run it once, when the database
+    is quiet.
+    """
+    with engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as connection:
+        connection.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+        connection.execute(text("VACUUM"))
+
+
+def purge_results(
+    db: Session,
+    settings: RetentionSettings = retention_settings,
+    keep_going: Callable[[], bool] = lambda: True,
+    now: datetime | None = None,
+) -> PurgeReport:
+    """Delete the results the retention policy no longer keeps.
+
+    ``keep_going`` is asked before every batch; once it says no, the purge
+    stops and reports itself incomplete.
+    """
+    report = PurgeReport()
+    for rule, ids in _batches(db, settings, now or _utcnow()):
+        if not keep_going():
+            report.complete = False
+            break
+        deleted = delete_results(db, ids)
+        report.purged[rule] += deleted
+        RETENTION_PURGED.labels(rule).inc(deleted)
+        time.sleep(settings.pause)
+    report.reclaimed_bytes = incremental_vacuum(
+        db,
+        settings.vacuum_pages,
+        settings.vacuum_batch_pages,
+        settings.pause,
+        keep_going,
+    )
+    if report.complete:
+        RETENTION_LAST_PURGE.set_to_current_time()
+    logger.info(
+        "Purged %s results, reclaimed %d bytes",
+        report.purged, report.reclaimed_bytes,
+    )
+    return report
+
+
+class RetentionPurger:
+    """Runs a purge a day within the purge window, in a worker thread."""
+
+    def __init__(
+        self, app: FastAPI, settings: RetentionSettings = retention_settings
+    ) -> None:
+        self.app = app
+        self.settings = settings
+        self._task: asyncio.Task | None = None
+        self._stopping = threading.Event()
+        self._purged_on: date | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the purge after its current batch."""
+        self._stopping.set()
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def _keep_going(self) -> bool:
+        return not self._stopping.is_set() and in_window(
+            _utcnow(), self.settings
+        )
+
+    def _purge(self) -> PurgeReport:
+        with purge_lock(), db_session_for(self.app) as db:
+            return purge_results(db, self.settings, self._keep_going)
+
+    async def _run(self) -> None:
+        while True:
+            today = _utcnow().date()
+            if self._purged_on != today and self._keep_going():
+                try:
+                    report = await asyncio.to_thread(self._purge)
+                except PurgeInProgress:
+                    # Another worker purges today
+                    self._purged_on = today
+                except Exception:
+                    logger.exception("Retention purge failed")
+                else:
+                    if report.complete:
+                        self._purged_on = today
+            await asyncio.sleep(self.settings.check_interval)
@@ -0,0 +1,55 @@
+"""Fast JSON serialization of response schemas.
+
+FastAPI serializes ``response_model`` routes by validating the returned
+value against the model, dumping it to Python primitives and encoding those
+again. A ``Serializer`` compiles a ``TypeAdapter`` once per response type
+and goes from ORM objects straight to JSON bytes in pydantic-core.
+
+Values built by the application itself from the schema classes, e.g. a
+``LeaderboardResponse``, can be passed with ``trusted=True`` to skip
+validation entirely. Set ``SERIALIZATION_VALIDATE_TRUSTED=true`` to
+validate them anyway, for instance in CI.
+"""
+
+from typing import Any, Generic, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from src.settings.serialization import serialization_settings
+
+T = TypeVar("T")
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class Serializer(Generic[T]):
+    """Precompiled validation and JSON serialization of one type."""
+
+    def __init__(self, type_: type[T]) -> None:
+        self.adapter: TypeAdapter[T] = TypeAdapter(type_)
+
+    def validate(self, value: Any) -> T:
+        """Validate ``value``, reading ORM objects through attributes."""
+        return self.adapter.validate_python(value, from_attributes=True)
+
+    def to_json(self, value: Any, trusted: bool = False) -> bytes:
+        """Serialize ``value``, validating it first unless ``trusted``."""
+        if not trusted or serialization_settings.validate_trusted:
+            value = self.validate(value)
+        return self.adapter.dump_json(value)
+
+    def response(
+        self,
+        value: Any,
+        trusted: bool = False,
+        status_code: int = 200,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """Build a JSON response that bypasses FastAPI's response model."""
+        return Response(
+            content=self.to_json(value, trusted),
+            status_code=status_code,
+            headers=headers,
+            media_type=JSON_MEDIA_TYPE,
+        )
@@ -0,0 +1,70 @@
+"""Coalescing of concurrent identical reads.
+
+A ``SingleFlight`` group runs at most one computation per key at a time.
+Requests that ask for a key while its computation is in flight wait for
+that result instead of starting their own, so a burst of requests for the
+same popular quiz costs one set of queries and one serialization. Nothing
+is kept once the computation finishes; caching is a separate concern.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from src.settings.cache import cache_settings
+from src.utils.metrics import (SINGLEFLIGHT_COALESCED, SINGLEFLIGHT_EXECUTIONS,
+                               SINGLEFLIGHT_FANOUT)
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]") -> None:
+        self.task = task
+        self.callers = 1
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight computation between concurrent callers."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._flights: dict[Hashable, _Flight[T]] = {}
+        self._executions = SINGLEFLIGHT_EXECUTIONS.labels(name)
+        self._coalesced = SINGLEFLIGHT_COALESCED.labels(name)
+        self._fanout = SINGLEFLIGHT_FANOUT.labels(name)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self, key: Hashable, compute: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Return the result of ``compute``, shared with concurrent callers.
+
+        Exceptions are shared as well. The computation runs in its own task,
+        so a caller that is cancelled does not cancel it for the others.
+        """
+        if not cache_settings.coalesce_reads:
+            return await compute()
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(compute()))
+            self._flights[key] = flight
+            self._executions.inc()
+            flight.task.add_done_callback(
+                lambda _: self._land(key, flight)
+            )
+        else:
+            flight.callers += 1
+            self._coalesced.inc()
+        return await asyncio.shield(flight.task)
+
+    def _land(self, key: Hashable, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        self._fanout.observe(flight.callers)
+        if not flight.task.cancelled():
+            flight.task.exception()  # mark as retrieved
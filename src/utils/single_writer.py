@@ -0,0 +1,163 @@
+"""Single-writer routing for SQLite.
+
+SQLite lets one connection write at a time. Concurrent write transactions
+wait on the database lock and fail with "database is locked" once the busy
+timeout runs out. With ``DB_SINGLE_WRITER=true`` sessions route their
+statements by kind instead:
+
+* reads go to a pool of ``DB_READ_POOL_SIZE`` connections opened with
+  ``PRAGMA query_only``. In WAL mode they neither block nor wait for the
+  writer;
+* flushes and INSERT, UPDATE and DELETE statements go to the one writer
+  connection. A session keeps the writer for the rest of its transaction,
+  so it reads its own writes, and hands it back on commit or rollback.
+
+Sessions that want to write meanwhile queue for the writer in-process, for
+up to ``DB_WRITER_TIMEOUT`` seconds, rather than retry against SQLite's
+lock. The ``db_writer_*`` metrics show the queue and the waits.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Engine, TextClause, create_engine, event
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.sql.dml import UpdateBase
+
+from src.utils.metrics import DB_WRITER_HOLD, DB_WRITER_WAIT, DB_WRITER_WAITING
+
+# Session.info key set while a session holds the writer
+_WRITING = "single_writer.writing"
+
+# Other textual statements, PRAGMAs included, may write
+_READ_STATEMENTS = ("SELECT", "WITH", "EXPLAIN")
+
+
+class WriterTimeout(TimeoutError):
+    """Raised when a session waited too long for the writer connection."""
+
+
+class WriterGate:
+    """Hands the writer connection to one session at a time."""
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+
+    def acquire(self) -> None:
+        started = time.perf_counter()
+        DB_WRITER_WAITING.inc()
+        try:
+            acquired = self._lock.acquire(timeout=self.timeout)
+        finally:
+            DB_WRITER_WAITING.dec()
+        now = time.perf_counter()
+        DB_WRITER_WAIT.observe(now - started)
+        if not acquired:
+            raise WriterTimeout(
+                f"Waited {self.timeout}s for the database writer"
+            )
+        self._acquired_at = now
+
+    def release(self) -> None:
+        DB_WRITER_HOLD.observe(time.perf_counter() - self._acquired_at)
+        self._lock.release()
+
+
+@dataclass(frozen=True)
+class RoutingEngines:
+    reader: Engine
+    writer: Engine
+    gate: WriterGate
+
+
+def create_routing_engines(
+    dsn: str,
+    read_pool_size: int,
+    writer_timeout: float,
+    busy_timeout: float = 5.0,
+    on_connect: Callable[[Any, Any], None] | None = None,
+) -> RoutingEngines:
+    """Create the writer and reader engines of a SQLite database.
+
+    ``on_connect`` is an extra connect listener of both engines.
+    """
+    connect_args = {"check_same_thread": False, "timeout": busy_timeout}
+    writer = create_engine(
+        dsn, connect_args=connect_args, pool_size=1, max_overflow=0,
+    )
+    reader = create_engine(
+        dsn, connect_args=connect_args, pool_size=read_pool_size,
+    )
+
+    @event.listens_for(writer, "connect")
+    def _writer_connect(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # Deletes cascade in the database, see src.models.quiz
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    @event.listens_for(reader, "connect")
+    def _reader_connect(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    if on_connect is not None:
+        event.listen(writer, "connect", on_connect)
+        event.listen(reader, "connect", on_connect)
+
+    # WAL mode is stored in the database file, switch it before any reader
+    # opens it
+    with writer.connect():
+        pass
+    return RoutingEngines(reader, writer, WriterGate(writer_timeout))
+
+
+def _is_write(clause: Any) -> bool:
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(_READ_STATEMENTS)
+    return False
+
+
+class RoutingSession(Session):
+    """Session that reads from the reader pool and writes via the writer."""
+
+    def __init__(self, engines: RoutingEngines, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.engines = engines
+
+    def take_writer(self) -> None:
+        """Wait for the writer and keep it until the transaction ends."""
+        if not self.info.get(_WRITING):
+            self.engines.gate.acquire()
+            self.info[_WRITING] = True
+
+    def get_bind(
+        self, mapper: Any = None, *, clause: Any = None, **kwargs: Any
+    ) -> Engine:
+        if _is_write(clause):
+            self.take_writer()
+        if self.info.get(_WRITING):
+            return self.engines.writer
+        return self.engines.reader
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _flush_on_writer(session: RoutingSession, *_: Any) -> None:
+    session.take_writer()
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(
+    session: RoutingSession, transaction: SessionTransaction
+) -> None:
+    if transaction.parent is None and session.info.pop(_WRITING, False):
+        session.engines.gate.release()
@@ -0,0 +1,348 @@
+"""Columnar snapshots of quizzes and results for analytics.
+
+A snapshot run writes Parquet files below ``SNAPSHOT_DIRECTORY``::
+
+    manifest.json
+    quizzes/part-000003.parquet
+    questions/part-000003.parquet
+    results/quiz_id=12/month=2026-10/part-000003.parquet
+    answers/quiz_id=12/month=2026-10/part-000003.parquet
+
+Results only ever grow, so each run appends the results with an id above
+the watermark of the previous run, and ``answers`` flattens their answers
+into one row per answered question. Quizzes and questions change in place
+and are small: every run writes them in full and removes the files of the
+runs before. Directory names follow the Hive partitioning convention, so
+``pyarrow.dataset`` and pandas read each table as a whole.
+
+pyarrow is imported on first use to keep it out of the application startup.
+"""
+
+import fcntl
+import json
+import logging
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import answers_of, get_answer_key
+from src.models.quiz import Question, Quiz, QuizResult
+from src.settings.snapshot import SnapshotSettings, snapshot_settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+DIMENSION_TABLES = ("quizzes", "questions")
+
+
+class SnapshotInProgress(Exception):
+    """Raised when another snapshot run holds the directory lock."""
+
+
+@dataclass
+class SnapshotRun:
+    """Summary of one snapshot run, as stored in the manifest."""
+
+    run: int
+    watermark: int
+    started_at: str
+    finished_at: str | None = None
+    rows: dict[str, int] = field(default_factory=dict)
+    files: list[str] = field(default_factory=list)
+
+
+@cache
+def _schemas() -> dict[str, Any]:
+    import pyarrow as pa
+
+    timestamp = pa.timestamp("us")
+    return {
+        "quizzes": pa.schema([
+            ("id", pa.int64()),
+            ("title", pa.string()),
+            ("description", pa.string()),
+            ("author_id", pa.int64()),
+            ("is_public", pa.bool_()),
+            ("version", pa.int64()),
+        ]),
+        "questions": pa.schema([
+            ("id", pa.int64()),
+            ("quiz_id", pa.int64()),
+            ("text", pa.string()),
+            ("options", pa.list_(pa.string())),
+            ("correct_answer", pa.string()),
+            ("points", pa.int64()),
+        ]),
+        # quiz_id and month are encoded in the partition directories
+        "results": pa.schema([
+            ("id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("score", pa.int64()),
+            ("max_score", pa.int64()),
+            ("correct_answers", pa.int64()),
+            ("completed_at", timestamp),
+        ]),
+        "answers": pa.schema([
+            ("result_id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("question_id", pa.int64()),
+            ("answer", pa.string()),
+            # Against the answer key at snapshot time, None for questions
+            # that no longer exist
+            ("is_correct", pa.bool_()),
+            ("completed_at", timestamp),
+        ]),
+    }
+
+
+def read_manifest(directory: Path) -> dict[str, Any]:
+    """Read the manifest of a snapshot directory, empty if there is none."""
+    path = directory / MANIFEST
+    if not path.exists():
+        return {"watermark": 0, "runs": []}
+    return json.loads(path.read_text())
+
+
+def list_snapshot_files(directory: Path) -> list[dict[str, Any]]:
+    """List the Parquet files of a snapshot directory with their sizes."""
+    if not directory.exists():
+        return []
+    return [
+        {
+            "path": path.relative_to(directory).as_posix(),
+            "size": path.stat().st_size,
+        }
+        for path in sorted(directory.rglob("*.parquet"))
+    ]
+
+
+@contextmanager
+def _locked(directory: Path) -> Iterator[None]:
+    with open(directory / ".lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise SnapshotInProgress(
+                f"A snapshot of {directory} is already running"
+            ) from None
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class _ParquetFiles:
+    """Parquet files of one run, at most one open per table at a time.
+
+    Files are written under a temporary name and renamed when complete.
+    """
+
+    def __init__(self, directory: Path, run: int, compression: str) -> None:
+        self.directory = directory
+        self.filename = f"part-{run:06d}.parquet"
+        self.compression = compression
+        self.files: list[str] = []
+        self.rows = dict.fromkeys(_schemas(), 0)
+        self._open: dict[str, tuple[Path, Any]] = {}
+
+    def write(
+        self, table: str, partition: str, columns: dict[str, list]
+    ) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _schemas()[table]
+        path = self.directory / table / partition / self.filename
+        current = self._open.get(table)
+        if current is not None and current[0] != path:
+            self._close(table)
+            current = None
+        if current is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(
+                path.with_suffix(".tmp"), schema,
+                compression=self.compression,
+            )
+            current = self._open[table] = (path, writer)
+        current[1].write_table(pa.table(columns, schema=schema))
+        self.rows[table] += len(columns[schema.names[0]])
+
+    def _close(self, table: str) -> None:
+        path, writer = self._open.pop(table)
+        writer.close()
+        path.with_suffix(".tmp").replace(path)
+        self.files.append(path.relative_to(self.directory).as_posix())
+
+    def close(self) -> None:
+        for table in list(self._open):
+            self._close(table)
+
+    def abort(self) -> None:
+        for path, writer in self._open.values():
+            writer.close()
+            path.with_suffix(".tmp").unlink()
+        self._open.clear()
+
+
+def _empty(table: str) -> dict[str, list]:
+    return {name: [] for name in _schemas()[table].names}
+
+
+def _write_dimensions(
+    db: Session, files: _ParquetFiles, batch_size: int
+) -> None:
+    queries = {
+        "quizzes": select(
+            Quiz.id, Quiz.title, Quiz.description, Quiz.author_id,
+            Quiz.is_public, Quiz.version,
+        ).order_by(Quiz.id),
+        "questions": select(
+            Question.id, Question.quiz_id, Question.text, Question.options,
+            Question.correct_answer, Question.points,
+        ).order_by(Question.id),
+    }
+    for table, query in queries.items():
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            columns = _empty(table)
+            for row in rows:
+                for name, value in zip(columns, row):
+                    if name == "options":
+                        value = [str(option) for option in value or []]
+                    columns[name].append(value)
+            files.write(table, "", columns)
+        if not files.rows[table]:
+            # Write the schema even without rows
+            files.write(table, "", _empty(table))
+
+
+def _write_results(
+    db: Session,
+    files: _ParquetFiles,
+    after_id: int,
+    up_to_id: int,
+    batch_size: int,
+) -> None:
+    # Sorting by partition keeps one partition per table open at a time
+    query = (
+        select(
+            QuizResult.id, QuizResult.quiz_id, QuizResult.user_id,
+            QuizResult.score, QuizResult.max_score,
+            QuizResult.correct_answers, QuizResult.completed_at,
+            QuizResult.answers, QuizResult.answers_packed,
+            QuizResult.answers_version,
+        )
+        .filter(QuizResult.id > after_id, QuizResult.id <= up_to_id)
+        .order_by(QuizResult.quiz_id, QuizResult.completed_at, QuizResult.id)
+        .execution_options(yield_per=batch_size)
+    )
+    partition = None
+    results, answers = _empty("results"), _empty("answers")
+    key: dict[int, tuple[str, int]] = {}
+
+    def flush() -> None:
+        nonlocal results, answers
+        if results["id"]:
+            files.write("results", partition, results)
+        if answers["result_id"]:
+            files.write("answers", partition, answers)
+        results, answers = _empty("results"), _empty("answers")
+
+    for row in db.execute(query):
+        row_partition = (
+            f"quiz_id={row.quiz_id}/month={row.completed_at:%Y-%m}"
+        )
+        if row_partition != partition:
+            flush()
+            if partition is None or not partition.startswith(
+                f"quiz_id={row.quiz_id}/"
+            ):
+                answer_key = get_answer_key(db, row.quiz_id)
+                key = answer_key.answers if answer_key else {}
+            partition = row_partition
+        elif len(results["id"]) >= batch_size:
+            flush()
+
+        for name in results:
+            results[name].append(getattr(row, name))
+        for question_id, answer in (answers_of(db, row) or {}).items():
+            expected = key.get(int(question_id))
+            answers["result_id"].append(row.id)
+            answers["user_id"].append(row.user_id)
+            answers["question_id"].append(int(question_id))
+            answers["answer"].append(None if answer is None else str(answer))
+            answers["is_correct"].append(
+                None if expected is None else answer == expected[0]
+            )
+            answers["completed_at"].append(row.completed_at)
+    flush()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def write_snapshot(
+    db: Session,
+    directory: Path | None = None,
+    settings: SnapshotSettings = snapshot_settings,
+) -> SnapshotRun:
+    """Append the results added since the last run and rewrite quizzes.
+
+    Raises ``SnapshotInProgress`` if another run uses the same directory.
+    """
+    directory = Path(directory or settings.directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    with _locked(directory):
+        manifest = read_manifest(directory)
+        previous = manifest["watermark"]
+        latest = db.execute(select(func.max(QuizResult.id))).scalar() or 0
+        run = SnapshotRun(
+            run=len(manifest["runs"]) + 1,
+            watermark=max(previous, latest),
+            started_at=_now(),
+        )
+
+        # Drop what an interrupted attempt at this run left behind
+        files = _ParquetFiles(directory, run.run, settings.compression)
+        for stale in [
+            *directory.rglob(files.filename),
+            *directory.rglob("*.tmp"),
+        ]:
+            stale.unlink()
+
+        try:
+            _write_dimensions(db, files, settings.batch_size)
+            _write_results(
+                db, files, previous, run.watermark, settings.batch_size
+            )
+        except BaseException:
+            files.abort()
+            raise
+        files.close()
+
+        run.finished_at = _now()
+        run.rows = files.rows
+        run.files = files.files
+        manifest["watermark"] = run.watermark
+        manifest["runs"].append(asdict(run))
+        temporary = directory / f"{MANIFEST}.tmp"
+        temporary.write_text(json.dumps(manifest, indent=2) + "\n")
+        os.replace(temporary, directory / MANIFEST)
+
+        # Only the latest copy of quizzes and questions is kept
+        for table in DIMENSION_TABLES:
+            for path in (directory / table).glob("part-*.parquet"):
+                if path.name != files.filename:
+                    path.unlink()
+
+    logger.info("Snapshot run %d written: %s", run.run, run.rows)
+    return run
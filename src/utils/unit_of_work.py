@@ -0,0 +1,123 @@
+"""Retries of write transactions that find the database locked.
+
+SQLite waits up to ``DB_BUSY_TIMEOUT`` seconds for another connection's
+write lock before it fails with "database is locked". Some conflicts fail
+at once without waiting, such as a transaction that read a snapshot and
+then wants to write after another connection committed. Both leave
+nothing behind once rolled back, so the whole transaction can simply run
+again.
+
+CRUD write functions are wrapped with ``transactional``. A locked attempt
+is rolled back and retried up to ``DB_WRITE_RETRIES`` times, after a
+random delay of up to ``DB_WRITE_RETRY_BACKOFF`` seconds that doubles per
+retry and is capped by ``DB_WRITE_RETRY_MAX_BACKOFF``. A transaction that
+is still locked out raises ``DatabaseBusy``, and the API answers 503.
+Wrapped functions must therefore do all their writes in one commit.
+"""
+
+import functools
+import random
+import time
+from collections.abc import Callable
+from typing import Concatenate, ParamSpec, TypeVar
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.utils.metrics import (DB_WRITE_CONTENTION, DB_WRITE_LOCK_FAILURES,
+                               DB_WRITE_RETRIES)
+from src.utils.orm import database_settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Session.info key set while a unit of work runs, so nested calls join it
+_IN_UNIT = "unit_of_work.active"
+
+_LOCK_MESSAGES = ("database is locked", "database table is locked")
+
+
+class DatabaseBusy(Exception):
+    """Raised when a write stayed locked out through all its retries."""
+
+
+def is_database_locked(error: Exception) -> bool:
+    """Whether an error means another connection held the lock."""
+    return isinstance(error, OperationalError) and any(
+        message in str(error.orig) for message in _LOCK_MESSAGES
+    )
+
+
+def _backoff(retry: int) -> float:
+    cap = min(
+        database_settings.write_retry_max_backoff,
+        database_settings.write_retry_backoff * 2 ** retry,
+    )
+    return random.uniform(0, cap)
+
+
+def run_unit_of_work(
+    db: Session, work: Callable[[], T], operation: str
+) -> T:
+    """Run a write transaction, again while it finds the database locked."""
+    started = time.perf_counter()
+    retries = 0
+    while True:
+        try:
+            result = work()
+        except OperationalError as e:
+            if not is_database_locked(e):
+                raise
+            db.rollback()
+            if retries >= database_settings.write_retries:
+                DB_WRITE_LOCK_FAILURES.labels(operation).inc()
+                DB_WRITE_CONTENTION.labels(operation).observe(
+                    time.perf_counter() - started
+                )
+                raise DatabaseBusy(
+                    f"{operation}: database stayed locked after "
+                    f"{retries} retries"
+                ) from e
+            time.sleep(_backoff(retries))
+            retries += 1
+            DB_WRITE_RETRIES.labels(operation).inc()
+            continue
+        if retries:
+            DB_WRITE_CONTENTION.labels(operation).observe(
+                time.perf_counter() - started
+            )
+        return result
+
+
+def transactional(
+    func: Callable[Concatenate[Session, P], T]
+) -> Callable[Concatenate[Session, P], T]:
+    """Retry a CRUD write function, taking its session as first argument.
+
+    Calls from within another transactional function run once as part of
+    the outer unit of work, which retries as a whole.
+    """
+    @functools.wraps(func)
+    def wrapper(db: Session, *args: P.args, **kwargs: P.kwargs) -> T:
+        if db.info.get(_IN_UNIT):
+            return func(db, *args, **kwargs)
+        db.info[_IN_UNIT] = True
+        try:
+            return run_unit_of_work(
+                db, lambda: func(db, *args, **kwargs), func.__name__
+            )
+        finally:
+            db.info.pop(_IN_UNIT, None)
+
+    return wrapper
+
+
+def database_busy_handler(_: Request, exc: DatabaseBusy) -> JSONResponse:
+    """Ask the client to retry a write that stayed locked out."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
@@ -0,0 +1,182 @@
+"""Warm-up run when the application starts.
+
+Before a new worker reports ready it opens pool connections, preloads the
+answer keys, leaderboards and serialized responses of the most played
+quizzes into the local caches, and reads the ``WARMUP_HOT_INDEXES`` so
+that SQLite's page cache and the OS file cache are hot. With
+``WARMUP_FULL_SCAN`` it reads every table and index instead. Each scan
+stops after ``WARMUP_SCAN_ROWS`` rows, so the timeout is checked between
+short statements. ``/readyz`` answers 503 until the warm-up finishes or
+its timeout expires, whichever comes first.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import (get_answer_key, get_most_played_quiz_ids,
+                           get_quiz_leaderboard, load_quiz_payload)
+from src.models.base import Base
+from src.settings.warmup import WarmupSettings, warmup_settings
+from src.utils.dependencies import db_session_for
+from src.utils.metrics import WARMUP_COVERAGE, WARMUP_DURATION, WARMUP_ITEMS
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupDeadlineExceeded(Exception):
+    """Raised inside the warm-up once its time is up."""
+
+
+@dataclass
+class WarmupState:
+    """Progress of the warm-up, shared with the readiness probe."""
+
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+    timed_out: bool = False
+    error: str | None = None
+    planned: int = 0
+    items: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def duration(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def coverage(self) -> float:
+        if not self.planned:
+            return 1.0
+        return min(1.0, sum(self.items.values()) / self.planned)
+
+    def add(self, kind: str, count: int = 1) -> None:
+        self.items[kind] = self.items.get(kind, 0) + count
+
+    def finish(self) -> None:
+        self.finished_at = time.monotonic()
+        WARMUP_DURATION.set(self.duration)
+        WARMUP_COVERAGE.set(self.coverage)
+        for kind, count in self.items.items():
+            WARMUP_ITEMS.labels(kind).set(count)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "duration": round(self.duration, 3),
+            "timed_out": self.timed_out,
+            "error": self.error,
+            "coverage": round(self.coverage, 3),
+            "items": dict(self.items),
+        }
+
+
+def warm_up(
+    db: Session,
+    state: WarmupState,
+    deadline: float,
+    settings: WarmupSettings = warmup_settings,
+) -> None:
+    """Run every warm-up step, stopping once ``deadline`` has passed."""
+    def check_deadline() -> None:
+        if time.monotonic() > deadline:
+            raise WarmupDeadlineExceeded
+
+    tables = Base.metadata.sorted_tables if settings.full_scan else []
+    hot = set(settings.hot_indexes) if settings.touch_indexes else set()
+    indexes = [
+        (table, index)
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+        if settings.full_scan or index.name in hot
+    ]
+    quiz_ids = get_most_played_quiz_ids(db, settings.quizzes)
+    state.planned = (
+        settings.connections + 3 * len(quiz_ids) + len(tables) + len(indexes)
+    )
+
+    # Open connections up front so first requests do not pay for connect()
+    engine = db.get_bind()
+    connections = []
+    try:
+        for _ in range(settings.connections):
+            check_deadline()
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+            state.add("connections")
+    finally:
+        for connection in connections:
+            connection.close()
+
+    for quiz_id in quiz_ids:
+        check_deadline()
+        get_answer_key(db, quiz_id)
+        state.add("answer_keys")
+        get_quiz_leaderboard(db, quiz_id)
+        state.add("leaderboards")
+        load_quiz_payload(db, quiz_id)
+        state.add("quiz_payloads")
+
+    # Scans pull the pages they read into the caches. Table hints are
+    # written out: SQLAlchemy renders none for SQLite, and a plain count(*)
+    # reads the smallest index instead of the table.
+    quote = engine.dialect.identifier_preparer.quote
+    limit = int(settings.scan_rows)
+    for table in tables:
+        check_deadline()
+        db.execute(text(
+            f"SELECT count(*) FROM (SELECT 1 FROM {quote(table.name)} "
+            f"NOT INDEXED LIMIT {limit})"
+        ))
+        state.add("tables")
+    for table, index in indexes:
+        check_deadline()
+        # Selecting a column of the index makes it the covering index read
+        column = quote(index.columns[0].name)
+        db.execute(text(
+            f"SELECT count(*) FROM (SELECT {column} FROM "
+            f"{quote(table.name)} INDEXED BY {quote(index.name)} "
+            f"LIMIT {limit})"
+        ))
+        state.add("indexes")
+
+
+def _warm_up_app(app: FastAPI, state: WarmupState, deadline: float) -> None:
+    with db_session_for(app) as db:
+        try:
+            warm_up(db, state, deadline)
+        except WarmupDeadlineExceeded:
+            state.timed_out = True
+
+
+async def run_warmup(
+    app: FastAPI,
+    state: WarmupState,
+    settings: WarmupSettings = warmup_settings,
+) -> None:
+    """Warm up in a worker thread and mark ``state`` finished when done."""
+    deadline = time.monotonic() + settings.timeout
+    try:
+        await asyncio.wait_for(
+            asyncio.to_thread(_warm_up_app, app, state, deadline),
+            settings.timeout,
+        )
+    except TimeoutError:
+        # The thread stops by itself at its next deadline check
+        state.timed_out = True
+    except Exception as e:
+        state.error = repr(e)
+        logger.exception("Warm-up failed")
+    finally:
+        state.finish()
+        logger.info("Warm-up finished: %s", state.describe())
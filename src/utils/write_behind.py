@@ -0,0 +1,164 @@
+"""Write-behind queue for quiz results.
+
+With ``SUBMISSIONS_WRITE_BEHIND=true`` a submission is graded within its
+request and then handed to a bounded in-process queue. A single writer task
+collects whatever has queued up for ``SUBMISSIONS_FLUSH_INTERVAL`` seconds
+and stores it with one statement and one commit, so a burst of submissions
+costs a handful of fsyncs instead of one each. Every uvicorn worker runs
+its own queue and writer.
+
+``SUBMISSIONS_DURABILITY`` decides when the client gets its answer:
+``commit`` waits for the group commit that holds its result, ``queue``
+answers as soon as the result is queued, and loses it if the process dies
+before the next commit. When the queue is full, submissions wait up to
+``SUBMISSIONS_ENQUEUE_TIMEOUT`` seconds for room and are then refused.
+Closing the queue on shutdown writes everything still queued.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import FastAPI
+
+from src.crud.quiz import insert_quiz_results
+from src.settings.submissions import SubmissionSettings, submission_settings
+from src.utils.dependencies import db_session_for
+from src.utils.metrics import (SUBMISSION_BATCH_SIZE, SUBMISSION_QUEUE_DEPTH,
+                               SUBMISSION_REJECTED, SUBMISSION_WRITE_ERRORS)
+
+logger = logging.getLogger(__name__)
+
+Row = dict[str, Any]
+
+
+class QueueFull(Exception):
+    """Raised when a submission found no room in the queue in time."""
+
+
+class QueueClosed(Exception):
+    """Raised when a submission arrives after the queue was closed."""
+
+
+@dataclass
+class _Pending:
+    row: Row
+    stored: "asyncio.Future[Row] | None"
+
+
+class WriteBehindQueue:
+    """Bounded queue of graded results drained by one writer task."""
+
+    def __init__(
+        self,
+        write: Callable[[list[Row]], list[Row]],
+        settings: SubmissionSettings = submission_settings,
+    ) -> None:
+        self.write = write
+        self.settings = settings
+        self._queue: asyncio.Queue[_Pending] = asyncio.Queue(
+            settings.queue_size
+        )
+        self._writer: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._run())
+
+    async def submit(self, row: Row) -> Row | None:
+        """Queue a graded result.
+
+        Returns the stored row once committed, or None right away with the
+        ``queue`` durability. Raises ``QueueFull`` or ``QueueClosed``.
+        """
+        if self._closed or self._writer is None:
+            raise QueueClosed
+        stored = None
+        if self.settings.durability == "commit":
+            stored = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(
+                self._queue.put(_Pending(row, stored)),
+                self.settings.enqueue_timeout,
+            )
+        except TimeoutError:
+            SUBMISSION_REJECTED.inc()
+            raise QueueFull from None
+        SUBMISSION_QUEUE_DEPTH.set(self.depth)
+        if stored is None:
+            return None
+        return await stored
+
+    async def close(self) -> None:
+        """Refuse new submissions and wait until the queue is written."""
+        self._closed = True
+        if self._writer is None:
+            return
+        await self._queue.join()
+        self._writer.cancel()
+        self._writer = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Let the burst pile up, then take all of it
+            await asyncio.sleep(self.settings.flush_interval)
+            while len(batch) < self.settings.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            SUBMISSION_QUEUE_DEPTH.set(self.depth)
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list[_Pending]) -> None:
+        try:
+            stored = await asyncio.to_thread(
+                self.write, [pending.row for pending in batch]
+            )
+        except Exception as e:
+            if len(batch) > 1:
+                # Keep one bad row from failing the rest of the batch
+                for pending in batch:
+                    await self._flush([pending])
+                return
+            logger.exception("Could not store a queued quiz result")
+            SUBMISSION_WRITE_ERRORS.inc()
+            _resolve(batch[0], exception=e)
+            return
+        SUBMISSION_BATCH_SIZE.observe(len(batch))
+        for pending, row in zip(batch, stored):
+            _resolve(pending, row=row)
+
+
+def _resolve(
+    pending: _Pending,
+    row: Row | None = None,
+    exception: Exception | None = None,
+) -> None:
+    # The submitter may have gone away, cancelling its future
+    if pending.stored is None or pending.stored.done():
+        return
+    if exception is not None:
+        pending.stored.set_exception(exception)
+    else:
+        pending.stored.set_result(row)
+
+
+def create_queue(app: FastAPI) -> WriteBehindQueue:
+    """Create the queue of an app, writing through its database sessions."""
+    def write(rows: list[Row]) -> list[Row]:
+        with db_session_for(app) as db:
+            return insert_quiz_results(db, rows)
+
+    return WriteBehindQueue(write)
@@ -4,16 +4,19 @@ from collections.abc import Generator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from src.auth.utils import create_access_token, get_password_hash
+from src.crud.quiz import insert_quiz_results
 from src.main import create_app
 from src.models.base import Base
 from src.models.quiz import Question, Quiz
 from src.models.user import User
 from src.utils.dependencies import get_db
+from src.utils.local_cache import clear_all as clear_local_caches
+from src.utils.orm import enable_foreign_keys
 
 # Create a test database in memory
 TEST_SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -22,6 +25,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+event.listen(engine, "connect", enable_foreign_keys)
 TestingSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -41,6 +45,8 @@ def override_get_db() -> Generator[Session, None, None]:
 @pytest.fixture(scope="function")
 def db() -> Generator[Session, None, None]:
     """Create the test database."""
+    # Ids restart in every test, so cached entries would belong to old data
+    clear_local_caches()
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     try:
@@ -103,6 +109,18 @@ def admin_token(test_admin: User) -> str:
     )
 
 
+@pytest.fixture
+def user_headers(user_token: str) -> dict:
+    """Create the authorization headers of the test user."""
+    return {"Authorization": f"Bearer {user_token}"}
+
+
+@pytest.fixture
+def admin_headers(admin_token: str) -> dict:
+    """Create the authorization headers of the test admin."""
+    return {"Authorization": f"Bearer {admin_token}"}
+
+
 @pytest.fixture
 def test_quiz(db: Session, test_user: User) -> Quiz:
     """Create a test quiz."""
@@ -139,3 +157,17 @@ def test_quiz(db: Session, test_user: User) -> Quiz:
     # Reload the quiz to include the questions
     db.refresh(quiz)
     return quiz
+
+
+def add_results(
+    db: Session, quiz: Quiz, user: User, scores: list[int], **values
+) -> None:
+    """Store a result per score, with ``values`` for the other columns."""
+    insert_quiz_results(db, [
+        {
+            "quiz_id": quiz.id, "user_id": user.id, "score": score,
+            "max_score": 3, "correct_answers": score, "answers": {},
+            **values,
+        }
+        for score in scores
+    ])
@@ -0,0 +1,173 @@
+"""Tests for the per-answer rows and the answer statistics endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from src.commands import fill_answer_rows as command
+from src.crud.quiz import delete_results, insert_quiz_results
+from src.models.quiz import Quiz, QuizResult, quiz_result_answer
+from src.models.user import User
+from src.settings.submissions import submission_settings
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def answer_rows(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(submission_settings, "answer_rows", True)
+
+
+def _answer_rows(db: Session) -> list:
+    answer = quiz_result_answer.c
+    return db.execute(
+        select(
+            answer.result_id,
+            answer.question_id,
+            answer.option_index,
+            answer.is_correct,
+        ).order_by(answer.result_id, answer.question_id)
+    ).all()
+
+
+def _submit(
+    client: TestClient, headers: dict, quiz: Quiz, answers: list[str]
+) -> int:
+    response = client.post(
+        f"/api/v1/quizzes/{quiz.id}/results/",
+        headers=headers,
+        json={"answers": [
+            {"question_id": question.id, "answer": answer}
+            for question, answer in zip(quiz.questions, answers)
+        ]},
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_submissions_store_answer_rows(
+    client: TestClient,
+    db: Session,
+    test_quiz: Quiz,
+    test_user: User,
+    user_headers: dict,
+    answer_rows: None,
+):
+    """Test that every way of submitting stores the answer rows."""
+    first, second = (question.id for question in test_quiz.questions)
+    result_id = _submit(client, user_headers, test_quiz, ["4", "Rome"])
+    response = client.post(
+        "/api/v1/quizzes/results/batch",
+        headers=user_headers,
+        json={"submissions": [{
+            "quiz_id": test_quiz.id,
+            "answers": [{"question_id": second, "answer": "Berlin"}],
+        }]},
+    )
+    batch_id = response.json()["items"][0]["result"]["id"]
+    (inserted,) = insert_quiz_results(db, [{
+        "quiz_id": test_quiz.id, "user_id": test_user.id, "score": 0,
+        "max_score": 3, "correct_answers": 0, "answers": {str(first): "3"},
+    }])
+
+    assert _answer_rows(db) == [
+        (result_id, first, 1, True),
+        (result_id, second, None, False),
+        (batch_id, second, 1, False),
+        (inserted["id"], first, 0, False),
+    ]
+    delete_results(db, [result_id])
+    assert len(_answer_rows(db)) == 2
+
+
+def test_answer_statistics(
+    client: TestClient,
+    db: Session,
+    test_quiz: Quiz,
+    test_admin: User,
+    user_headers: dict,
+    admin_headers: dict,
+    answer_rows: None,
+):
+    """Test the option counts and the users who answered a question."""
+    second = test_quiz.questions[1].id
+    for answer in ("Paris", "Berlin", "Rome"):
+        _submit(client, user_headers, test_quiz, ["4", answer])
+    _submit(client, admin_headers, test_quiz, ["3", "Berlin"])
+    url = f"/api/v1/quizzes/{test_quiz.id}/results/questions/{second}"
+
+    response = client.get(f"{url}/stats", headers=user_headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert (stats["answers"], stats["correct"], stats["other"]) == (4, 1, 1)
+    assert stats["options"] == [
+        {"index": 0, "option": "London", "answers": 0, "correct": 0},
+        {"index": 1, "option": "Berlin", "answers": 2, "correct": 0},
+        {"index": 2, "option": "Paris", "answers": 1, "correct": 1},
+        {"index": 3, "option": "Madrid", "answers": 0, "correct": 0},
+    ]
+
+    response = client.get(
+        f"{url}/users", headers=user_headers,
+        params={"correct": False},
+    )
+    assert response.status_code == 200
+    assert [
+        (user["username"], user["answers"]) for user in response.json()
+    ] == [("admin", 1), ("testuser", 2)]
+    response = client.get(
+        f"{url}/users", headers=user_headers, params={"option": 2}
+    )
+    assert [user["answers"] for user in response.json()] == [1]
+
+    # Only the author, and only questions of the quiz
+    response = client.get(f"{url}/stats", headers=admin_headers)
+    assert response.status_code == 403
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/questions/0/stats",
+        headers=user_headers,
+    )
+    assert response.status_code == 404
+
+
+def test_statistics_need_answer_rows(
+    client: TestClient, test_quiz: Quiz, user_headers: dict
+):
+    """Test that the endpoints are off without the answer rows."""
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/questions/"
+        f"{test_quiz.questions[0].id}/stats",
+        headers=user_headers,
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Answer statistics are not enabled"
+
+
+def test_fill_command(
+    db: Session,
+    test_user: User,
+    test_quiz: Quiz,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+):
+    """Test storing the answer rows of earlier results."""
+    monkeypatch.setattr(command, "get_db_session", TestingSessionLocal)
+    first, second = (question.id for question in test_quiz.questions)
+    db.execute(insert(QuizResult), [
+        {
+            "quiz_id": test_quiz.id, "user_id": test_user.id, "score": 0,
+            "max_score": 3, "correct_answers": 0, "answers": answers,
+        }
+        for answers in (
+            {str(first): "4", str(second): "Berlin"}, {}, {str(second): "x"},
+        )
+    ])
+    db.commit()
+
+    assert command.main(["--batch-size", "2"]) == 0
+    assert capsys.readouterr().out == "3 answer rows stored\n"
+    assert [row[1:] for row in _answer_rows(db)] == [
+        (first, 1, True), (second, 1, False), (second, None, False),
+    ]
+    assert command.main([]) == 0
+    assert capsys.readouterr().out == "0 answer rows stored\n"
@@ -0,0 +1,227 @@
+"""Tests for archiving old quiz results into an attached database."""
+
+import json
+from collections.abc import Generator
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.commands import archive_results as command
+from src.crud.quiz import (archive_old_results, archive_results,
+                           delete_quiz, repair_quiz_counters)
+from src.crud.user import delete_user
+from src.models.archive import (archive_metadata, archived_quiz_result,
+                                archived_quiz_result_answer)
+from src.models.quiz import Quiz, QuizResult
+from src.models.user import User
+from src.settings.archive import archive_settings
+from src.settings.submissions import submission_settings
+from src.utils.orm import attach_archive
+from tests.conftest import TestingSessionLocal, add_results, engine
+
+OLD = datetime(2025, 1, 1, 12, 30)
+RECENT = datetime(2026, 10, 1, 8)
+CUTOFF = datetime(2026, 1, 1)
+ANSWERS = {"1": "4", "2": "a, b"}
+
+
+@pytest.fixture
+def archive(
+    db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Generator[Path, None, None]:
+    path = tmp_path / "archive.db"
+    monkeypatch.setattr(archive_settings, "path", str(path))
+    connection = engine.raw_connection()
+    try:
+        attach_archive(connection.dbapi_connection, None)
+    finally:
+        connection.close()
+    archive_metadata.create_all(engine)
+    yield path
+    db.rollback()
+    with engine.connect() as connection:
+        connection.exec_driver_sql("DETACH DATABASE archive")
+
+
+def _archived(db: Session) -> list:
+    return db.execute(
+        select(archived_quiz_result).order_by(archived_quiz_result.c.id)
+    ).all()
+
+
+def _hot(db: Session) -> int:
+    return db.scalar(select(func.count(QuizResult.id)))
+
+
+def test_old_results_move_to_the_archive(
+    db: Session, archive: Path, test_user: User, test_quiz: Quiz
+):
+    """Test that old results move in batches, still counted."""
+    add_results(
+        db, test_quiz, test_user, [1, 2, 3], answers=ANSWERS, completed_at=OLD
+    )
+    add_results(
+        db, test_quiz, test_user, [0], answers=ANSWERS, completed_at=RECENT
+    )
+
+    assert archive_old_results(db, CUTOFF, batch_size=2) == 3
+    assert _hot(db) == 1
+    archived = _archived(db)
+    assert [row.score for row in archived] == [1, 2, 3]
+    assert archived[0].completed_at == int(
+        (OLD - datetime(1970, 1, 1)).total_seconds()
+    )
+    assert archived[0].answers == {"1": "4", "2": "a, b"}
+    assert archive_old_results(db, CUTOFF, batch_size=2) == 0
+
+    db.expire_all()
+    assert test_quiz.attempt_count == 4
+    # The fixture's questions were added without counting them
+    (drifted,) = repair_quiz_counters(db, dry_run=True)
+    assert drifted["actual"]["attempt_count"] == 4
+    assert drifted["actual"]["score_sum"] == 6
+
+
+def test_history_and_export_read_both_tables(
+    client: TestClient,
+    db: Session,
+    archive: Path,
+    test_user: User,
+    test_quiz: Quiz,
+    user_headers: dict,
+):
+    """Test that archived results look like the others to clients.
+
+    History, export, the author's list and the leaderboard include them.
+    """
+    add_results(
+        db, test_quiz, test_user, [1, 2], answers=ANSWERS, completed_at=OLD
+    )
+    add_results(
+        db, test_quiz, test_user, [3], answers=ANSWERS, completed_at=RECENT
+    )
+    archive_old_results(db, CUTOFF, batch_size=10)
+
+    response = client.get("/api/v1/quizzes/results/user", headers=user_headers)
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["score"] for result in results] == [1, 2, 3]
+    assert results[0]["quiz_title"] == test_quiz.title
+    assert results[0]["username"] == test_user.username
+    assert results[0]["answers"] == {"1": "4", "2": "a, b"}
+    assert results[0]["completed_at"] == "2025-01-01T12:30:00"
+    assert results[0]["created_at"] == results[0]["completed_at"]
+
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/export", headers=user_headers
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["score"] for row in rows] == [1, 2, 3]
+    assert rows[0]["username"] == test_user.username
+
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/", headers=user_headers
+    )
+    assert response.status_code == 200
+    assert [result["score"] for result in response.json()] == [1, 2, 3]
+
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/leaderboard",
+        headers=user_headers,
+    )
+    assert response.status_code == 200
+    entries = response.json()["entries"]
+    assert [entry["score"] for entry in entries] == [3, 2, 1]
+    assert entries[2]["completed_at"] == "2025-01-01T12:30:00"
+
+
+def test_answer_rows_move_to_the_archive(
+    client: TestClient,
+    db: Session,
+    archive: Path,
+    test_quiz: Quiz,
+    user_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that answer statistics keep counting archived answers."""
+    monkeypatch.setattr(submission_settings, "answer_rows", True)
+    second = test_quiz.questions[1].id
+    ids = [
+        client.post(
+            f"/api/v1/quizzes/{test_quiz.id}/results/",
+            headers=user_headers,
+            json={"answers": [{"question_id": second, "answer": answer}]},
+        ).json()["id"]
+        for answer in ("Paris", "Berlin", "Paris")
+    ]
+    assert archive_results(db, ids[:2]) == 2
+    assert len(db.execute(select(archived_quiz_result_answer)).all()) == 2
+
+    url = f"/api/v1/quizzes/{test_quiz.id}/results/questions/{second}"
+    stats = client.get(f"{url}/stats", headers=user_headers).json()
+    assert (stats["answers"], stats["correct"]) == (3, 2)
+    response = client.get(
+        f"{url}/users", headers=user_headers, params={"correct": True}
+    )
+    assert [user["answers"] for user in response.json()] == [2]
+
+    assert delete_quiz(db, test_quiz.id) is True
+    assert db.execute(select(archived_quiz_result_answer)).all() == []
+
+
+def test_deletes_reach_the_archive(
+    db: Session,
+    archive: Path,
+    test_user: User,
+    test_admin: User,
+    test_quiz: Quiz,
+):
+    """Test that deleting users and quizzes deletes archived results."""
+    admin_quiz = Quiz(title="Admin quiz", author_id=test_admin.id)
+    db.add(admin_quiz)
+    db.commit()
+    add_results(
+        db, admin_quiz, test_user, [1, 2], answers=ANSWERS, completed_at=OLD
+    )
+    add_results(
+        db, admin_quiz, test_admin, [3], answers=ANSWERS, completed_at=OLD
+    )
+    add_results(
+        db, test_quiz, test_admin, [3], answers=ANSWERS, completed_at=OLD
+    )
+    archive_old_results(db, CUTOFF, batch_size=10)
+    admin_quiz_id = admin_quiz.id
+
+    assert delete_user(db, test_user.id) is True
+    assert [row.user_id for row in _archived(db)] == [test_admin.id]
+    db.expire_all()
+    assert (admin_quiz.attempt_count, admin_quiz.score_sum) == (1, 3)
+
+    assert delete_quiz(db, admin_quiz_id) is True
+    assert _archived(db) == []
+
+
+def test_archive_command(
+    db: Session,
+    test_user: User,
+    test_quiz: Quiz,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    request: pytest.FixtureRequest,
+):
+    """Test the archive command with and without an archive."""
+    monkeypatch.setattr(command, "get_db_session", TestingSessionLocal)
+    add_results(
+        db, test_quiz, test_user, [1, 2], answers=ANSWERS, completed_at=OLD
+    )
+    assert command.main([]) == 2
+
+    request.getfixturevalue("archive")
+    assert command.main(["--older-than-days", "30"]) == 0
+    assert capsys.readouterr().out == "2 results archived\n"
+    assert _hot(db) == 0
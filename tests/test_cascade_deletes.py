@@ -0,0 +1,152 @@
+"""Tests for deletes cascading in the database."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import delete_quiz, delete_quiz_results_batch
+from src.crud.user import delete_user, get_user_delete_size
+from src.models.quiz import Question, Quiz, QuizResult
+from src.models.user import User
+from src.utils.orm import database_settings
+from tests.conftest import add_results, engine
+
+
+def _count(db: Session, model: type) -> int:
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def test_delete_quiz_is_one_statement(
+    db: Session, test_user: User, test_quiz: Quiz
+):
+    """Test that questions and results go with the quiz, unloaded."""
+    add_results(db, test_quiz, test_user, [1, 2, 3])
+    quiz_id = test_quiz.id
+    statements = []
+
+    def record(conn, cursor, statement, *args):  # noqa: ANN001
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert delete_quiz(db, quiz_id) is True
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert [s.split()[0] for s in statements] == ["DELETE"]
+    assert _count(db, Question) == 0
+    assert _count(db, QuizResult) == 0
+    assert delete_quiz(db, quiz_id) is False
+
+
+def test_delete_user_cascades(
+    db: Session, test_user: User, test_admin: User, test_quiz: Quiz
+):
+    """Test that a user's quizzes and results go, and counters follow."""
+    admin_quiz = Quiz(title="Admin quiz", author_id=test_admin.id)
+    db.add(admin_quiz)
+    db.commit()
+    add_results(db, admin_quiz, test_user, [1, 2])
+    add_results(db, admin_quiz, test_admin, [3])
+    add_results(db, test_quiz, test_admin, [3])
+
+    quiz_id = test_quiz.id
+    assert delete_user(db, test_user.id) is True
+
+    db.expire_all()
+    assert db.get(Quiz, quiz_id) is None
+    assert _count(db, Question) == 0
+    assert db.scalars(select(QuizResult.user_id)).all() == [test_admin.id]
+    assert (admin_quiz.attempt_count, admin_quiz.score_sum) == (1, 3)
+    assert delete_user(db, test_user.id) is False
+
+
+def test_delete_results_in_batches(
+    db: Session, test_user: User, test_quiz: Quiz
+):
+    """Test that batches delete results and keep the counters."""
+    add_results(db, test_quiz, test_user, [1, 2, 3])
+
+    first, second = delete_quiz_results_batch(db, test_quiz.id, 2)
+    db.expire_all()
+    assert test_quiz.attempt_count == 1
+    assert test_quiz.max_score_sum == 3
+    assert delete_quiz_results_batch(db, test_quiz.id, 2, second) \
+        == [second + 1]
+    assert delete_quiz_results_batch(db, test_quiz.id, 2) == []
+    db.expire_all()
+    assert (test_quiz.attempt_count, test_quiz.score_sum) == (0, 0)
+
+
+def test_large_quiz_is_deleted_in_the_background(
+    client: TestClient,
+    db: Session,
+    user_headers: dict,
+    test_user: User,
+    test_quiz: Quiz,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that deleting a quiz with many attempts answers 202."""
+    monkeypatch.setattr(database_settings, "background_delete_threshold", 2)
+    monkeypatch.setattr(database_settings, "delete_batch_size", 2)
+    add_results(db, test_quiz, test_user, [1, 2, 3, 1, 2])
+    quiz_id = test_quiz.id
+
+    # The test client runs background tasks before it returns
+    response = client.delete(
+        f"/api/v1/quizzes/{quiz_id}",
+        headers=user_headers,
+    )
+    assert response.status_code == 202
+    assert response.json() == {"detail": "Quiz deletion started"}
+    db.expire_all()
+    assert db.get(Quiz, quiz_id) is None
+    assert _count(db, QuizResult) == 0
+
+
+def test_large_user_is_deleted_in_the_background(
+    client: TestClient,
+    db: Session,
+    user_headers: dict,
+    test_user: User,
+    test_admin: User,
+    test_quiz: Quiz,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that deleting a user with many results answers 202."""
+    monkeypatch.setattr(database_settings, "background_delete_threshold", 4)
+    monkeypatch.setattr(database_settings, "delete_batch_size", 2)
+    admin_quiz = Quiz(title="Admin quiz", author_id=test_admin.id)
+    db.add(admin_quiz)
+    db.commit()
+    add_results(db, test_quiz, test_admin, [1, 2, 3])
+    add_results(db, admin_quiz, test_user, [1, 2])
+    add_results(db, admin_quiz, test_admin, [3])
+    assert get_user_delete_size(db, test_user.id) == 5
+    user_id, quiz_id = test_user.id, test_quiz.id
+    statements = []
+
+    def record(conn, cursor, statement, *args):  # noqa: ANN001
+        if statement.startswith("DELETE FROM quizresult "):
+            statements.append(statement)
+
+    # The test client runs background tasks before it returns
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.delete(
+            f"/api/v1/users/{user_id}",
+            headers=user_headers,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 202
+    assert response.json() == {"detail": "User deletion started"}
+    # Two batches for the quiz, one for the user's own results
+    assert len(statements) == 3
+
+    db.expire_all()
+    assert db.get(User, user_id) is None
+    assert db.get(Quiz, quiz_id) is None
+    assert db.scalars(select(QuizResult.user_id)).all() == [test_admin.id]
+    assert (admin_quiz.attempt_count, admin_quiz.score_sum) == (1, 3)
@@ -0,0 +1,126 @@
+"""Tests for the synthetic dataset generator."""
+
+import json
+import sqlite3
+from collections import Counter
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from benchmarks.datagen import DatasetSpec, generate, main
+from src.crud.quiz import (fill_answer_rows, get_quiz, get_quiz_leaderboard,
+                           repair_quiz_counters)
+
+SPEC = DatasetSpec(users=50, quizzes=20, results=2000, chunk_size=300)
+
+
+def _dump(path: Path) -> list[tuple]:
+    with sqlite3.connect(path) as conn:
+        return conn.execute(
+            "SELECT id, quiz_id, user_id, score, answers FROM quizresult "
+            "ORDER BY id"
+        ).fetchall()
+
+
+def test_generate_counts_and_answers(tmp_path: Path):
+    """Test row counts and that answers match the questions of the quiz."""
+    path = tmp_path / "data.db"
+    counts = generate(path, SPEC)
+    assert counts["user"] == 50
+    assert counts["quiz"] == 20
+    assert counts["quizresult"] == 2000
+    assert 20 * SPEC.min_questions <= counts["question"]
+    assert counts["question"] <= 20 * SPEC.max_questions
+
+    with sqlite3.connect(path) as conn:
+        questions = {
+            qid: (quiz_id, json.loads(options), correct, points)
+            for qid, quiz_id, options, correct, points in conn.execute(
+                "SELECT id, quiz_id, options, correct_answer, points "
+                "FROM question"
+            )
+        }
+        rows = conn.execute(
+            "SELECT quiz_id, score, max_score, correct_answers, answers "
+            "FROM quizresult"
+        ).fetchall()
+
+    for quiz_id, score, max_score, correct_answers, answers in rows:
+        answers = json.loads(answers)
+        expected = 0
+        right = 0
+        for question_id, answer in answers.items():
+            q_quiz, options, correct, points = questions[int(question_id)]
+            assert q_quiz == quiz_id
+            assert answer in options
+            if answer == correct:
+                expected += points
+                right += 1
+        assert (score, correct_answers) == (expected, right)
+        assert score <= max_score
+
+    # Popularity is skewed: the top quiz gets far more than an even share
+    top = Counter(row[0] for row in rows).most_common(1)[0][1]
+    assert top > 3 * len(rows) / SPEC.quizzes
+
+
+def test_generate_is_deterministic(tmp_path: Path):
+    """Test that the same seed yields the same data and another does not."""
+    generate(tmp_path / "a.db", SPEC)
+    generate(tmp_path / "b.db", SPEC)
+    generate(tmp_path / "c.db", DatasetSpec(**{**SPEC.__dict__, "seed": 1}))
+    assert _dump(tmp_path / "a.db") == _dump(tmp_path / "b.db")
+    assert _dump(tmp_path / "a.db") != _dump(tmp_path / "c.db")
+
+
+def test_generated_data_loads_through_crud(tmp_path: Path):
+    """Test that the application reads the generated database."""
+    path = tmp_path / "data.db"
+    generate(path, SPEC)
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        quiz = get_quiz(session, 1)
+        assert quiz is not None
+        assert all(isinstance(q.options, list) for q in quiz.questions)
+        assert get_quiz_leaderboard(session, 1) is not None
+    engine.dispose()
+
+
+def test_generated_counters_and_answer_rows(tmp_path: Path):
+    """Test that counters and answer rows match what the app would store."""
+    path = tmp_path / "data.db"
+    counts = generate(path, SPEC)
+    with sqlite3.connect(path) as conn:
+        answers = sum(
+            len(json.loads(answers))
+            for (answers,) in conn.execute("SELECT answers FROM quizresult")
+        )
+        stored = conn.execute(
+            "SELECT * FROM quizresult_answer ORDER BY result_id, question_id"
+        ).fetchall()
+    assert counts["quizresult_answer"] == answers == len(stored)
+
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        assert repair_quiz_counters(session, dry_run=True) == []
+        assert get_quiz(session, 1).attempt_count > 0
+        # The application stores the same rows
+        session.execute(text("DELETE FROM quizresult_answer"))
+        session.commit()
+        assert fill_answer_rows(session) == answers
+        assert session.execute(text(
+            "SELECT * FROM quizresult_answer ORDER BY result_id, question_id"
+        )).all() == stored
+    engine.dispose()
+
+
+def test_main_refuses_to_overwrite(tmp_path: Path):
+    """Test that an existing output file needs --force."""
+    path = tmp_path / "data.db"
+    path.write_text("")
+    args = ["--output", str(path), "--users", "5", "--quizzes", "2",
+            "--results", "10"]
+    assert main(args) == 1
+    assert main([*args, "--force"]) == 0
+    assert len(_dump(path)) == 10
@@ -0,0 +1,48 @@
+"""Tests for entity tags and quiz versions."""
+
+from sqlalchemy.orm import Session
+
+from src.models.quiz import Question, Quiz
+from src.utils.etag import etag_matches, make_etag
+
+
+def test_etag_matches():
+    """Test If-None-Match parsing."""
+    etag = make_etag(1, 3)
+    assert etag == '"1-3"'
+    assert etag_matches('"1-3"', etag)
+    assert etag_matches('W/"1-3"', etag)
+    assert etag_matches('"1-2", "1-3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"1-2"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_quiz_version_bumped_by_writes(db: Session, test_quiz: Quiz):
+    """Test that quiz and question writes bump the quiz version."""
+    version = test_quiz.version
+
+    test_quiz.title = "Renamed quiz"
+    db.commit()
+    assert test_quiz.version == version + 1
+
+    question = test_quiz.questions[0]
+    question.points = 5
+    db.commit()
+    assert test_quiz.version == version + 2
+
+    db.add(Question(
+        quiz_id=test_quiz.id, text="New?", options=["a", "b"],
+        correct_answer="a",
+    ))
+    db.commit()
+    assert test_quiz.version == version + 3
+
+    db.delete(question)
+    db.commit()
+    assert test_quiz.version == version + 4
+
+    # Unchanged attributes do not count as a write
+    test_quiz.title = "Renamed quiz"
+    db.commit()
+    assert test_quiz.version == version + 4
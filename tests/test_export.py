@@ -0,0 +1,129 @@
+"""Tests for the streaming export of quiz results."""
+
+import csv
+import io
+import json
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import iter_quiz_results
+from src.models.quiz import Quiz, QuizResult
+from src.models.user import User
+from src.settings.export import export_settings
+from src.utils.export import CSV, NDJSON, ndjson_chunks, negotiate
+from tests.conftest import add_results
+
+ANSWERS = {"1": "4", "2": "answer, with a comma"}
+
+
+def test_negotiate():
+    """Test choosing the export format from the Accept header."""
+    assert negotiate(None) == NDJSON
+    assert negotiate("*/*") == NDJSON
+    assert negotiate("text/csv") == CSV
+    assert negotiate("application/jsonl") == NDJSON
+    assert negotiate("application/x-ndjson;q=0.5, text/csv") == CSV
+    assert negotiate("text/csv;q=0, application/x-ndjson") == NDJSON
+    assert negotiate("application/xml") is None
+
+
+def test_export_ndjson(
+    client: TestClient,
+    db: Session,
+    test_user: User,
+    test_quiz: Quiz,
+    user_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test streaming results as NDJSON in several batches."""
+    monkeypatch.setattr(export_settings, "batch_size", 7)
+    add_results(db, test_quiz, test_user, [1] * 25, answers=ANSWERS)
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/export",
+        headers=user_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON
+    assert "attachment" in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 25
+    assert rows[0]["username"] == "testuser"
+    assert rows[3]["answers"] == ANSWERS
+    assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+
+
+def test_export_csv(
+    client: TestClient,
+    db: Session,
+    test_user: User,
+    test_quiz: Quiz,
+    user_headers: dict,
+):
+    """Test streaming results as CSV when asked for text/csv."""
+    add_results(db, test_quiz, test_user, [1] * 3, answers=ANSWERS)
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/export",
+        headers={**user_headers, "Accept": CSV},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(CSV)
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[1]["score"] == "1"
+    assert json.loads(rows[2]["answers"]) == ANSWERS
+
+
+def test_export_errors(
+    client: TestClient,
+    test_quiz: Quiz,
+    user_headers: dict,
+    admin_headers: dict,
+):
+    """Test unsupported formats, unknown quizzes and other users."""
+    url = f"/api/v1/quizzes/{test_quiz.id}/results/export"
+    response = client.get(
+        url,
+        headers={
+            **user_headers,
+            "Accept": "application/xml",
+        },
+    )
+    assert response.status_code == 406
+
+    response = client.get(
+        "/api/v1/quizzes/999/results/export",
+        headers=user_headers,
+    )
+    assert response.status_code == 404
+
+    response = client.get(
+        url, headers=admin_headers
+    )
+    assert response.status_code == 403
+
+
+def test_export_memory_does_not_grow_with_rows(
+    db: Session, test_user: User, test_quiz: Quiz
+):
+    """Test that streaming four times the rows needs no more memory."""
+    def peak(count: int) -> int:
+        db.execute(delete(QuizResult))
+        add_results(db, test_quiz, test_user, [1] * count, answers=ANSWERS)
+        tracemalloc.start()
+        try:
+            size = 0
+            for chunk in ndjson_chunks(
+                iter_quiz_results(db, test_quiz.id, batch_size=200)
+            ):
+                size += len(chunk)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small = peak(2_000)
+    large = peak(8_000)
+    assert large < small * 1.5
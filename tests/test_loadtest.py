@@ -0,0 +1,88 @@
+"""Tests for the load test harness."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.loadtest import (LoadTestConfig, compare, main, percentile,
+                                 run, summarize)
+from benchmarks.scenarios import DEFAULT_SCENARIOS, with_weights
+
+
+def test_percentile_nearest_rank():
+    """Test percentiles on a known sample."""
+    ordered = [float(n) for n in range(1, 101)]
+    assert percentile(ordered, 50) == 50.0
+    assert percentile(ordered, 99) == 99.0
+    assert percentile(ordered, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize():
+    """Test throughput and latency summary of a sample."""
+    summary = summarize([0.01, 0.02, 0.03, 0.04], errors=1, elapsed=2.0)
+    assert summary["requests"] == 4
+    assert summary["errors"] == 1
+    assert summary["throughput"] == 2.0
+    assert summary["p50_ms"] == 20.0
+    assert summary["max_ms"] == 40.0
+
+
+def test_compare_detects_regressions():
+    """Test that slower or failing runs are reported against a baseline."""
+    base = {"throughput": 100.0, "p95_ms": 10.0, "errors": 0}
+    baseline = {"total": base, "scenarios": {"take_quiz": base}}
+
+    same = {"total": base, "scenarios": {"take_quiz": base}}
+    assert compare(same, baseline, tolerance=0.1) == []
+
+    slower = {"throughput": 80.0, "p95_ms": 12.0, "errors": 2}
+    report = {"total": base, "scenarios": {"take_quiz": slower}}
+    regressions = compare(report, baseline, tolerance=0.1)
+    assert len(regressions) == 3
+    assert all(r.startswith("take_quiz") for r in regressions)
+
+    missing = {"total": base, "scenarios": {}}
+    assert compare(missing, baseline, tolerance=0.1) == [
+        "take_quiz: no requests recorded"
+    ]
+
+
+def test_with_weights():
+    """Test overriding and disabling scenario weights."""
+    scenarios = with_weights({"login": 0, "take_quiz": 10})
+    weights = {s.name: s.weight for s in scenarios}
+    assert "login" not in weights
+    assert weights["take_quiz"] == 10
+    assert len(scenarios) == len(DEFAULT_SCENARIOS) - 1
+
+    with pytest.raises(ValueError, match="Unknown scenarios"):
+        with_weights({"nope": 1})
+
+
+def test_in_process_run():
+    """Test a short in-process run exercising every scenario."""
+    config = LoadTestConfig(
+        users=2, duration=1.0, warmup=0.0, quizzes=1, questions=2
+    )
+    report = run(config)
+    assert report["config"]["mode"] == "in-process"
+    assert report["total"]["requests"] > 0
+    assert report["total"]["errors"] == 0
+
+
+def test_main_compares_against_baseline(tmp_path: Path):
+    """Test recording a baseline and failing on a regression."""
+    args = [
+        "--users", "1", "--duration", "0.5", "--warmup", "0",
+        "--quizzes", "1", "--questions", "1", "--scenario", "login=0",
+    ]
+    baseline = tmp_path / "baseline.json"
+    assert main([*args, "--record", str(baseline)]) == 0
+
+    # An impossible baseline must fail the comparison
+    data = json.loads(baseline.read_text())
+    data["total"]["throughput"] = 1e9
+    baseline.write_text(json.dumps(data))
+    assert main([*args, "--compare", str(baseline)]) == 1
@@ -0,0 +1,127 @@
+"""Tests for the per-process caches and their use in crud."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import (answer_key_cache, get_answer_key,
+                           get_quiz_leaderboard, leaderboard_cache,
+                           update_question)
+from src.models.quiz import Question, Quiz
+from src.schemas.quiz import QuestionUpdate
+from src.settings.cache import cache_settings
+from src.utils.local_cache import LocalCache
+from tests.conftest import TestingSessionLocal
+
+
+def test_get_or_set_and_eviction():
+    """Test hits, misses and least recently used eviction."""
+    cache = LocalCache("test_lru", ttl=60, max_entries=2)
+    calls = []
+
+    def compute(value: int) -> int:
+        calls.append(value)
+        return value
+
+    assert cache.get_or_set("a", lambda: compute(1)) == 1
+    assert cache.get_or_set("a", lambda: compute(2)) == 1
+    assert calls == [1]
+
+    cache.set("b", 2)
+    cache.get("a")  # "a" is now the most recently used
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_expiry_and_invalidation():
+    """Test that expired and invalidated entries are recomputed."""
+    cache = LocalCache("test_ttl", ttl=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+    cache.ttl = 60
+    cache.set((1, 10), "x")
+    cache.set((2, 10), "y")
+    cache.invalidate_matching(lambda key: key[0] == 1)
+    assert (1, 10) not in cache
+    assert cache.get((2, 10)) == "y"
+    cache.invalidate((2, 10))
+    assert len(cache) == 0
+
+
+def test_disabled_cache(monkeypatch: pytest.MonkeyPatch):
+    """Test that nothing is stored while caching is disabled."""
+    monkeypatch.setattr(cache_settings, "enabled", False)
+    cache = LocalCache("test_disabled", ttl=60)
+    assert cache.get_or_set("a", lambda: 1) == 1
+    assert len(cache) == 0
+
+
+def test_answer_key_follows_quiz_version(db: Session, test_quiz: Quiz):
+    """Test that editing a question refreshes the cached answer key."""
+    key = get_answer_key(db, test_quiz.id)
+    assert sorted(answer for answer, _ in key.answers.values()) == [
+        "4", "Paris"
+    ]
+    assert key.max_score == 3
+    assert (test_quiz.id, test_quiz.version) in answer_key_cache
+
+    question = test_quiz.questions[0]
+    update_question(db, question.id, QuestionUpdate(correct_answer="5"))
+    assert get_answer_key(db, test_quiz.id).answers[question.id][0] == "5"
+    assert get_answer_key(db, 999) is None
+
+
+def test_edits_by_other_workers_change_grading(
+    client: TestClient, user_headers: dict, db: Session, test_quiz: Quiz
+):
+    """Test that an edit this process did not see still reaches grading."""
+    url = f"/api/v1/quizzes/{test_quiz.id}/results/"
+    first = test_quiz.questions[0].id
+
+    def score(answers: dict[int, str]) -> int:
+        response = client.post(url, headers=user_headers, json={"answers": [
+            {"question_id": question_id, "answer": answer}
+            for question_id, answer in answers.items()
+        ]})
+        assert response.status_code == 201
+        return response.json()["score"]
+
+    assert score({first: "5"}) == 0
+    # Another worker edits the quiz through its own session, so nothing
+    # in this process is invalidated
+    other = TestingSessionLocal()
+    try:
+        other.get(Question, first).correct_answer = "5"
+        added = Question(
+            quiz_id=test_quiz.id, text="2 + 3?", options=["5", "6"],
+            correct_answer="5", points=4,
+        )
+        other.add(added)
+        other.commit()
+        added_id = added.id
+    finally:
+        other.close()
+
+    assert score({first: "5", added_id: "5"}) == 5
+
+
+def test_leaderboard_invalidated_on_submission(
+    client: TestClient, user_headers: dict, db: Session, test_quiz: Quiz
+):
+    """Test that a new result shows up on the cached leaderboard."""
+    assert get_quiz_leaderboard(db, test_quiz.id) == []
+    assert (test_quiz.id, 10) in leaderboard_cache
+
+    question = test_quiz.questions[0]
+    response = client.post(
+        f"/api/v1/quizzes/{test_quiz.id}/results/",
+        headers=user_headers,
+        json={"answers": [{"question_id": question.id, "answer": "4"}]},
+    )
+    assert response.status_code == 201
+    assert response.json()["score"] == 1
+    assert (test_quiz.id, 10) not in leaderboard_cache
+    assert len(get_quiz_leaderboard(db, test_quiz.id)) == 1
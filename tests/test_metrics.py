@@ -0,0 +1,77 @@
+"""Tests for the Prometheus metrics endpoint and middleware."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.models.quiz import Quiz
+from src.utils.metrics import (DB_POOL_CHECKED_OUT, REQUEST_LATENCY,
+                               REQUESTS_TOTAL, UNMATCHED_ROUTE)
+
+
+def _sample(metric, suffix: str, **labels) -> float:
+    """Read a single sample value from a metric."""
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name.endswith(suffix) and sample.labels.items() >= labels.items():
+                return sample.value
+    return 0.0
+
+
+def test_metrics_endpoint_format(client: TestClient):
+    """Test that /metrics is served in the Prometheus text format."""
+    client.get("/healthz")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
+    assert 'route="/healthz"' in response.text
+
+
+def test_requests_labelled_by_route_template(
+    client: TestClient, user_headers: dict, test_quiz: Quiz
+):
+    """Test that path parameters are collapsed into the route template."""
+    route = "/api/v1/quizzes/{quiz_id}"
+    before = _sample(
+        REQUESTS_TOTAL, "_total", method="GET", route=route, status="200"
+    )
+    count_before = _sample(REQUEST_LATENCY, "_count", method="GET", route=route)
+
+    client.get(
+        f"/api/v1/quizzes/{test_quiz.id}",
+        headers=user_headers,
+    )
+    client.get(
+        "/api/v1/quizzes/999",
+        headers=user_headers,
+    )
+
+    assert _sample(
+        REQUESTS_TOTAL, "_total", method="GET", route=route, status="200"
+    ) == before + 1
+    assert _sample(
+        REQUESTS_TOTAL, "_total", method="GET", route=route, status="404"
+    ) >= 1
+    assert _sample(
+        REQUEST_LATENCY, "_count", method="GET", route=route
+    ) == count_before + 2
+
+
+def test_unmatched_routes_share_one_label(client: TestClient):
+    """Test that unknown paths do not create a label per path."""
+    client.get("/no/such/path")
+    client.get("/another/missing/path")
+    response = client.get("/metrics")
+    assert f'route="{UNMATCHED_ROUTE}",status="404"' in response.text
+    assert "/no/such/path" not in response.text
+
+
+def test_pool_checkout_gauge(db: Session):
+    """Test that checked out pool connections are tracked."""
+    before = _sample(DB_POOL_CHECKED_OUT, "connections")
+    connection = db.connection()
+    connection.execute(text("SELECT 1"))
+    assert _sample(DB_POOL_CHECKED_OUT, "connections") == before + 1
+    db.close()
+    assert _sample(DB_POOL_CHECKED_OUT, "connections") == before
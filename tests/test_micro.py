@@ -0,0 +1,47 @@
+"""Tests for the microbenchmark suite."""
+
+import json
+from pathlib import Path
+
+from benchmarks.micro import BENCHMARKS, DatasetSize, main, measure, run
+
+TINY = DatasetSize(
+    users=3, quizzes=2, questions=3, results=20, large_quiz_questions=10
+)
+
+
+def test_measure_reports_per_call_statistics():
+    """Test that timings are per call and internally consistent."""
+    calls = []
+    timing = measure(lambda: calls.append(1), "noop", rounds=3, min_time=0.001)
+    assert timing.rounds == 3
+    assert timing.iterations >= 1
+    assert 0 < timing.min <= timing.median
+    assert timing.ops > 0
+    assert len(calls) >= 1 + 3 * timing.iterations
+
+
+def test_all_benchmarks_run_on_tiny_dataset():
+    """Test that every registered benchmark runs and is reported."""
+    report = run(TINY, list(BENCHMARKS), rounds=2, min_time=0.001)
+    assert report["meta"]["dataset"]["results"] == 20
+    names = [b["name"] for b in report["benchmarks"]]
+    assert names == list(BENCHMARKS)
+    assert all(b["median"] > 0 for b in report["benchmarks"])
+
+
+def test_main_writes_json(tmp_path: Path):
+    """Test the command line interface and its JSON output."""
+    output = tmp_path / "bench.json"
+    code = main([
+        "-k", "auth", "--rounds", "2", "--min-time", "0.001",
+        "--users", "2", "--quizzes", "1", "--results", "1",
+        "--json", str(output),
+    ])
+    assert code == 0
+    report = json.loads(output.read_text())
+    assert {b["name"] for b in report["benchmarks"]} == {
+        "auth.create_access_token",
+        "auth.jwt_decode",
+    }
+    assert main(["-k", "no-such-benchmark"]) == 1
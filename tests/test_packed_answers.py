@@ -0,0 +1,185 @@
+"""Tests for the compact binary storage of submitted answers."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from src.commands import pack_answers as command
+from src.crud.quiz import get_quiz_results, pack_stored_answers
+from src.models.quiz import QuizAnswerLayout, QuizResult
+from src.models.user import User
+from src.settings.submissions import submission_settings
+from src.utils.answer_packing import NOT_ANSWERED, AnswerLayout
+from tests.conftest import TestingSessionLocal
+
+LAYOUT = AnswerLayout(
+    quiz_id=1, version=3,
+    questions=((10, ("3", "4")), (11, ("London", "Paris")), (12, ("a", "b"))),
+)
+
+
+@pytest.fixture
+def packed(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(submission_settings, "packed_answers", True)
+
+
+def _stored(db: Session) -> list:
+    return db.execute(
+        select(
+            QuizResult.answers,
+            QuizResult.answers_packed,
+            QuizResult.answers_version,
+        ).order_by(QuizResult.id)
+    ).all()
+
+
+def _question_ids(client: TestClient, headers: dict, quiz_id: int) -> list:
+    response = client.get(f"/api/v1/quizzes/{quiz_id}", headers=headers)
+    return [question["id"] for question in response.json()["questions"]]
+
+
+def test_pack_and_unpack():
+    """Test packing answers into one byte per question and back."""
+    answers = {"12": "b", "10": "4"}
+    packed = LAYOUT.pack(answers)
+    assert packed == bytes([1, NOT_ANSWERED, 1])
+    assert LAYOUT.unpack(packed) == answers
+    # Free text and unknown questions cannot be packed
+    assert LAYOUT.pack({"10": "four"}) is None
+    assert LAYOUT.pack({"13": "a"}) is None
+    assert LAYOUT.pack({}) == bytes([NOT_ANSWERED] * 3)
+
+
+def test_submissions_are_packed_transparently(
+    client: TestClient,
+    db: Session,
+    user_headers: dict,
+    test_quiz,
+    packed: None,
+):
+    """Test that packed answers read back the same everywhere."""
+    first, second = _question_ids(client, user_headers, test_quiz.id)
+    answers = {str(first): "4", str(second): "Paris"}
+    response = client.post(
+        f"/api/v1/quizzes/{test_quiz.id}/results/",
+        headers=user_headers,
+        json={"answers": [
+            {"question_id": int(question_id), "answer": answer}
+            for question_id, answer in answers.items()
+        ]},
+    )
+    assert response.status_code == 201
+    assert response.json()["answers"] == answers
+    # Free text is kept as JSON
+    response = client.post(
+        "/api/v1/quizzes/results/batch",
+        headers=user_headers,
+        json={"submissions": [
+            {
+                "quiz_id": test_quiz.id,
+                "answers": [{"question_id": first, "answer": "4"}],
+            },
+            {
+                "quiz_id": test_quiz.id,
+                "answers": [{"question_id": first, "answer": "four"}],
+            },
+        ]},
+    )
+    assert response.status_code == 200
+    assert [item["result"]["answers"] for item in response.json()["items"]] \
+        == [{str(first): "4"}, {str(first): "four"}]
+
+    assert _stored(db) == [
+        (None, bytes([1, 2]), test_quiz.version),
+        (None, bytes([1, NOT_ANSWERED]), test_quiz.version),
+        ({str(first): "four"}, None, None),
+    ]
+    expected = [answers, {str(first): "4"}, {str(first): "four"}]
+    response = client.get("/api/v1/quizzes/results/user", headers=user_headers)
+    assert [result["answers"] for result in response.json()] == expected
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/", headers=user_headers
+    )
+    assert [result["answers"] for result in response.json()] == expected
+    response = client.get(
+        f"/api/v1/quizzes/{test_quiz.id}/results/export", headers=user_headers
+    )
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["answers"] for row in rows] == expected
+    assert "answers_packed" not in rows[0]
+
+
+def test_old_versions_still_unpack(
+    client: TestClient,
+    db: Session,
+    user_headers: dict,
+    test_quiz,
+    packed: None,
+):
+    """Test that editing a quiz leaves earlier packed answers readable."""
+    first, second = _question_ids(client, user_headers, test_quiz.id)
+    client.post(
+        f"/api/v1/quizzes/{test_quiz.id}/results/",
+        headers=user_headers,
+        json={"answers": [{"question_id": second, "answer": "Madrid"}]},
+    )
+    response = client.put(
+        f"/api/v1/quizzes/{test_quiz.id}/questions/{second}",
+        headers=user_headers,
+        json={"options": ["Rome", "Paris"]},
+    )
+    assert response.status_code == 200
+
+    versions = db.execute(select(QuizAnswerLayout.version)).scalars().all()
+    assert len(versions) == 1
+    db.expire_all()
+    assert test_quiz.version > versions[0]
+    (result,) = get_quiz_results(db, test_quiz.id)
+    assert result.answers == {str(second): "Madrid"}
+
+
+def test_pack_command(
+    db: Session,
+    test_user: User,
+    test_quiz,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+):
+    """Test packing stored JSON answers and the storage report."""
+    monkeypatch.setattr(command, "get_db_session", TestingSessionLocal)
+    first, second = (question.id for question in test_quiz.questions)
+    db.execute(insert(QuizResult), [
+        {
+            "quiz_id": test_quiz.id, "user_id": test_user.id, "score": 0,
+            "max_score": 3, "correct_answers": 0, "answers": answers,
+        }
+        for answers in (
+            {str(first): "3", str(second): "Berlin"},
+            {str(second): "Rome"},
+            {str(first): "6"},
+        )
+    ])
+    db.commit()
+
+    assert command.main(["--report"]) == 0
+    report = capsys.readouterr().out
+    assert report.startswith("stored JSON: 3 results, ")
+    assert "stored packed: 0 results, 0 bytes\n" in report
+    assert "sample of 2 results: JSON " in report
+
+    assert command.main(["--batch-size", "2"]) == 0
+    assert capsys.readouterr().out.startswith(
+        "2 results packed\nstored JSON: 1 results, "
+    )
+    assert [row.answers_packed for row in _stored(db)] == [
+        bytes([0, 1]), None, bytes([3, NOT_ANSWERED]),
+    ]
+    assert [result.answers for result in get_quiz_results(db)] == [
+        {str(first): "3", str(second): "Berlin"},
+        {str(second): "Rome"},
+        {str(first): "6"},
+    ]
+    assert pack_stored_answers(db) == 0
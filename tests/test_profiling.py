@@ -0,0 +1,186 @@
+"""Tests for the request profiler and the sampling profiler."""
+
+import pstats
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.main import create_app
+from src.settings.profiling import profiling_settings
+from src.utils.dependencies import get_db
+from src.utils.profiling import SamplingProfiler, sampler
+from tests.conftest import override_get_db
+
+
+@pytest.fixture
+def profiling_client(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> TestClient:
+    """Create a test client with request profiling enabled."""
+    monkeypatch.setattr(profiling_settings, "request_profiling_enabled", True)
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+@pytest.fixture
+def running_sampler(monkeypatch: pytest.MonkeyPatch):
+    """Run the global sampling profiler for the duration of a test.
+
+    The background thread is slowed down so that tests decide when samples
+    are taken.
+    """
+    monkeypatch.setattr(sampler, "interval", 60.0)
+    sampler.reset()
+    sampler.start()
+    yield sampler
+    sampler.stop()
+    sampler.reset()
+
+
+def _busy(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_admin_gets_pstats_profile(
+    profiling_client: TestClient, admin_headers: dict, tmp_path: Path
+):
+    """Test that an admin receives a loadable pstats file."""
+    response = profiling_client.get(
+        "/api/v1/users/me",
+        headers={
+            **admin_headers,
+            "X-Profile": "pstats",
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-profiled-status"] == "200"
+
+    path = tmp_path / "request.pstats"
+    path.write_bytes(response.content)
+    stats = pstats.Stats(str(path))
+    assert stats.total_calls > 0
+
+
+def test_admin_gets_text_profile(
+    profiling_client: TestClient, admin_headers: dict
+):
+    """Test the human readable profile report."""
+    response = profiling_client.get(
+        "/api/v1/users/me",
+        headers={**admin_headers, "X-Profile": "text"},
+    )
+    assert response.status_code == 200
+    assert "cumulative" in response.text
+
+
+def test_profile_header_ignored_for_regular_users(
+    profiling_client: TestClient, user_headers: dict
+):
+    """Test that non-admins get the normal response."""
+    response = profiling_client.get(
+        "/api/v1/users/me",
+        headers={**user_headers, "X-Profile": "text"},
+    )
+    assert response.status_code == 200
+    assert response.json()["username"] == "testuser"
+    assert "x-profiled-status" not in response.headers
+
+
+def test_profiling_disabled_by_default(
+    client: TestClient, admin_headers: dict
+):
+    """Test that the header does nothing unless profiling is enabled."""
+    response = client.get(
+        "/api/v1/users/me",
+        headers={**admin_headers, "X-Profile": "text"},
+    )
+    assert response.json()["username"] == "admin"
+
+
+def test_sampler_collects_stacks():
+    """Test that samples of a busy thread are aggregated."""
+    profiler = SamplingProfiler(interval=0.001, max_stacks=1000)
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy, args=(stop,))
+    worker.start()
+    try:
+        for _ in range(20):
+            profiler.sample()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profiler.samples == 20
+    assert "_busy" in profiler.folded()
+
+    profile = profiler.speedscope()
+    frames = profile["shared"]["frames"]
+    sampled = profile["profiles"][0]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    assert all(
+        0 <= index < len(frames)
+        for stack in sampled["samples"]
+        for index in stack
+    )
+
+
+def test_sampler_truncates_distinct_stacks():
+    """Test that memory is bounded by max_stacks."""
+    profiler = SamplingProfiler(interval=0.001, max_stacks=1)
+    for _ in range(3):
+        profiler.sample()
+    assert len(profiler.stacks()) <= 2
+
+
+def test_flamegraph_requires_running_sampler(
+    client: TestClient, admin_headers: dict
+):
+    """Test that the download fails when the sampler is off."""
+    response = client.get(
+        "/api/v1/admin/profiler/flamegraph",
+        headers=admin_headers,
+    )
+    assert response.status_code == 404
+
+
+def test_flamegraph_download(
+    client: TestClient, admin_headers: dict, running_sampler
+):
+    """Test downloading the sampler output in both formats."""
+    running_sampler.sample()
+
+    response = client.get("/api/v1/admin/profiler", headers=admin_headers)
+    assert response.json()["running"] is True
+
+    response = client.get(
+        "/api/v1/admin/profiler/flamegraph", headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    response = client.get(
+        "/api/v1/admin/profiler/flamegraph?format=speedscope",
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["profiles"][0]["type"] == "sampled"
+
+    response = client.delete("/api/v1/admin/profiler", headers=admin_headers)
+    assert response.status_code == 200
+    assert running_sampler.samples == 0
+
+
+def test_profiler_endpoints_admin_only(client: TestClient, user_headers: dict):
+    """Test that regular users cannot read profiler data."""
+    response = client.get(
+        "/api/v1/admin/profiler",
+        headers=user_headers,
+    )
+    assert response.status_code in (401, 403)
@@ -0,0 +1,92 @@
+"""Tests for per-request SQL query instrumentation."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.models.quiz import Question, Quiz
+from src.models.user import User
+from src.settings.queries import query_settings
+from src.utils.query_stats import QueryBudgetExceeded, track_queries
+from tests.conftest import add_results
+
+
+@pytest.fixture
+def strict_queries(monkeypatch: pytest.MonkeyPatch):
+    """Make N+1 patterns and budget overruns raise."""
+    monkeypatch.setattr(query_settings, "strict", True)
+    monkeypatch.setattr(query_settings, "repeat_threshold", 3)
+
+
+def test_track_queries_counts_statements(db: Session, test_quiz: Quiz):
+    """Test that statements executed in the block are counted and timed."""
+    with track_queries() as stats:
+        db.execute(select(Quiz)).all()
+        db.execute(select(Question)).all()
+    assert stats.count == 2
+    assert stats.duration > 0
+    assert stats.repeated == {}
+
+
+def test_failed_statements_leave_no_timing(db: Session, test_quiz: Quiz):
+    """Test that a failing statement is not counted or left pending."""
+    with track_queries() as stats:
+        with pytest.raises(OperationalError):
+            db.execute(text("SELECT * FROM missing"))
+        db.rollback()
+        db.execute(select(Quiz)).all()
+    assert stats.count == 1
+    assert not db.connection().info
+
+
+def test_repeated_statements_are_flagged(db: Session, test_quiz: Quiz):
+    """Test that the same statement run many times is reported."""
+    with track_queries() as stats:
+        for _ in range(query_settings.repeat_threshold):
+            db.execute(select(Quiz).filter(Quiz.id == test_quiz.id)).first()
+    assert len(stats.repeated) == 1
+
+
+def test_strict_mode_raises_on_n_plus_one(
+    db: Session, test_quiz: Quiz, strict_queries
+):
+    """Test that strict mode turns a repeated statement into an error."""
+    with pytest.raises(QueryBudgetExceeded), track_queries():
+        for question in test_quiz.questions * 2:
+            db.execute(
+                select(Question).filter(Question.id == question.id)
+            ).first()
+
+
+def test_server_timing_header(client: TestClient, user_headers: dict):
+    """Test that responses report query count and database time."""
+    response = client.get(
+        "/api/v1/users/me",
+        headers=user_headers,
+    )
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="1 queries"' in timing
+
+
+def test_user_results_within_budget(
+    client: TestClient,
+    db: Session,
+    user_headers: dict,
+    test_quiz: Quiz,
+    test_user: User,
+    strict_queries,
+):
+    """Test that listing results does not issue a query per result."""
+    add_results(db, test_quiz, test_user, [1] * 5)
+    response = client.get(
+        "/api/v1/quizzes/results/user",
+        headers=user_headers,
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert all(r["quiz_title"] == "Test Quiz" for r in response.json())
+    assert 'desc="2 queries"' in response.headers["server-timing"]
@@ -1,9 +1,13 @@
 """Tests for the questions endpoints."""
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
+from src.auth.utils import create_access_token
 from src.models.quiz import Quiz
+from src.models.user import User
+from tests.conftest import engine
 
 
 def test_add_question_to_quiz(client: TestClient, user_token: str, test_quiz: Quiz):
@@ -203,3 +207,99 @@ def test_delete_question_from_other_user_quiz(
         # Admin should be able to delete questions from any quiz
         assert response.status_code == 200
         assert response.json()["detail"] == "Question deleted successfully"
+
+
+def test_bulk_edit_questions(
+    client: TestClient, db: Session, user_token: str, test_quiz: Quiz
+):
+    """Test creating, updating and deleting questions in one request."""
+    first, second = sorted(test_quiz.questions, key=lambda q: q.id)
+    version = test_quiz.version
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement.split()[0], executemany))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.patch(
+            f"/api/v1/quizzes/{test_quiz.id}/questions/",
+            headers={"Authorization": f"Bearer {user_token}"},
+            json={
+                "create": [
+                    {"text": f"New {n}?", "options": ["a", "b"],
+                     "correct_answer": "b"}
+                    for n in range(5)
+                ],
+                "update": [{"id": first.id, "text": "What is 2+3?",
+                            "options": ["4", "5"], "correct_answer": "5"}],
+                "delete": [second.id],
+            },
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    questions = response.json()
+    assert [q["text"] for q in questions] == [
+        "What is 2+3?", *(f"New {n}?" for n in range(5)),
+    ]
+    assert questions[0]["points"] == 1
+    assert ("INSERT", True) in statements
+    assert [s for s in statements if s[0] == "INSERT"] == [("INSERT", True)]
+    db.refresh(test_quiz)
+    assert test_quiz.version == version + 1
+
+
+def test_bulk_edit_questions_is_atomic(
+    client: TestClient, db: Session, user_token: str, test_quiz: Quiz
+):
+    """Test that a failing operation leaves the quiz untouched."""
+    first, second = sorted(test_quiz.questions, key=lambda q: q.id)
+    url = f"/api/v1/quizzes/{test_quiz.id}/questions/"
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    response = client.patch(url, headers=headers, json={
+        "create": [{"text": "New?", "options": ["a"], "correct_answer": "a"}],
+        "delete": [first.id, 999],
+    })
+    assert response.status_code == 400
+    assert "[999]" in response.json()["detail"]
+
+    # The new correct answer is checked against the stored options
+    response = client.patch(url, headers=headers, json={
+        "update": [{"id": second.id, "correct_answer": "Rome"}],
+    })
+    assert response.status_code == 400
+
+    response = client.patch(url, headers=headers, json={
+        "update": [{"id": first.id, "points": 3}], "delete": [first.id],
+    })
+    assert response.status_code == 400
+
+    db.expire_all()
+    assert len(test_quiz.questions) == 2
+
+
+def test_bulk_edit_questions_permissions(
+    client: TestClient, db: Session, test_quiz: Quiz, test_user: User
+):
+    """Test that only the author or an admin can edit questions."""
+    other = User(username="other", email="other@example.com",
+                 hashed_password="x", is_active=True)
+    db.add(other)
+    db.commit()
+    token = create_access_token({"sub": "other", "scopes": ["user"]})
+    response = client.patch(
+        f"/api/v1/quizzes/{test_quiz.id}/questions/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"delete": []},
+    )
+    assert response.status_code == 403
+
+    response = client.patch(
+        "/api/v1/quizzes/999/questions/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={},
+    )
+    assert response.status_code == 404
@@ -0,0 +1,168 @@
+"""Tests for the denormalized counters of quizzes."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.commands import repair_quiz_counters as command
+from src.crud.quiz import insert_quiz_results, repair_quiz_counters
+from src.models.quiz import Quiz
+from src.models.user import User
+from tests.conftest import TestingSessionLocal
+
+
+def _question(text: str, correct: str = "4", points: int = 1) -> dict:
+    return {
+        "text": text,
+        "options": ["3", "4"],
+        "correct_answer": correct,
+        "points": points,
+    }
+
+
+def _listed(client: TestClient, headers: dict, quiz_id: int) -> dict:
+    response = client.get("/api/v1/quizzes/", headers=headers)
+    assert response.status_code == 200
+    return next(quiz for quiz in response.json() if quiz["id"] == quiz_id)
+
+
+@pytest.fixture
+def quiz(client: TestClient, user_headers: dict) -> dict:
+    response = client.post("/api/v1/quizzes/", headers=user_headers, json={
+        "title": "Counted",
+        "questions": [_question("One", points=1), _question("Two", points=3)],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_question_counts(client: TestClient, user_headers: dict, quiz: dict):
+    """Test that question writes keep the question count in step."""
+    url = f"/api/v1/quizzes/{quiz['id']}/questions/"
+    assert _listed(client, user_headers, quiz["id"])["question_count"] == 2
+
+    response = client.post(url, headers=user_headers, json=_question("Three"))
+    assert response.status_code == 201
+    assert _listed(client, user_headers, quiz["id"])["question_count"] == 3
+
+    response = client.delete(
+        f"{url}{response.json()['id']}", headers=user_headers
+    )
+    assert response.status_code == 200
+    assert _listed(client, user_headers, quiz["id"])["question_count"] == 2
+
+    response = client.patch(url, headers=user_headers, json={
+        "create": [_question("Four"), _question("Five")],
+        "delete": [quiz["questions"][0]["id"]],
+    })
+    assert response.status_code == 200
+    assert _listed(client, user_headers, quiz["id"])["question_count"] == 3
+
+
+def test_attempt_counts_and_average(
+    client: TestClient, user_headers: dict, quiz: dict, db: Session
+):
+    """Test that submissions add to the attempts and score sums."""
+    one, two = (question["id"] for question in quiz["questions"])
+    listed = _listed(client, user_headers, quiz["id"])
+    assert listed["attempt_count"] == 0
+    assert listed["average_score_percent"] is None
+
+    response = client.post(
+        f"/api/v1/quizzes/{quiz['id']}/results/",
+        headers=user_headers,
+        json={"answers": [
+            {"question_id": one, "answer": "4"},
+            {"question_id": two, "answer": "3"},
+        ]},
+    )
+    assert response.status_code == 201
+    etag = client.get(
+        f"/api/v1/quizzes/{quiz['id']}", headers=user_headers
+    ).headers["etag"]
+
+    response = client.post(
+        "/api/v1/quizzes/results/batch",
+        headers=user_headers,
+        json={"submissions": [
+            {
+                "quiz_id": quiz["id"],
+                "answers": [{"question_id": two, "answer": "4"}],
+            },
+            {
+                "quiz_id": quiz["id"],
+                "answers": [{"question_id": one, "answer": "3"}],
+            },
+        ]},
+    )
+    assert response.status_code == 200
+
+    listed = _listed(client, user_headers, quiz["id"])
+    assert listed["attempt_count"] == 3
+    # 1 + 3 + 0 of 3 * 4 points
+    assert listed["average_score_percent"] == 33.3
+    # Counters are not part of the quiz version
+    response = client.get(
+        f"/api/v1/quizzes/{quiz['id']}",
+        headers={**user_headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+
+    insert_quiz_results(db, [{
+        "quiz_id": quiz["id"], "user_id": quiz["author_id"], "score": 4,
+        "max_score": 4, "correct_answers": 2, "answers": {},
+    }])
+    listed = _listed(client, user_headers, quiz["id"])
+    assert listed["attempt_count"] == 4
+    assert listed["average_score_percent"] == 50.0
+
+
+def test_repair_quiz_counters(db: Session, test_user: User, quiz: dict):
+    """Test that drifted counters are found and recounted."""
+    db.execute(
+        update(Quiz)
+        .where(Quiz.id == quiz["id"])
+        .values(question_count=7, score_sum=5)
+    )
+    db.commit()
+
+    drifted = repair_quiz_counters(db, dry_run=True)
+    assert drifted == [{
+        "quiz_id": quiz["id"],
+        "stored": {
+            "question_count": 7, "attempt_count": 0, "score_sum": 5,
+            "max_score_sum": 0,
+        },
+        "actual": {
+            "question_count": 2, "attempt_count": 0, "score_sum": 0,
+            "max_score_sum": 0,
+        },
+    }]
+    assert db.get(Quiz, quiz["id"]).question_count == 7
+
+    assert len(repair_quiz_counters(db)) == 1
+    db.expire_all()
+    assert db.get(Quiz, quiz["id"]).question_count == 2
+    assert db.get(Quiz, quiz["id"]).score_sum == 0
+    assert repair_quiz_counters(db) == []
+
+
+def test_repair_command(
+    db: Session,
+    quiz: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+):
+    """Test the repair command and its dry run."""
+    monkeypatch.setattr(command, "get_db_session", TestingSessionLocal)
+    db.execute(update(Quiz).values(attempt_count=3))
+    db.commit()
+
+    assert command.main(["--dry-run"]) == 1
+    assert capsys.readouterr().out == (
+        f"quiz {quiz['id']}: attempt_count 3 -> 0\n1 quizzes drifted\n"
+    )
+    assert command.main([]) == 0
+    assert capsys.readouterr().out.endswith("1 quizzes repaired\n")
+    assert command.main(["--dry-run"]) == 0
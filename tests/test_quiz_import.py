@@ -0,0 +1,196 @@
+"""Tests for the bulk quiz import."""
+
+import io
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.commands.import_quizzes import main
+from src.models.quiz import Question, Quiz
+from src.models.user import User
+from src.settings.quiz_import import QuizImportSettings
+from src.utils import quiz_import
+from src.utils.orm import database_settings
+from src.utils.quiz_import import (detect_format, import_quizzes,
+                                   parse_csv, parse_jsonl)
+
+
+def _jsonl(*rows: dict | str) -> io.BytesIO:
+    return io.BytesIO(b"".join(
+        (row if isinstance(row, str) else json.dumps(row)).encode() + b"\n"
+        for row in rows
+    ))
+
+
+def _question(quiz: str, n: int, **extra) -> dict:
+    return {
+        "quiz": quiz, "text": f"Question {n}?", "options": ["a", "b"],
+        "correct_answer": "a", **extra,
+    }
+
+
+def test_detect_format():
+    """Test guessing the format from file names and media types."""
+    assert detect_format("quizzes.JSONL", None) == "jsonl"
+    assert detect_format(None, "application/x-ndjson") == "jsonl"
+    assert detect_format("quizzes.csv", "application/octet-stream") == "csv"
+    assert detect_format("quizzes.txt", None) is None
+
+
+def test_import_groups_rows_and_reports_errors(
+    db: Session, test_user: User
+):
+    """Test quizzes spanning batches and the per-row error report."""
+    rows = _jsonl(
+        _question("geo", 1, title="Geography", is_public=False),
+        _question("geo", 2),
+        _question("geo", 3, correct_answer="z"),
+        "{not json",
+        _question("math", 4, points="many"),
+        _question("math", 5),
+        {"text": "No quiz?"},
+        _question("x", 6, title="x"),
+        _question("x", 7),
+        _question("geo", 8),
+    )
+    report = import_quizzes(
+        db, parse_jsonl(rows), test_user.id,
+        QuizImportSettings(batch_size=3, max_errors=10),
+    )
+
+    assert report.rows == 10
+    assert report.quizzes_created == 2
+    assert report.questions_created == 4
+    assert report.rows_rejected == 6
+    errors = {error.line: error for error in report.errors}
+    assert errors[3].errors == ["Value error, Correct answer must be one of "
+                                "the options"]
+    assert errors[4].errors[0].startswith("Invalid JSON")
+    assert errors[5].quiz == "math"
+    assert errors[5].errors[0].startswith("points:")
+    assert errors[7].errors == ["quiz: Field required"]
+    assert errors[8].errors[0].startswith("title:")
+    assert errors[9].errors == ["Quiz 'x' is invalid"]
+
+    quizzes = db.execute(select(Quiz).order_by(Quiz.id)).scalars().all()
+    assert [(q.title, q.is_public) for q in quizzes] == [
+        ("Geography", False), ("math", True),
+    ]
+    geography = quizzes[0]
+    assert [q.text for q in geography.questions] == [
+        "Question 1?", "Question 2?", "Question 8?",
+    ]
+    # Questions added in a later batch bump the version
+    assert geography.version == 2
+    assert [q.question_count for q in quizzes] == [3, 1]
+
+
+def test_import_error_report_is_capped(db: Session, test_user: User):
+    """Test that only max_errors rejected rows are listed."""
+    rows = _jsonl(*({"text": "?"} for _ in range(5)))
+    report = import_quizzes(
+        db, parse_jsonl(rows), test_user.id,
+        QuizImportSettings(max_errors=2),
+    )
+    assert report.rows_rejected == 5
+    assert len(report.errors) == 2
+
+
+def test_locked_batches_are_retried(
+    db: Session, test_user: User, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that a batch finding the database locked runs again whole."""
+    monkeypatch.setattr(database_settings, "write_retry_backoff", 0.001)
+    add_to_quiz_counters = quiz_import.add_to_quiz_counters
+    attempts = []
+
+    def locked_once(db: Session, counters: dict) -> None:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OperationalError(
+                "UPDATE", {}, sqlite3.OperationalError("database is locked")
+            )
+        add_to_quiz_counters(db, counters)
+
+    monkeypatch.setattr(quiz_import, "add_to_quiz_counters", locked_once)
+    report = import_quizzes(
+        db, parse_jsonl(_jsonl(_question("geo", 1), _question("geo", 2))),
+        test_user.id, QuizImportSettings(batch_size=1),
+    )
+
+    assert len(attempts) == 3
+    assert (report.quizzes_created, report.questions_created) == (1, 2)
+    (quiz,) = db.execute(select(Quiz)).scalars().all()
+    assert quiz.question_count == 2
+    assert db.scalar(select(func.count()).select_from(Question)) == 2
+
+
+def test_parse_csv():
+    """Test CSV rows with separated and JSON options."""
+    content = (
+        "quiz,title,text,options,correct_answer,points\n"
+        'q,Quiz,"One, two?",a|b,a,\n'
+        'q,,Three?,"[""x"", ""y""]",y,3\n'
+        "q,,Broken?,[oops,x,\n"
+    ).encode()
+    rows = list(parse_csv(io.BytesIO(content)))
+    assert rows[0] == (2, {
+        "quiz": "q", "title": "Quiz", "text": "One, two?",
+        "options": ["a", "b"], "correct_answer": "a",
+    })
+    assert rows[1][1]["options"] == ["x", "y"]
+    assert rows[2][1].startswith("options: Invalid JSON")
+
+
+def test_import_endpoint(
+    client: TestClient, db: Session, user_headers: dict
+):
+    """Test uploading a CSV file to the import endpoint."""
+    content = (
+        "quiz,title,text,options,correct_answer\n"
+        "a,Imported quiz,Pick a,a|b,a\n"
+        "a,,Pick b,a|b,b\n"
+    )
+    response = client.post(
+        "/api/v1/quizzes/import",
+        headers=user_headers,
+        files={"file": ("quizzes.csv", content, "text/csv")},
+    )
+    assert response.status_code == 200
+    assert response.json()["questions_created"] == 2
+    assert db.execute(select(func.count(Question.id))).scalar() == 2
+
+    response = client.post(
+        "/api/v1/quizzes/import",
+        headers=user_headers,
+        files={"file": ("quizzes.txt", content, "text/plain")},
+    )
+    assert response.status_code == 415
+
+
+def test_import_command(
+    db: Session,
+    test_user: User,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test the command line entry point."""
+    import src.commands.import_quizzes as command
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(command, "get_db_session", TestingSessionLocal)
+    path = tmp_path / "quizzes.jsonl"
+    path.write_text(json.dumps(_question("cli", 1)) + "\n")
+
+    assert main([str(path), "--author", test_user.username]) == 0
+    assert db.execute(select(func.count(Quiz.id))).scalar() == 1
+    assert main([str(path), "--author", "nobody"]) == 2
+
+    path.write_text("{}\n")
+    assert main([str(path), "--author", test_user.username]) == 1
@@ -170,3 +170,34 @@ def test_delete_other_user_quiz(client: TestClient, admin_token: str, test_quiz:
     # Admin should be able to delete any quiz
     assert response.status_code == 200
     assert response.json()["detail"] == "Quiz deleted successfully"
+
+
+def test_quiz_etag_and_version(
+    client: TestClient, user_token: str, test_quiz: Quiz
+):
+    """Test ETag revalidation and that question writes change the ETag."""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    url = f"/api/v1/quizzes/{test_quiz.id}"
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    question = test_quiz.questions[0]
+    response = client.put(
+        f"{url}/questions/{question.id}",
+        headers=headers,
+        json={"text": "What is 3+1?"},
+    )
+    assert response.status_code == 200
+
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    texts = [q["text"] for q in response.json()["questions"]]
+    assert "What is 3+1?" in texts
@@ -0,0 +1,133 @@
+"""Tests for batch submission of quiz results."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from src.crud import quiz as crud
+from src.crud.quiz import create_quiz_results_batch
+from src.models.base import Base
+from src.models.quiz import Quiz, QuizResult
+from src.models.user import User
+from src.schemas.quiz import QuizResultBatchItem
+
+URL = "/api/v1/quizzes/results/batch"
+
+
+def _answers(quiz: Quiz, correct: bool = True) -> list[dict]:
+    return [
+        {
+            "question_id": q.id,
+            "answer": q.correct_answer if correct else "wrong",
+        }
+        for q in quiz.questions
+    ]
+
+
+def _count(db: Session) -> int:
+    return db.execute(select(func.count(QuizResult.id))).scalar()
+
+
+def test_batch_statuses(
+    client: TestClient, db: Session, test_quiz: Quiz, user_headers: dict
+):
+    """Test grading, per-item errors and duplicates within a batch."""
+    response = client.post(URL, headers=user_headers, json={"submissions": [
+        {"quiz_id": test_quiz.id, "answers": _answers(test_quiz),
+         "idempotency_key": "kiosk-1"},
+        {"quiz_id": 999, "answers": []},
+        {"quiz_id": test_quiz.id, "answers": _answers(test_quiz, False)},
+        {"quiz_id": test_quiz.id,
+         "answers": [{"question_id": 12345, "answer": "x"}]},
+        {"quiz_id": test_quiz.id, "answers": _answers(test_quiz),
+         "idempotency_key": "kiosk-1"},
+    ]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["duplicates"], data["errors"]) == (2, 1, 2)
+    items = data["items"]
+    assert [item["status"] for item in items] == [
+        "created", "error", "created", "error", "duplicate",
+    ]
+    assert items[0]["result"]["score"] == 3
+    assert items[2]["result"]["score"] == 0
+    assert items[1]["detail"] == "Quiz not found"
+    assert "12345" in items[3]["detail"]
+    assert items[4]["result"]["id"] == items[0]["result"]["id"]
+    assert _count(db) == 2
+
+
+def test_batch_retry_is_idempotent(
+    client: TestClient, db: Session, test_quiz: Quiz, user_headers: dict,
+    admin_headers: dict,
+):
+    """Test that resending a batch stores nothing new."""
+    batch = {"submissions": [
+        {"quiz_id": test_quiz.id, "answers": _answers(test_quiz),
+         "idempotency_key": f"attempt-{n}"}
+        for n in range(3)
+    ]}
+    first = client.post(URL, headers=user_headers, json=batch).json()
+    second = client.post(URL, headers=user_headers, json=batch).json()
+
+    assert first["created"] == 3
+    assert second["duplicates"] == 3
+    assert [i["result"]["id"] for i in second["items"]] == [
+        i["result"]["id"] for i in first["items"]
+    ]
+    assert _count(db) == 3
+
+    # Keys are scoped to the user
+    response = client.post(
+        URL, headers=admin_headers, json=batch
+    )
+    assert response.json()["created"] == 3
+
+
+def test_batch_concurrent_retry(tmp_path: Path):
+    """Test a key stored by another request between lookup and commit."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db, Session(engine) as other:
+        user = User(username="kiosk", email="k@example.com",
+                    hashed_password="x")
+        db.add(user)
+        db.flush()
+        quiz = Quiz(title="Race", author_id=user.id)
+        db.add(quiz)
+        db.commit()
+        submission = QuizResultBatchItem(
+            quiz_id=quiz.id, answers=[], idempotency_key="race"
+        )
+        get_answer_key = crud.get_answer_key
+
+        def store_concurrently(*args):
+            # Runs after the lookup of stored keys, like a parallel retry
+            if not other.execute(select(QuizResult)).first():
+                other.add(QuizResult(
+                    quiz_id=quiz.id, user_id=user.id, score=0, max_score=0,
+                    answers={}, idempotency_key="race",
+                ))
+                other.commit()
+            return get_answer_key(*args)
+
+        with patch.object(crud, "get_answer_key", store_concurrently):
+            outcomes = create_quiz_results_batch(db, [submission], user.id)
+
+        assert [o.status for o in outcomes] == ["duplicate"]
+        assert db.execute(select(func.count(QuizResult.id))).scalar() == 1
+    engine.dispose()
+
+
+def test_batch_validation(client: TestClient, user_headers: dict):
+    """Test that empty batches are rejected."""
+    response = client.post(
+        URL,
+        headers=user_headers,
+        json={"submissions": []},
+    )
+    assert response.status_code == 422
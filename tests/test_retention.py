@@ -0,0 +1,199 @@
+"""Tests for the retention policy of quiz results."""
+
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.commands import purge_results as command
+from src.main import create_app
+from src.models.base import Base
+from src.models.quiz import Quiz, QuizResult
+from src.models.user import User
+from src.settings.retention import RetentionSettings
+from src.utils.dependencies import get_db
+from src.utils.metrics import RETENTION_PURGED, RETENTION_RECLAIMED
+from src.utils.orm import database_settings
+from src.utils.retention import (PurgeInProgress, RetentionPurger,
+                                 enable_incremental_vacuum, in_window,
+                                 incremental_vacuum, purge_lock,
+                                 purge_results)
+from tests.conftest import (TestingSessionLocal, add_results,
+                            override_get_db)
+
+NOW = datetime(2026, 10, 19, 3)
+
+
+@pytest.fixture(autouse=True)
+def lock_in_tmp(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        database_settings, "database_path", str(tmp_path / "quiz.db")
+    )
+
+
+def _settings(**overrides) -> RetentionSettings:
+    return RetentionSettings(**{"pause": 0, "batch_size": 2, **overrides})
+
+
+def _scores(db: Session, user: User) -> list[int]:
+    return sorted(db.execute(
+        select(QuizResult.score).where(QuizResult.user_id == user.id)
+    ).scalars())
+
+
+def test_in_window():
+    """Test windows within a day and across midnight."""
+    settings = RetentionSettings(window_start=2, window_end=5)
+    assert in_window(datetime(2026, 10, 19, 2), settings)
+    assert not in_window(datetime(2026, 10, 19, 5), settings)
+    settings = RetentionSettings(window_start=22, window_end=3)
+    assert in_window(datetime(2026, 10, 19, 23), settings)
+    assert in_window(datetime(2026, 10, 19, 1), settings)
+    assert not in_window(datetime(2026, 10, 19, 12), settings)
+
+
+def test_keep_best_attempts(
+    db: Session, test_user: User, test_admin: User, test_quiz: Quiz
+):
+    """Test that only the best attempts per user and quiz are kept."""
+    add_results(db, test_quiz, test_user, [1, 3, 2, 3, 0], completed_at=NOW)
+    add_results(db, test_quiz, test_admin, [1, 2], completed_at=NOW)
+    purged = RETENTION_PURGED.labels("best")._value.get()
+
+    report = purge_results(db, _settings(keep_best=2), now=NOW)
+
+    assert report.purged == {"age": 0, "best": 3}
+    assert report.complete
+    assert _scores(db, test_user) == [3, 3]
+    assert _scores(db, test_admin) == [1, 2]
+    assert RETENTION_PURGED.labels("best")._value.get() == purged + 3
+    # The counters were updated along with the deletes
+    db.expire_all()
+    assert (test_quiz.attempt_count, test_quiz.score_sum) == (4, 9)
+
+
+def test_max_age(db: Session, test_user: User, test_quiz: Quiz):
+    """Test that attempts older than the maximum age are purged."""
+    add_results(
+        db, test_quiz, test_user, [1, 2, 3], completed_at=datetime(2025, 1, 1)
+    )
+    add_results(
+        db, test_quiz, test_user, [0], completed_at=datetime(2026, 10, 1)
+    )
+
+    report = purge_results(db, _settings(max_age_days=30), now=NOW)
+
+    assert report.purged == {"age": 3, "best": 0}
+    assert _scores(db, test_user) == [0]
+
+
+def test_purge_stops_between_batches(
+    db: Session, test_user: User, test_quiz: Quiz
+):
+    """Test that a purge told to stop leaves the rest for later."""
+    add_results(
+        db, test_quiz, test_user, [1, 2, 3], completed_at=datetime(2025, 1, 1)
+    )
+    answers = iter([True, False])
+
+    report = purge_results(
+        db, _settings(max_age_days=30), lambda: next(answers), now=NOW
+    )
+
+    assert not report.complete
+    assert report.purged["age"] == 2
+    assert _scores(db, test_user) == [3]
+
+
+def test_incremental_vacuum(tmp_path: Path):
+    """Test that freed pages are returned to the file system."""
+    path = tmp_path / "vacuum.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    enable_incremental_vacuum(engine)
+    with sessionmaker(bind=engine)() as db:
+        user = User(username="u", email="u@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        quiz = Quiz(title="Big", author_id=user.id)
+        db.add(quiz)
+        db.commit()
+        add_results(db, quiz, user, [1] * 2000, completed_at=NOW)
+        size = path.stat().st_size
+        reclaimed = RETENTION_RECLAIMED._value.get()
+
+        commits = []
+
+        def record(session: Session) -> None:
+            commits.append(session)
+
+        event.listen(db, "after_commit", record)
+        report = purge_results(
+            db,
+            _settings(
+                keep_best=1, batch_size=500, vacuum_pages=5,
+                vacuum_batch_pages=2,
+            ),
+            now=NOW,
+        )
+        event.remove(db, "after_commit", record)
+        page_size = db.execute(text("PRAGMA page_size")).scalar()
+        assert report.reclaimed_bytes == 5 * page_size
+        # Four purge batches, three vacuum batches and the final commit
+        assert len(commits) == 4 + 3 + 1
+        assert RETENTION_RECLAIMED._value.get() > reclaimed
+
+        assert incremental_vacuum(db, batch_pages=100) > 0
+        assert incremental_vacuum(db) == 0
+    engine.dispose()
+    assert path.stat().st_size < size
+
+
+def test_purge_command(
+    db: Session,
+    test_user: User,
+    test_quiz: Quiz,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+):
+    """Test the purge command, its rules and the purge lock."""
+    monkeypatch.setattr(command, "get_db_session", TestingSessionLocal)
+    add_results(db, test_quiz, test_user, [1, 2, 3], completed_at=NOW)
+
+    assert command.main([]) == 2
+    with purge_lock():
+        assert command.main(["--keep-best", "1"]) == 1
+    assert command.main(["--keep-best", "1"]) == 0
+    assert capsys.readouterr().out.startswith(
+        "purged 0 by age, 2 beyond the best attempts;"
+    )
+    assert _scores(db, test_user) == [3]
+
+
+def test_purger_runs_within_the_window(
+    db: Session, test_user: User, test_quiz: Quiz
+):
+    """Test the background purger of the application."""
+    add_results(db, test_quiz, test_user, [1, 2, 3], completed_at=NOW)
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    settings = _settings(
+        keep_best=1, window_start=0, window_end=24, check_interval=0.01
+    )
+
+    async def main() -> None:
+        purger = RetentionPurger(app, settings)
+        purger.start()
+        for _ in range(500):
+            if purger._purged_on is not None:
+                break
+            await asyncio.sleep(0.01)
+        await purger.close()
+
+    asyncio.run(main())
+    assert _scores(db, test_user) == [3]
+    with pytest.raises(PurgeInProgress), purge_lock(), purge_lock():
+        pass
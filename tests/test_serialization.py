@@ -0,0 +1,58 @@
+"""Tests for the precompiled response serializers."""
+
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from src.models.quiz import Quiz
+from src.schemas.quiz import (LeaderboardResponse, QuizResponse,
+                              leaderboard_serializer, quiz_serializer)
+from src.settings.serialization import serialization_settings
+
+
+def test_serializer_matches_model_dump(db: Session, test_quiz: Quiz):
+    """Test that ORM objects serialize like the pydantic model does."""
+    expected = QuizResponse.model_validate(test_quiz).model_dump(mode="json")
+    assert json.loads(quiz_serializer.to_json(test_quiz)) == expected
+
+
+def test_trusted_values_skip_validation(monkeypatch: pytest.MonkeyPatch):
+    """Test that trusted values are dumped as is unless configured."""
+    leaderboard = LeaderboardResponse.model_construct(
+        quiz_id=1, quiz_title="Quiz", entries=[]
+    )
+    data = json.loads(leaderboard_serializer.to_json(leaderboard, trusted=True))
+    assert data == {"quiz_id": 1, "quiz_title": "Quiz", "entries": []}
+
+    # A malformed value only gets caught when validating
+    broken = {"quiz_id": 1, "entries": []}
+    with pytest.raises(ValidationError):
+        leaderboard_serializer.to_json(broken)
+    monkeypatch.setattr(serialization_settings, "validate_trusted", True)
+    with pytest.raises(ValidationError):
+        leaderboard_serializer.to_json(broken, trusted=True)
+
+
+def test_quiz_list_response(
+    client: TestClient, user_headers: dict, test_quiz: Quiz
+):
+    """Test the serialized quiz list returned by the API."""
+    response = client.get(
+        "/api/v1/quizzes/", headers=user_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    quizzes = response.json()
+    assert [q["title"] for q in quizzes] == ["Test Quiz"]
+    assert len(quizzes[0]["questions"]) == 2
+    datetime.fromisoformat(quizzes[0]["created_at"])
+
+
+def test_default_response_class_is_compact(client: TestClient):
+    """Test that plain routes are rendered by orjson."""
+    response = client.get("/healthz")
+    assert response.content == b'{"status":"ok"}'
@@ -0,0 +1,142 @@
+"""Tests for coalescing of identical concurrent reads."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import src.api.quizzes
+from src.models.quiz import Quiz
+from src.settings.cache import cache_settings
+from src.utils.single_flight import SingleFlight
+
+
+def _sample(name: str, flight: str) -> float:
+    return REGISTRY.get_sample_value(name, {"name": flight}) or 0.0
+
+
+def test_concurrent_calls_share_one_computation():
+    """Test that concurrent callers of one key get one shared result."""
+    flight = SingleFlight("test_shared")
+    calls = []
+
+    async def compute(key: str) -> str:
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return key.upper()
+
+    async def main() -> list[str]:
+        return await asyncio.gather(
+            *(flight.do("a", lambda: compute("a")) for _ in range(10)),
+            flight.do("b", lambda: compute("b")),
+        )
+
+    results = asyncio.run(main())
+    assert results == ["A"] * 10 + ["B"]
+    assert calls == ["a", "b"]
+    assert flight.in_flight == 0
+    assert _sample("singleflight_coalesced_total", "test_shared") == 9
+    assert _sample("singleflight_fanout_sum", "test_shared") == 11
+
+    # Once landed, the next call computes again
+    asyncio.run(flight.do("a", lambda: compute("a")))
+    assert calls == ["a", "b", "a"]
+
+
+def test_errors_are_shared_and_cancellation_is_isolated():
+    """Test error propagation and that a cancelled caller is harmless."""
+    flight = SingleFlight("test_errors")
+
+    async def fail() -> str:
+        await asyncio.sleep(0.02)
+        raise ValueError("boom")
+
+    async def slow() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main() -> tuple:
+        errors = await asyncio.gather(
+            flight.do("x", fail), flight.do("x", fail),
+            return_exceptions=True,
+        )
+        first = asyncio.ensure_future(flight.do("y", slow))
+        second = asyncio.ensure_future(flight.do("y", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return errors, await second
+
+    errors, result = asyncio.run(main())
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert result == "done"
+
+
+def test_disabled_coalescing(monkeypatch: pytest.MonkeyPatch):
+    """Test that every caller computes when coalescing is off."""
+    monkeypatch.setattr(cache_settings, "coalesce_reads", False)
+    flight = SingleFlight("test_disabled")
+    calls = []
+
+    async def compute() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def main() -> None:
+        await asyncio.gather(*(flight.do("k", compute) for _ in range(3)))
+
+    asyncio.run(main())
+    assert len(calls) == 3
+
+
+def test_concurrent_quiz_requests_coalesce(
+    client: TestClient,
+    user_headers: dict,
+    test_quiz: Quiz,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that simultaneous GET /quizzes/{id} requests load once."""
+    original = src.api.quizzes._load_quiz_payload
+
+    def slow_load_quiz_payload(*args: object) -> bytes:
+        time.sleep(0.2)
+        return original(*args)
+
+    monkeypatch.setattr(src.api.quizzes, "_load_quiz_payload", slow_load_quiz_payload)
+    executions = _sample("singleflight_executions_total", "quiz")
+    coalesced = _sample("singleflight_coalesced_total", "quiz")
+
+    async def main() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as http:
+            return await asyncio.gather(*(
+                http.get(
+                    f"/api/v1/quizzes/{test_quiz.id}",
+                    headers=user_headers,
+                )
+                for _ in range(5)
+            ))
+
+    responses = asyncio.run(main())
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.content for r in responses}) == 1
+    assert responses[0].json()["title"] == "Test Quiz"
+    assert _sample("singleflight_executions_total", "quiz") == executions + 1
+    assert _sample("singleflight_coalesced_total", "quiz") == coalesced + 4
+
+
+def test_leaderboard_errors_are_not_cached(
+    client: TestClient, user_headers: dict
+):
+    """Test that a missing quiz still answers 404 through the flight."""
+    for _ in range(2):
+        response = client.get(
+            "/api/v1/quizzes/999/results/leaderboard", headers=user_headers
+        )
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Quiz not found"
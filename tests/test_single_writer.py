@@ -0,0 +1,233 @@
+"""Tests for the single-writer routing of SQLite sessions."""
+
+import threading
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.auth.utils import create_access_token, get_password_hash
+from src.main import create_app
+from src.models.base import Base
+from src.models.quiz import Question, Quiz, QuizResult
+from src.models.user import User
+from src.utils import orm
+from src.utils.dependencies import get_db
+from src.utils.local_cache import clear_all as clear_local_caches
+from src.utils.metrics import DB_WRITER_WAIT
+from src.utils.single_writer import (RoutingEngines, RoutingSession,
+                                     WriterTimeout, create_routing_engines)
+
+
+@pytest.fixture
+def engines(tmp_path: Path) -> Generator[RoutingEngines, None, None]:
+    engines = create_routing_engines(
+        f"sqlite:///{tmp_path / 'quiz.db'}", read_pool_size=2,
+        writer_timeout=5,
+    )
+    Base.metadata.create_all(bind=engines.writer)
+    yield engines
+    engines.reader.dispose()
+    engines.writer.dispose()
+
+
+@pytest.fixture
+def sessions(engines: RoutingEngines) -> sessionmaker[RoutingSession]:
+    return sessionmaker(
+        class_=RoutingSession, engines=engines, expire_on_commit=False,
+    )
+
+
+def _add_user(db: Session, username: str = "writer") -> User:
+    user = User(
+        username=username,
+        email=f"{username}@example.com",
+        hashed_password=get_password_hash("password123"),
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_database_is_in_wal_mode(engines: RoutingEngines) -> None:
+    with engines.reader.connect() as connection:
+        mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+    assert mode == "wal"
+    with engines.writer.connect() as connection:
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+
+def test_reader_connections_are_read_only(engines: RoutingEngines) -> None:
+    with engines.reader.connect() as connection:
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(
+                insert(User).values(
+                    username="x", email="x@example.com", hashed_password="x"
+                )
+            )
+
+
+def test_statements_are_routed_by_kind(
+    sessions: sessionmaker[RoutingSession], engines: RoutingEngines
+) -> None:
+    with sessions() as db:
+        assert db.get_bind(clause=select(User)) is engines.reader
+        assert db.get_bind(clause=text("SELECT 1")) is engines.reader
+        user = _add_user(db)
+
+        # The writer is handed back on commit
+        assert db.get_bind(clause=select(User)) is engines.reader
+        db.execute(
+            text("UPDATE user SET username = 'renamed' WHERE id = :id"),
+            {"id": user.id},
+        )
+        # Reads see the session's own writes until it commits
+        assert db.get_bind(clause=select(User)) is engines.writer
+        assert db.scalar(select(User.username)) == "renamed"
+        db.commit()
+
+    with sessions() as db:
+        assert db.scalar(select(User.username)) == "renamed"
+
+
+def test_rollback_releases_the_writer(
+    sessions: sessionmaker[RoutingSession]
+) -> None:
+    with sessions() as db:
+        _add_user(db, "first")
+        db.add(Quiz(title="Draft", author_id=1))
+        db.flush()
+        db.rollback()
+
+    with sessions() as db:
+        _add_user(db, "second")
+        assert db.scalar(select(func.count(Quiz.id))) == 0
+        assert db.scalar(select(func.count(User.id))) == 2
+
+
+def test_writers_wait_for_each_other(
+    sessions: sessionmaker[RoutingSession]
+) -> None:
+    with sessions() as db:
+        _add_user(db)
+    waits_before = DB_WRITER_WAIT._sum.get()
+    holding = threading.Event()
+    errors: list[Exception] = []
+
+    def hold_writer() -> None:
+        with sessions() as db:
+            db.add(Quiz(title="Slow", author_id=1))
+            db.flush()
+            holding.set()
+            time.sleep(0.3)
+            db.commit()
+
+    def write() -> None:
+        holding.wait()
+        try:
+            with sessions() as db:
+                db.add(Quiz(title="Queued", author_id=1))
+                db.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hold_writer)] + [
+        threading.Thread(target=write) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with sessions() as db:
+        assert db.scalar(select(func.count(Quiz.id))) == 5
+    # The queued sessions waited for the slow one in-process
+    assert DB_WRITER_WAIT._sum.get() - waits_before >= 0.2
+
+
+def test_writer_timeout(
+    sessions: sessionmaker[RoutingSession], engines: RoutingEngines
+) -> None:
+    engines.gate.timeout = 0.05
+    with sessions() as holder:
+        _add_user(holder)
+        holder.add(Quiz(title="Held", author_id=1))
+        holder.flush()
+        with sessions() as db:
+            db.add(Quiz(title="Blocked", author_id=1))
+            with pytest.raises(WriterTimeout):
+                db.flush()
+            db.rollback()
+            # Reads go on while the writer is taken
+            assert db.scalar(select(func.count(User.id))) == 1
+        holder.commit()
+
+    with sessions() as db:
+        db.add(Quiz(title="Later", author_id=1))
+        db.commit()
+        assert db.scalar(select(func.count(Quiz.id))) == 2
+
+
+def test_get_db_session_uses_routing_sessions(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(
+        orm.database_settings, "database_path", str(tmp_path / "app.db")
+    )
+    monkeypatch.setattr(orm.database_settings, "single_writer", True)
+    orm.get_routing_engines.cache_clear()
+    try:
+        with orm.get_db_session() as db:
+            assert isinstance(db, RoutingSession)
+    finally:
+        orm.get_routing_engines().reader.dispose()
+        orm.get_routing_engines().writer.dispose()
+        orm.get_routing_engines.cache_clear()
+
+
+def test_api_flow_on_single_writer(
+    sessions: sessionmaker[RoutingSession]
+) -> None:
+    clear_local_caches()
+    with sessions() as db:
+        user = _add_user(db)
+        quiz = Quiz(title="Capitals", author_id=user.id, is_public=True)
+        db.add(quiz)
+        db.flush()
+        db.add(Question(
+            quiz_id=quiz.id, text="Capital of France?",
+            options=["Paris", "Rome"], correct_answer="Paris",
+        ))
+        db.commit()
+        question_id = db.scalar(select(Question.id))
+
+    def override_get_db() -> Generator[Session, None, None]:
+        with sessions() as db:
+            yield db
+
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    token = create_access_token({"sub": user.username, "scopes": ["user"]})
+    headers = {"Authorization": f"Bearer {token}"}
+    with TestClient(app) as client:
+        response = client.post(
+            f"/api/v1/quizzes/{quiz.id}/results/",
+            json={
+                "answers": [{"question_id": question_id, "answer": "Paris"}],
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201, response.text
+        assert response.json()["score"] == 1
+
+        response = client.get(f"/api/v1/quizzes/{quiz.id}", headers=headers)
+        assert response.status_code == 200
+
+    with sessions() as db:
+        assert db.scalar(select(func.count(QuizResult.id))) == 1
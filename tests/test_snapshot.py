@@ -0,0 +1,175 @@
+"""Tests for the columnar analytics snapshots."""
+
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.commands.snapshot import main
+from src.models.quiz import Quiz, QuizResult
+from src.models.user import User
+from src.settings.snapshot import snapshot_settings
+from src.utils.snapshot import (SnapshotInProgress, _locked, read_manifest,
+                                write_snapshot)
+
+
+def _add_result(
+    db: Session, quiz: Quiz, user: User, completed_at: datetime,
+    answers: dict[str, str],
+) -> QuizResult:
+    result = QuizResult(
+        quiz_id=quiz.id, user_id=user.id, score=1, max_score=3,
+        correct_answers=1, answers=answers, completed_at=completed_at,
+    )
+    db.add(result)
+    db.commit()
+    return result
+
+
+def _read(directory: Path, table: str):
+    return ds.dataset(
+        directory / table, format="parquet", partitioning="hive"
+    ).to_table().to_pylist()
+
+
+def test_snapshot_partitions_and_answers(
+    db: Session, test_user: User, test_quiz: Quiz, tmp_path: Path
+):
+    """Test the partitioned result and flattened answer tables."""
+    question_ids = [q.id for q in test_quiz.questions]
+    _add_result(db, test_quiz, test_user, datetime(2026, 9, 30), {
+        str(question_ids[0]): "4", str(question_ids[1]): "Berlin",
+    })
+    _add_result(db, test_quiz, test_user, datetime(2026, 10, 1), {
+        str(question_ids[0]): "5", "999": "gone",
+    })
+
+    run = write_snapshot(db, tmp_path)
+
+    assert run.run == 1
+    assert run.rows == {
+        "quizzes": 1, "questions": 2, "results": 2, "answers": 4,
+    }
+    assert (
+        f"results/quiz_id={test_quiz.id}/month=2026-09/part-000001.parquet"
+        in run.files
+    )
+    results = _read(tmp_path, "results")
+    assert {(r["quiz_id"], r["month"]) for r in results} == {
+        (test_quiz.id, "2026-09"), (test_quiz.id, "2026-10"),
+    }
+    answers = sorted(
+        _read(tmp_path, "answers"), key=lambda a: (a["result_id"], a["answer"])
+    )
+    assert [(a["answer"], a["is_correct"]) for a in answers] == [
+        ("4", True), ("Berlin", False), ("5", False), ("gone", None),
+    ]
+    questions = pq.read_table(tmp_path / "questions").to_pylist()
+    assert questions[0]["options"] == ["3", "4", "5", "6"]
+
+
+def test_snapshot_is_incremental(
+    db: Session, test_user: User, test_quiz: Quiz, tmp_path: Path
+):
+    """Test that a second run appends only the new results."""
+    _add_result(db, test_quiz, test_user, datetime(2026, 10, 1), {})
+    first = write_snapshot(db, tmp_path)
+    second = write_snapshot(db, tmp_path)
+    assert second.rows["results"] == 0
+    assert second.watermark == first.watermark
+
+    test_quiz.title = "Renamed"
+    db.commit()
+    _add_result(db, test_quiz, test_user, datetime(2026, 10, 2), {})
+    third = write_snapshot(db, tmp_path)
+
+    assert third.rows["results"] == 1
+    assert len(_read(tmp_path, "results")) == 2
+    quizzes = _read(tmp_path, "quizzes")
+    assert [(q["title"], q["version"]) for q in quizzes] == [
+        ("Renamed", test_quiz.version)
+    ]
+    manifest = read_manifest(tmp_path)
+    assert manifest["watermark"] == third.watermark
+    assert [r["run"] for r in manifest["runs"]] == [1, 2, 3]
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_snapshot_lock(db: Session, tmp_path: Path):
+    """Test that concurrent runs on one directory are refused."""
+    with _locked(tmp_path):
+        with pytest.raises(SnapshotInProgress):
+            write_snapshot(db, tmp_path)
+
+
+def test_snapshot_command(
+    db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test the command line entry point."""
+    import src.commands.snapshot as command
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(command, "get_db_session", TestingSessionLocal)
+    assert main(["--directory", str(tmp_path)]) == 0
+    assert (tmp_path / "manifest.json").exists()
+    with _locked(tmp_path):
+        assert main(["--directory", str(tmp_path)]) == 1
+
+
+def test_snapshot_admin_api(
+    client: TestClient,
+    db: Session,
+    test_user: User,
+    test_quiz: Quiz,
+    admin_headers: dict,
+    user_headers: dict,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test running, listing and downloading snapshots as an admin."""
+    monkeypatch.setattr(snapshot_settings, "directory", tmp_path)
+    _add_result(db, test_quiz, test_user, datetime(2026, 10, 1), {})
+
+    response = client.post(
+        "/api/v1/admin/snapshots",
+        headers=user_headers,
+    )
+    assert response.status_code == 403
+
+    response = client.post("/api/v1/admin/snapshots", headers=admin_headers)
+    assert response.status_code == 201
+    assert response.json()["rows"]["results"] == 1
+
+    response = client.get("/api/v1/admin/snapshots", headers=admin_headers)
+    assert response.status_code == 200
+    listing = response.json()
+    assert len(listing["runs"]) == 1
+    paths = [file["path"] for file in listing["files"]]
+    assert "quizzes/part-000001.parquet" in paths
+
+    result_file = next(p for p in paths if p.startswith("results/"))
+    response = client.get(
+        f"/api/v1/admin/snapshots/files/{result_file}", headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.content.startswith(b"PAR1")
+    response = client.get(
+        "/api/v1/admin/snapshots/files/manifest.json", headers=admin_headers
+    )
+    assert response.json()["watermark"] == listing["watermark"]
+
+    response = client.get(
+        "/api/v1/admin/snapshots/files/..%2F..%2Fetc%2Fpasswd",
+        headers=admin_headers,
+    )
+    assert response.status_code == 404
+
+    with _locked(tmp_path):
+        response = client.post(
+            "/api/v1/admin/snapshots", headers=admin_headers
+        )
+    assert response.status_code == 409
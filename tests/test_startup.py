@@ -0,0 +1,43 @@
+"""Tests for the startup profile and the create_app import budget."""
+
+from benchmarks.startup import (DEFAULT_BUDGET, by_package,
+                                parse_importtime, profile_startup)
+from src.auth.utils import (create_access_token, decode_access_token,
+                            get_password_hash, verify_password)
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     json.decoder
+import time:       250 |        350 |   json
+import time:        50 |        400 | src.main
+"""
+
+
+def test_parse_importtime():
+    """Test parsing of -X importtime output."""
+    records = parse_importtime(IMPORTTIME)
+    assert [(r.module, r.self_us, r.cumulative_us, r.depth)
+            for r in records] == [
+        ("json.decoder", 100, 100, 2),
+        ("json", 250, 350, 1),
+        ("src.main", 50, 400, 0),
+    ]
+    assert by_package(records) == {"json": 350, "src": 50}
+
+
+def test_create_app_startup_budget():
+    """Test that creating the app stays cheap and defers heavy modules."""
+    report = profile_startup(top=5)
+    assert report["deferred_imported"] == []
+    assert report["total_s"] < DEFAULT_BUDGET
+    assert len(report["slowest_cumulative"]) == 5
+
+
+def test_deferred_auth_helpers():
+    """Test that lazily imported hashing and JWT helpers still work."""
+    hashed = get_password_hash("secret")
+    assert verify_password("secret", hashed)
+    assert not verify_password("wrong", hashed)
+
+    token = create_access_token({"sub": "user1", "scopes": ["user"]})
+    assert decode_access_token(token)["sub"] == "user1"
@@ -0,0 +1,176 @@
+"""Tests for retrying write transactions on a locked database."""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.crud.user import create_user
+from src.models.base import Base
+from src.models.user import User
+from src.schemas.user import UserCreate
+from src.utils import unit_of_work
+from src.utils.metrics import (DB_WRITE_CONTENTION, DB_WRITE_LOCK_FAILURES,
+                               DB_WRITE_RETRIES)
+from src.utils.orm import database_settings
+from src.utils.unit_of_work import DatabaseBusy, transactional
+
+
+def _locked() -> OperationalError:
+    return OperationalError(
+        "INSERT", {}, sqlite3.OperationalError("database is locked")
+    )
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(database_settings, "write_retry_backoff", 0.001)
+    monkeypatch.setattr(database_settings, "write_retry_max_backoff", 0.01)
+
+
+def test_retries_until_the_lock_is_gone(db: Session):
+    """Test that a locked write is rolled back and run again."""
+    attempts = []
+
+    @transactional
+    def write(db: Session) -> str:
+        attempts.append(db.in_transaction())
+        if len(attempts) < 3:
+            raise _locked()
+        return "stored"
+
+    retries = DB_WRITE_RETRIES.labels("write")._value.get()
+    contention = DB_WRITE_CONTENTION.labels("write")._sum.get()
+    assert write(db) == "stored"
+    assert len(attempts) == 3
+    assert DB_WRITE_RETRIES.labels("write")._value.get() == retries + 2
+    assert DB_WRITE_CONTENTION.labels("write")._sum.get() > contention
+
+
+def test_gives_up_after_the_retries(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that a write that stays locked raises DatabaseBusy."""
+    monkeypatch.setattr(database_settings, "write_retries", 2)
+    attempts = []
+
+    @transactional
+    def write(db: Session) -> None:
+        attempts.append(1)
+        raise _locked()
+
+    failures = DB_WRITE_LOCK_FAILURES.labels("write")._value.get()
+    with pytest.raises(DatabaseBusy):
+        write(db)
+    assert len(attempts) == 3
+    assert DB_WRITE_LOCK_FAILURES.labels("write")._value.get() == failures + 1
+
+
+def test_other_errors_are_not_retried(db: Session):
+    """Test that only lock errors are retried."""
+    attempts = []
+
+    @transactional
+    def write(db: Session) -> None:
+        attempts.append(1)
+        raise OperationalError(
+            "INSERT", {}, sqlite3.OperationalError("no such table: quiz")
+        )
+
+    with pytest.raises(OperationalError):
+        write(db)
+    assert len(attempts) == 1
+
+
+def test_nested_calls_join_the_outer_unit(db: Session):
+    """Test that the outermost transactional function retries as a whole."""
+    calls = []
+
+    @transactional
+    def inner(db: Session) -> None:
+        calls.append("inner")
+        if calls.count("inner") == 1:
+            raise _locked()
+
+    @transactional
+    def outer(db: Session) -> None:
+        calls.append("outer")
+        inner(db)
+
+    outer(db)
+    assert calls == ["outer", "inner", "outer", "inner"]
+
+
+def test_waits_out_a_held_write_lock(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test a CRUD write against a database another connection locked."""
+    monkeypatch.setattr(database_settings, "write_retries", 50)
+    url = f"sqlite:///{tmp_path / 'locked.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    # SQLite itself only waits 10ms, the retries have to cover the rest
+    engine = create_engine(url, connect_args={"timeout": 0.01})
+    holder = create_engine(url).connect()
+    holder.exec_driver_sql("BEGIN IMMEDIATE")
+
+    retries = DB_WRITE_RETRIES.labels("create_user")._value.get()
+
+    def release() -> None:
+        # Hold the lock until the write was turned away at least once
+        deadline = time.monotonic() + 5
+        while (
+            DB_WRITE_RETRIES.labels("create_user")._value.get() == retries
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+        holder.rollback()
+
+    thread = threading.Thread(target=release)
+    thread.start()
+    with sessionmaker(bind=engine)() as db:
+        user = create_user(db, UserCreate(
+            username="patient",
+            email="patient@example.com",
+            password="password123",
+        ))
+        assert user.id is not None
+        assert db.scalar(select(func.count(User.id))) == 1
+    thread.join()
+    holder.close()
+    assert DB_WRITE_RETRIES.labels("create_user")._value.get() > retries
+
+
+def test_busy_database_answers_503(
+    client: TestClient,
+    user_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that a write locked out through its retries returns 503."""
+    monkeypatch.setattr(database_settings, "write_retries", 1)
+
+    def locked_commit(self: Session) -> None:
+        raise _locked()
+
+    monkeypatch.setattr(Session, "commit", locked_commit)
+    response = client.post(
+        "/api/v1/quizzes/",
+        headers=user_headers,
+        json={"title": "Locked out", "questions": []},
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_is_database_locked():
+    """Test telling lock errors from other database errors."""
+    assert unit_of_work.is_database_locked(_locked())
+    assert not unit_of_work.is_database_locked(
+        OperationalError("SELECT", {}, Exception("disk I/O error"))
+    )
+    assert not unit_of_work.is_database_locked(ValueError("locked"))
@@ -0,0 +1,113 @@
+"""Tests for the startup warm-up and the readiness probe."""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.crud.quiz import (answer_key_cache, insert_quiz_results,
+                           leaderboard_cache, quiz_payload_cache)
+from src.main import create_app
+from src.models.base import Base
+from src.models.quiz import Quiz
+from src.models.user import User
+from src.settings.warmup import WarmupSettings
+from src.utils.dependencies import get_db
+from src.utils.warmup import WarmupDeadlineExceeded, WarmupState, warm_up
+from tests.conftest import engine, override_get_db
+
+
+@pytest.fixture
+def played_quiz(db: Session, test_user: User, test_quiz: Quiz) -> Quiz:
+    insert_quiz_results(db, [{
+        "quiz_id": test_quiz.id, "user_id": test_user.id, "score": 1,
+        "max_score": 3, "correct_answers": 1, "answers": {},
+    }])
+    return test_quiz
+
+
+def test_warm_up_preloads_caches(db: Session, played_quiz: Quiz):
+    """Test that warm-up fills the caches and covers all planned work."""
+    state = WarmupState()
+    settings = WarmupSettings(quizzes=10, connections=2)
+    statements = []
+
+    def record(conn, cursor, statement, *args):  # noqa: ANN001
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        warm_up(db, state, time.monotonic() + 60, settings)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    state.finish()
+
+    assert (played_quiz.id, played_quiz.version) in answer_key_cache
+    assert (played_quiz.id, 10) in leaderboard_cache
+    assert (played_quiz.id, played_quiz.version) in quiz_payload_cache
+    assert state.items["connections"] == 2
+    assert state.items["answer_keys"] == 1
+    assert "tables" not in state.items
+    assert state.items["indexes"] == len(settings.hot_indexes)
+    assert state.coverage == 1.0
+    assert state.ready
+    # The most played quizzes come from the counters, not the results
+    assert not any("GROUP BY" in statement for statement in statements)
+    scans = [s for s in statements if s.startswith("SELECT count(*) FROM (")]
+    assert len(scans) == len(settings.hot_indexes)
+    assert all(" INDEXED BY " in s and s.endswith(" LIMIT 100000)")
+               for s in scans)
+
+
+def test_full_scan_reads_every_table_and_index(db: Session):
+    """Test that a full scan covers the schema, a bounded scan per object."""
+    state = WarmupState()
+    settings = WarmupSettings(connections=0, full_scan=True, scan_rows=10)
+    warm_up(db, state, time.monotonic() + 60, settings)
+    assert state.items["tables"] == 6
+    assert state.items["indexes"] == sum(
+        len(table.indexes) for table in Base.metadata.sorted_tables
+    )
+
+
+def test_warm_up_stops_at_deadline(db: Session, played_quiz: Quiz):
+    """Test that an expired deadline stops the warm-up early."""
+    state = WarmupState()
+    with pytest.raises(WarmupDeadlineExceeded):
+        warm_up(db, state, time.monotonic() - 1, WarmupSettings())
+    assert state.coverage == 0.0
+    assert len(answer_key_cache) == 0
+
+
+def test_readyz_until_warm(client: TestClient):
+    """Test that /readyz answers 503 while warming up."""
+    state = WarmupState()
+    client.app.state.warmup = state
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming up"
+
+    state.finish()
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["warmup"]["ready"] is True
+
+
+def test_lifespan_runs_warm_up(db: Session, played_quiz: Quiz):
+    """Test that the app becomes ready once the startup warm-up is done."""
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        for _ in range(100):
+            response = client.get("/readyz")
+            if response.status_code == 200:
+                break
+            time.sleep(0.05)
+        assert response.status_code == 200
+        assert response.json()["warmup"]["coverage"] == 1.0
+
+        metrics = client.get("/metrics").text
+        assert "warmup_duration_seconds" in metrics
+        assert 'warmup_items{kind="leaderboards"} 1.0' in metrics
@@ -0,0 +1,161 @@
+"""Tests for the write-behind queue of quiz results."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.main import create_app
+from src.models.quiz import Quiz, QuizResult
+from src.settings.submissions import SubmissionSettings, submission_settings
+from src.utils.dependencies import get_db
+from src.utils.write_behind import QueueClosed, QueueFull, WriteBehindQueue
+from tests.conftest import override_get_db
+
+
+class FakeStore:
+    """Stores rows in memory, numbering them like the database would."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[dict]] = []
+
+    def __call__(self, rows: list[dict]) -> list[dict]:
+        if any(row.get("bad") for row in rows):
+            raise ValueError("bad row")
+        self.batches.append(rows)
+        first = sum(len(batch) for batch in self.batches) - len(rows)
+        return [{**row, "id": first + n + 1} for n, row in enumerate(rows)]
+
+
+def _settings(**overrides) -> SubmissionSettings:
+    return SubmissionSettings(
+        write_behind=True, flush_interval=0.01, **overrides
+    )
+
+
+def test_group_commit():
+    """Test that a burst of submissions is stored in few batches."""
+    store = FakeStore()
+
+    async def main() -> list:
+        queue = WriteBehindQueue(store, _settings(batch_size=40))
+        queue.start()
+        stored = await asyncio.gather(
+            *(queue.submit({"n": n}) for n in range(100))
+        )
+        await queue.close()
+        return stored
+
+    stored = asyncio.run(main())
+    assert sorted(row["id"] for row in stored) == list(range(1, 101))
+    assert all(row["n"] == n for n, row in enumerate(stored))
+    assert [len(batch) for batch in store.batches] == [40, 40, 20]
+
+
+def test_queue_durability_and_flush_on_close():
+    """Test answering once queued, and writing everything on close."""
+    store = FakeStore()
+
+    async def main() -> list:
+        queue = WriteBehindQueue(store, _settings(durability="queue"))
+        queue.start()
+        answers = [await queue.submit({"n": n}) for n in range(5)]
+        await queue.close()
+        with pytest.raises(QueueClosed):
+            await queue.submit({"n": 5})
+        return answers
+
+    assert asyncio.run(main()) == [None] * 5
+    assert sum(len(batch) for batch in store.batches) == 5
+
+
+def test_backpressure():
+    """Test that submissions are refused while the queue stays full."""
+    release = threading.Event()
+
+    def slow_store(rows: list[dict]) -> list[dict]:
+        release.wait(5)
+        return rows
+
+    async def main() -> None:
+        queue = WriteBehindQueue(slow_store, _settings(
+            durability="queue", queue_size=2, enqueue_timeout=0.05,
+        ))
+        queue.start()
+        await queue.submit({"n": 0})
+        await asyncio.sleep(0.05)  # the writer is now stuck on row 0
+        await queue.submit({"n": 1})
+        await queue.submit({"n": 2})
+        with pytest.raises(QueueFull):
+            await queue.submit({"n": 3})
+        release.set()
+        await queue.close()
+
+    asyncio.run(main())
+
+
+def test_bad_row_does_not_fail_the_batch():
+    """Test that rows of a failing batch are retried one by one."""
+    store = FakeStore()
+
+    async def main() -> list:
+        queue = WriteBehindQueue(store, _settings())
+        queue.start()
+        stored = await asyncio.gather(
+            queue.submit({"n": 0}),
+            queue.submit({"n": 1, "bad": True}),
+            queue.submit({"n": 2}),
+            return_exceptions=True,
+        )
+        await queue.close()
+        return stored
+
+    first, bad, last = asyncio.run(main())
+    assert isinstance(bad, ValueError)
+    assert (first["n"], last["n"]) == (0, 2)
+
+
+@pytest.mark.parametrize(
+    ("durability", "status_code"), [("commit", 201), ("queue", 202)]
+)
+def test_submit_through_queue(
+    db: Session,
+    test_quiz: Quiz,
+    user_headers: dict,
+    monkeypatch: pytest.MonkeyPatch,
+    durability: str,
+    status_code: int,
+):
+    """Test submitting with the write-behind queue of the app."""
+    monkeypatch.setattr(submission_settings, "write_behind", True)
+    monkeypatch.setattr(submission_settings, "durability", durability)
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    answers = [
+        {"question_id": q.id, "answer": q.correct_answer}
+        for q in test_quiz.questions
+    ]
+    with TestClient(app) as client:
+        response = client.post(
+            f"/api/v1/quizzes/{test_quiz.id}/results/",
+            headers=user_headers,
+            json={"answers": answers},
+        )
+        assert response.status_code == status_code
+        data = response.json()
+        assert data["score"] == 3
+        assert ("id" in data) == (durability == "commit")
+
+        response = client.post(
+            "/api/v1/quizzes/999/results/",
+            headers=user_headers,
+            json={"answers": []},
+        )
+        assert response.status_code == 404
+
+    # Shutting down flushed the queue
+    stored = db.execute(select(func.count(QuizResult.id))).scalar()
+    assert stored == 1